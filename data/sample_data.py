@@ -21,8 +21,9 @@ def load_sample_data():
             ("Michael Davis", "555-0105", "michael@farm.com", 300.0)
         ]
         
-        for name, phone, email, farm_size in farmers_data:
-            farmer_manager.add_farmer(name, phone, email, farm_size)
+        farmer_manager.add_farmers_bulk(
+            (name, phone, email, None, farm_size) for name, phone, email, farm_size in farmers_data
+        )
         
         # Add sample crops
         crops_data = [
@@ -45,8 +46,7 @@ def load_sample_data():
             (5, 5, "2024-04-15", 40.0, "2024-10-15", "Growing")
         ]
         
-        for farmer_id, crop_id, planting_date, area, harvest_date, status in plantings_data:
-            crop_manager.add_planting(farmer_id, crop_id, planting_date, area, harvest_date, status)
+        crop_manager.add_plantings_bulk(plantings_data)
         
         # Add sample financial transactions
         transactions_data = [
@@ -62,8 +62,10 @@ def load_sample_data():
             (2, "expense", "Irrigation", 5000.00, "2024-05-01", "Water system maintenance")
         ]
         
-        for farmer_id, trans_type, category, amount, date, description in transactions_data:
-            finance_manager.add_transaction(farmer_id, trans_type, category, amount, date, description)
+        finance_manager.add_transactions_bulk(
+            (farmer_id, trans_type, category, amount, description, date)
+            for farmer_id, trans_type, category, amount, date, description in transactions_data
+        )
         
         print("✅ Sample data loaded successfully!")
         print(f"📊 Added {len(farmers_data)} farmers")
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import threading
+
+DEFAULT_PAGES_PER_STEP = 1024
+
+def online_backup(db_path, backup_path, pages_per_step=DEFAULT_PAGES_PER_STEP,
+                  progress=None, compress=False):
+    """Copy a live database with the SQLite backup API
+    
+    Pages are copied in steps of pages_per_step while other connections keep
+    writing. progress(copied_pages, total_pages) is called after each step.
+    With compress=True the result is gzipped. Returns the written path.
+    """
+    temp_path = backup_path + ".part"
+    source = sqlite3.connect(db_path, check_same_thread=False)
+    target = sqlite3.connect(temp_path)
+    try:
+        # Hold a read transaction so the copy is one consistent snapshot; in
+        # WAL mode writers carry on and the backup never has to restart.
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        
+        def report(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+        
+        source.backup(target, pages=pages_per_step, progress=report)
+        source.rollback()
+        
+        # The copy inherits WAL mode; make it a standalone single-file database
+        target.execute("PRAGMA journal_mode = DELETE").fetchall()
+    except Exception:
+        target.close()
+        source.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    target.close()
+    source.close()
+    
+    try:
+        if compress:
+            # Only compressed backups need these; keep them off the startup path
+            import gzip
+            import shutil
+            with open(temp_path, 'rb') as src, gzip.open(backup_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, backup_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return backup_path
+
+def start_background_backup(db_path, backup_path, on_complete=None, **kwargs):
+    """Run online_backup on a daemon thread and return the thread
+    
+    on_complete(success, path_or_error) is called from the backup thread, so
+    GUI callers must hand the result back to the Tk thread themselves.
+    """
+    def run():
+        try:
+            path = online_backup(db_path, backup_path, **kwargs)
+        except Exception as e:
+            print(f"Backup error: {e}")
+            if on_complete:
+                on_complete(False, e)
+            return
+        if on_complete:
+            on_complete(True, path)
+    
+    thread = threading.Thread(target=run, name="database-backup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,42 @@
+# Bulk writes.
+# bulk_control holds one flag that bulk inserts raise inside their own write
+# transaction. While it is set, the per-row insert triggers (finance rollups,
+# full-text index, change counters) stand aside, and the bulk path brings
+# each of them up to date once for the whole range of new ids instead.
+
+# WHEN condition of every insert trigger that bulk inserts stand in for
+TRIGGERS_ENABLED = "(SELECT deferred FROM bulk_control WHERE id = 1) = 0"
+
+def create_bulk_control(connection):
+    """Create the single-row bulk write flag table"""
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS bulk_control (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            deferred INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    connection.execute("INSERT OR IGNORE INTO bulk_control (id, deferred) VALUES (1, 0)")
+
+def set_triggers_deferred(connection, deferred):
+    """Suspend or resume the per-row insert triggers for this transaction"""
+    connection.execute("UPDATE bulk_control SET deferred = ? WHERE id = 1", (1 if deferred else 0,))
+
+def insert_many(connection, query, params_seq):
+    """executemany an INSERT on a connection already in a write transaction
+    
+    Returns the new row ids. The caller holds the write lock, so AUTOINCREMENT
+    ids handed out by this batch are contiguous.
+    """
+    row_count = 0
+    
+    def counted_params():
+        nonlocal row_count
+        for params in params_seq:
+            row_count += 1
+            yield params
+    
+    connection.executemany(query, counted_params())
+    if row_count == 0:
+        return []
+    last_id = connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - row_count + 1, last_id + 1))
@@ -0,0 +1,100 @@
+import sqlite3
+
+from database.bulk import TRIGGERS_ENABLED
+
+# Change detection for auto-refresh.
+# table_changes holds one counter per tracked table, bumped by triggers on
+# every insert, update and delete. A poller first checks PRAGMA data_version,
+# which only moves when some other connection commits, and reads the counters
+# only then, so an idle check costs one PRAGMA and says which tables changed.
+
+TRACKED_TABLES = ('farmers', 'crops', 'plantings', 'transactions', 'users')
+
+def _change_triggers(table):
+    """Trigger statements bumping the change counter of one table"""
+    bump = f"UPDATE table_changes SET version = version + 1 WHERE table_name = '{table}';"
+    # Bulk inserts defer the insert trigger and call note_table_change once
+    return [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_insert
+        AFTER INSERT ON {table}
+        WHEN {TRIGGERS_ENABLED}
+        BEGIN
+            {bump}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_update
+        AFTER UPDATE ON {table}
+        BEGIN
+            {bump}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            {bump}
+        END
+        ''',
+    ]
+
+def create_change_counters(connection):
+    """Create the per-table change counters and their triggers"""
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS table_changes (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for table in TRACKED_TABLES:
+        connection.execute("INSERT OR IGNORE INTO table_changes (table_name, version) VALUES (?, 0)", (table,))
+        for statement in _change_triggers(table):
+            connection.execute(statement)
+
+def note_table_change(connection, table):
+    """Bump a table's change counter once, for writes made with the triggers deferred"""
+    connection.execute("UPDATE table_changes SET version = version + 1 WHERE table_name = ?", (table,))
+
+def read_change_versions(connection):
+    """Return {table_name: version} for every tracked table"""
+    return {row[0]: row[1] for row in connection.execute("SELECT table_name, version FROM table_changes")}
+
+class ChangeMonitor:
+    """Reports which tracked tables changed since the previous poll
+    
+    Uses its own read-only connection, so it must be polled from one thread.
+    The first poll records a baseline and reports nothing.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._connection = None
+        self._data_version = None
+        self._versions = None
+    
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_path, timeout=1.0)
+            self._connection.execute("PRAGMA query_only = ON")
+        return self._connection
+    
+    def poll(self):
+        """Return the set of tables changed since the last poll"""
+        connection = self._connect()
+        data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return set()
+        self._data_version = data_version
+        
+        versions = read_change_versions(connection)
+        previous, self._versions = self._versions, versions
+        if previous is None:
+            return set()
+        return {table for table, version in versions.items() if previous.get(table) != version}
+    
+    def close(self):
+        """Close the monitor's connection"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,197 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+
+class ConnectionPool:
+    """Pool of SQLite connections: thread-local readers plus one shared writer"""
+    
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE,
+                 health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL, timeout=30.0, on_connect=None):
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.on_connect = on_connect
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.closed = False
+        
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_used = {}
+        
+        self._writer = None
+        self._writer_lock = threading.RLock()
+    
+    def _open_connection(self):
+        """Open a new SQLite connection configured for pooled use"""
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        if self.on_connect:
+            self.on_connect(connection)
+        return connection
+    
+    def _is_healthy(self, connection):
+        """Check that a connection still answers a trivial query"""
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _needs_check(self, connection):
+        """Only ping connections that sat idle longer than the check interval"""
+        last_used = self._last_used.get(id(connection), 0)
+        return time.monotonic() - last_used > self.health_check_interval
+    
+    def _discard(self, connection):
+        """Close a broken or surplus connection and free its slot"""
+        self._last_used.pop(id(connection), None)
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+    
+    def _acquire_reader(self):
+        """Take an idle reader, opening a new one while under the pool size"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._open_connection()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    connection = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("Connection pool exhausted")
+            
+            if self._needs_check(connection) and not self._is_healthy(connection):
+                self._discard(connection)
+                continue
+            return connection
+    
+    def _release_reader(self, connection):
+        """Return a reader to the idle queue, or close it if the pool is shut down"""
+        if self.closed:
+            self._discard(connection)
+            return
+        self._last_used[id(connection)] = time.monotonic()
+        self._idle.put(connection)
+    
+    @contextmanager
+    def reader(self):
+        """Borrow a read connection; nested use on the same thread reuses it"""
+        if self.closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        
+        held = getattr(self._local, 'reader', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+        
+        connection = self._acquire_reader()
+        self._local.reader = connection
+        self._local.depth = 1
+        try:
+            yield connection
+        finally:
+            self._local.reader = None
+            self._local.depth = 0
+            self._release_reader(connection)
+    
+    @contextmanager
+    def writer(self):
+        """Hold the single writer connection for the duration of the block"""
+        if self.closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        
+        with self._writer_lock:
+            if self._writer is not None and self._needs_check(self._writer) \
+                    and not self._is_healthy(self._writer):
+                try:
+                    self._writer.close()
+                except sqlite3.Error:
+                    pass
+                self._writer = None
+            if self._writer is None:
+                self._writer = self._open_connection()
+            try:
+                yield self._writer
+            finally:
+                if self._writer is not None:
+                    self._last_used[id(self._writer)] = time.monotonic()
+    
+    def check_health(self):
+        """Ping every idle connection, replacing any that fail"""
+        healthy = True
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for connection in idle:
+            if self._is_healthy(connection):
+                self._idle.put(connection)
+            else:
+                healthy = False
+                self._discard(connection)
+        
+        with self._writer_lock:
+            if self._writer is not None and not self._is_healthy(self._writer):
+                healthy = False
+                try:
+                    self._writer.close()
+                except sqlite3.Error:
+                    pass
+                self._writer = None
+        return healthy
+    
+    def stats(self):
+        """Return current pool usage counters"""
+        return {
+            'size': self.size,
+            'open_readers': self._created,
+            'idle_readers': self._idle.qsize(),
+            'writer_open': self._writer is not None,
+        }
+    
+    def close(self):
+        """Close every pooled connection; readers still in use close on release"""
+        self.closed = True
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+        
+        with self._writer_lock:
+            if self._writer is not None:
+                self._last_used.pop(id(self._writer), None)
+                try:
+                    self._writer.close()
+                except sqlite3.Error:
+                    pass
+                self._writer = None
@@ -1,152 +1,250 @@
-import sqlite3
 import os
+import threading
 from datetime import datetime
 
+from database.backup import DEFAULT_PAGES_PER_STEP, online_backup, start_background_backup
+from database.bulk import insert_many
+from database.connection_pool import ConnectionPool, DEFAULT_POOL_SIZE
+from database.migrations import apply_migrations, get_schema_version
+from database.profiles import apply_profile, resolve_profile
+from database.search import search_indexes_exist
+from utils.profiling import profile_phase
+
+DEFAULT_BATCH_SIZE = 500
+
+_shared_managers = {}
+_shared_managers_lock = threading.Lock()
+
+def get_database_manager(db_path="farm_management.db"):
+    """Return the process-wide DatabaseManager for a database file
+    
+    The first call creates the manager and bootstraps the schema; later calls
+    reuse it, so every manager and window shares one connection pool.
+    """
+    key = os.path.abspath(db_path)
+    with _shared_managers_lock:
+        manager = _shared_managers.get(key)
+        if manager is None:
+            manager = DatabaseManager(db_path)
+            _shared_managers[key] = manager
+        return manager
+
+def keyset_query(query, params, date_column, id_column, after_id=None, after_date=None,
+                 date_lookup=None, limit=None, offset=None):
+    """Order a listing newest first by (date_column, id_column) and page it
+    
+    query must end in a WHERE clause that conditions can be ANDed onto. Rows
+    with a NULL date sort after every dated row. With after_id only the rows
+    after that row are returned; its date is after_date, or is read with
+    date_lookup (a scalar subquery taking the id) when after_date is None.
+    after_date alone returns the rows older than that date.
+    """
+    order = f" ORDER BY {date_column} DESC, {id_column} DESC"
+    params = list(params)
+    if after_id is None and after_date is None:
+        query += order
+    else:
+        if after_id is None:
+            dated = f" AND {date_column} < ?"
+            undated = f" AND {date_column} IS NULL"
+            dated_params, undated_params = [after_date], []
+        else:
+            after = "?" if after_date is not None else date_lookup
+            after_value = after_date if after_date is not None else after_id
+            dated = f" AND ({date_column}, {id_column}) < ({after}, ?)"
+            undated = f" AND {date_column} IS NULL AND ({after} IS NOT NULL OR {id_column} < ?)"
+            dated_params = undated_params = [after_value, after_id]
+        
+        # A row-value comparison never matches NULL, so the NULL-dated tail is
+        # read separately; both halves stay index range scans and are merged
+        arm_limit = ""
+        arm_params = []
+        if limit:
+            arm_limit = " LIMIT ?"
+            arm_params = [limit + (offset or 0)]
+        query = (f"SELECT * FROM ({query}{dated}{order}{arm_limit})"
+                 f" UNION ALL SELECT * FROM ({query}{undated} ORDER BY {id_column} DESC{arm_limit})"
+                 f" ORDER BY {date_column.split('.')[-1]} DESC, {id_column.split('.')[-1]} DESC")
+        params = (params + dated_params + arm_params) + (params + undated_params + arm_params)
+    
+    if limit or offset:
+        query += " LIMIT ?"
+        params.append(limit or -1)
+    if offset:
+        query += " OFFSET ?"
+        params.append(offset)
+    return query, params
+
 class DatabaseManager:
-    def __init__(self, db_path="farm_management.db"):
+    def __init__(self, db_path="farm_management.db", pool_size=DEFAULT_POOL_SIZE, profile=None):
         self.db_path = db_path
-        self.connection = None
+        self.pool_size = pool_size
+        self.profile = resolve_profile(profile)
+        self.pool = None
+        self._search_indexes = None
         self.create_tables()
     
     def connect(self):
-        """Establish database connection"""
+        """Open the connection pool if it is not already open"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row
+            if self.pool is None or self.pool.closed:
+                self.pool = ConnectionPool(self.db_path, size=self.pool_size,
+                                           on_connect=self._configure_connection)
             return True
         except Exception as e:
             print(f"Database connection error: {e}")
             return False
     
+    def _configure_connection(self, connection):
+        """Apply the active performance profile to a freshly opened connection"""
+        apply_profile(connection, self.profile)
+    
     def disconnect(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
+        """Close every pooled connection"""
+        if self.pool:
+            self.pool.close()
+    
+    def check_health(self):
+        """Ping pooled connections, replacing any broken ones"""
+        if self.pool is None or self.pool.closed:
+            return False
+        return self.pool.check_health()
     
     def create_tables(self):
-        """Create all necessary tables"""
+        """Create all necessary tables by applying pending schema migrations"""
         self.connect()
-        
-        # Farmers table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS farmers (
-                farmer_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                phone TEXT,
-                email TEXT,
-                address TEXT,
-                farm_size REAL,
-                registration_date DATE DEFAULT CURRENT_DATE
-            )
-        ''')
-        
-        # Crops table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS crops (
-                crop_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                variety TEXT,
-                growth_period INTEGER,
-                yield_per_acre REAL,
-                price_per_unit REAL
-            )
-        ''')
-        
-        # Plantings table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS plantings (
-                planting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmer_id INTEGER,
-                crop_id INTEGER,
-                planting_date DATE,
-                area_planted REAL,
-                expected_harvest_date DATE,
-                status TEXT DEFAULT 'Growing',
-                FOREIGN KEY (farmer_id) REFERENCES farmers (farmer_id),
-                FOREIGN KEY (crop_id) REFERENCES crops (crop_id)
-            )
-        ''')
-        
-        # Equipment table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS equipment (
-                equipment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                type TEXT,
-                purchase_date DATE,
-                cost REAL,
-                status TEXT DEFAULT 'Active'
-            )
-        ''')
-        
-        # Inventory table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS inventory (
-                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT,
-                quantity INTEGER,
-                unit TEXT,
-                cost_per_unit REAL,
-                supplier TEXT
-            )
-        ''')
-        
-        # Transactions table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmer_id INTEGER,
-                type TEXT, -- 'income' or 'expense'
-                category TEXT,
-                amount REAL,
-                description TEXT,
-                date DATE DEFAULT CURRENT_DATE,
-                FOREIGN KEY (farmer_id) REFERENCES farmers (farmer_id)
-            )
-        ''')
-        
-        # Weather data table
-        self.connection.execute('''
-            CREATE TABLE IF NOT EXISTS weather_data (
-                weather_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date DATE,
-                temperature REAL,
-                humidity REAL,
-                rainfall REAL,
-                description TEXT
-            )
-        ''')
-        
-        self.connection.commit()
-        self.disconnect()
+        self._search_indexes = None
+        with profile_phase("schema"), self.pool.writer() as connection:
+            return apply_migrations(connection)
+    
+    def has_search_indexes(self):
+        """True when the FTS5 search tables exist; checked once and cached"""
+        if self._search_indexes is None:
+            try:
+                self.connect()
+                with self.pool.reader() as connection:
+                    self._search_indexes = search_indexes_exist(connection)
+            except Exception as e:
+                print(f"Search index check error: {e}")
+                return False
+        return self._search_indexes
+    
+    def get_schema_version(self):
+        """Return the schema version recorded in the database"""
+        self.connect()
+        with self.pool.writer() as connection:
+            return get_schema_version(connection)
     
     def execute_query(self, query, params=None):
         """Execute a query and return results"""
         try:
             self.connect()
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
             if query.strip().upper().startswith('SELECT'):
-                return cursor.fetchall()
-            else:
-                self.connection.commit()
+                with self.pool.reader() as connection:
+                    return connection.execute(query, params or ()).fetchall()
+            
+            with self.pool.writer() as connection:
+                try:
+                    cursor = connection.execute(query, params or ())
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
                 return cursor.rowcount
         except Exception as e:
             print(f"Query execution error: {e}")
             return None
-        finally:
-            self.disconnect()
     
-    def backup_database(self, backup_path):
-        """Create a backup of the database"""
+    def iter_batches(self, query, params=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream the rows of a SELECT as lists of at most batch_size rows
+        
+        The read connection stays checked out until the generator is exhausted
+        or closed, so memory use stays flat however large the result set is.
+        """
+        self.connect()
+        with self.pool.reader() as connection:
+            cursor = connection.execute(query, params or ())
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+    
+    def iter_query(self, query, params=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream the rows of a SELECT one at a time, fetching batch_size rows per round trip"""
+        for rows in self.iter_batches(query, params, batch_size):
+            yield from rows
+    
+    def execute_many(self, query, params_seq):
+        """Run an INSERT for every parameter row in one transaction and return the new ids"""
+        try:
+            self.connect()
+            with self.pool.writer() as connection:
+                try:
+                    connection.execute("BEGIN IMMEDIATE")
+                    ids = insert_many(connection, query, params_seq)
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+            return ids
+        except Exception as e:
+            print(f"Bulk query execution error: {e}")
+            return None
+    
+    def run_in_transaction(self, func, *args):
+        """Call func(connection, *args) inside one write transaction and return its result"""
+        try:
+            self.connect()
+            with self.pool.writer() as connection:
+                try:
+                    connection.execute("BEGIN IMMEDIATE")
+                    result = func(connection, *args)
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+            return result
+        except Exception as e:
+            print(f"Transaction error: {e}")
+            return None
+    
+    def run_read(self, func, *args):
+        """Call func(connection, *args) on one pooled reader inside a read snapshot
+        
+        Every query func makes sees the same committed state, and the whole
+        batch costs a single connection checkout. Returns func's result, or
+        None if it raised.
+        """
+        try:
+            self.connect()
+            with self.pool.reader() as connection:
+                connection.execute("BEGIN")
+                try:
+                    return func(connection, *args)
+                finally:
+                    connection.rollback()
+        except Exception as e:
+            print(f"Read error: {e}")
+            return None
+    
+    def backup_database(self, backup_path, pages_per_step=DEFAULT_PAGES_PER_STEP, progress=None,
+                        compress=False, background=False, on_complete=None):
+        """Create a consistent online backup of the database
+        
+        Uses the SQLite backup API, so the app stays usable and WAL contents are
+        included. With background=True the copy runs on a worker thread and the
+        thread is returned; on_complete(success, path_or_error) reports the result.
+        """
+        options = {'pages_per_step': pages_per_step, 'progress': progress, 'compress': compress}
+        if background:
+            return start_background_backup(self.db_path, backup_path, on_complete=on_complete, **options)
+        
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            online_backup(self.db_path, backup_path, **options)
             return True
         except Exception as e:
             print(f"Backup error: {e}")
@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+
+# Harvest calendar.
+# plantings.harvest_day is expected_harvest_date as a day number (days since
+# 1970-01-01). It sits after status in idx_plantings_harvest_day, together
+# with crop_id and area_planted, so "Growing plantings due between two days"
+# is a range scan of that one index and never touches the table.
+
+EPOCH = date(1970, 1, 1)
+
+def harvest_day_sql(date_expr):
+    """SQL turning a 'YYYY-MM-DD' expression into its day number (NULL stays NULL)"""
+    return f"CAST(strftime('%s', {date_expr}) AS INTEGER) / 86400"
+
+def derived_harvest_date_sql(planting_date_expr, crop_id_expr):
+    """SQL for planting date plus the crop's growth period, or NULL without one"""
+    return f'''(SELECT date({planting_date_expr}, '+' || growth_period || ' days')
+                FROM crops WHERE crop_id = {crop_id_expr} AND growth_period > 0)'''
+
+# Parameters: farmer_id, crop_id, planting_date, area_planted,
+# expected_harvest_date (None to derive it from the crop), status
+INSERT_PLANTING_SQL = f'''
+    INSERT INTO plantings (farmer_id, crop_id, planting_date, area_planted,
+                           expected_harvest_date, status, harvest_day)
+    SELECT ?1, ?2, ?3, ?4, harvest_date, ?6, {harvest_day_sql('harvest_date')}
+    FROM (SELECT COALESCE(NULLIF(?5, ''), {derived_harvest_date_sql('?3', '?2')}) AS harvest_date)
+'''
+
+def to_day(value):
+    """Day number of a date"""
+    return (value - EPOCH).days
+
+def from_day(day):
+    """Date of a day number"""
+    return EPOCH + timedelta(days=day)
+
+def schedule_harvests(connection, first_id=None, last_id=None):
+    """Fill missing harvest dates from crop growth periods and refresh harvest_day
+    
+    Two set-based UPDATEs over the plantings (or the planting_id range
+    first_id..last_id); rows that are already correct are not rewritten.
+    Returns the number of rows changed.
+    """
+    where, params = "", ()
+    if first_id is not None:
+        where, params = " AND planting_id BETWEEN ? AND ?", (first_id, last_id)
+    
+    filled = connection.execute(f'''
+        UPDATE plantings
+        SET expected_harvest_date = {derived_harvest_date_sql('plantings.planting_date', 'plantings.crop_id')}
+        WHERE (expected_harvest_date IS NULL OR expected_harvest_date = '')
+          AND planting_date IS NOT NULL AND planting_date != ''
+          AND crop_id IN (SELECT crop_id FROM crops WHERE growth_period > 0){where}
+    ''', params).rowcount
+    bucketed = connection.execute(f'''
+        UPDATE plantings
+        SET harvest_day = {harvest_day_sql('expected_harvest_date')}
+        WHERE harvest_day IS NOT {harvest_day_sql('expected_harvest_date')}{where}
+    ''', params).rowcount
+    return max(filled, bucketed)
+
+def create_harvest_calendar(connection):
+    """Add plantings.harvest_day, its covering index and sync trigger, and backfill it"""
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(plantings)")]
+    if 'harvest_day' not in columns:
+        connection.execute("ALTER TABLE plantings ADD COLUMN harvest_day INTEGER")
+    
+    # The new index covers every query the (status, expected_harvest_date) one served
+    connection.execute("DROP INDEX IF EXISTS idx_plantings_status_harvest")
+    connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_plantings_harvest_day
+        ON plantings (status, harvest_day, crop_id, area_planted)
+    ''')
+    # Inserts compute harvest_day themselves; this catches later date edits
+    connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_plantings_harvest_day
+        AFTER UPDATE OF expected_harvest_date ON plantings
+        BEGIN
+            UPDATE plantings SET harvest_day = {harvest_day_sql('NEW.expected_harvest_date')}
+            WHERE planting_id = NEW.planting_id;
+        END
+    ''')
+    schedule_harvests(connection)
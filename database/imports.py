@@ -0,0 +1,36 @@
+# Resumable CSV imports.
+# import_checkpoints holds one row per (dataset, source file): how far into
+# the file the import has got, as a byte offset and line number, and how far
+# into its rejects file. The row is updated in the same transaction as each
+# batch of inserted rows, so after a crash the checkpoint and the imported
+# data always agree and the import resumes exactly where it stopped.
+
+def create_import_checkpoints(connection):
+    """Create the import progress table"""
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            byte_offset INTEGER NOT NULL,
+            line_number INTEGER NOT NULL,
+            rejects_offset INTEGER NOT NULL DEFAULT 0,
+            imported INTEGER NOT NULL DEFAULT 0,
+            rejected INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            updated_date DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def read_checkpoint(connection, source):
+    """Return the checkpoint row for source, or None"""
+    return connection.execute("SELECT * FROM import_checkpoints WHERE source = ?", (source,)).fetchone()
+
+def save_checkpoint(connection, source, fingerprint, byte_offset, line_number, rejects_offset,
+                    imported, rejected, completed=False):
+    """Insert or replace the checkpoint for source"""
+    connection.execute('''
+        INSERT OR REPLACE INTO import_checkpoints
+            (source, fingerprint, byte_offset, line_number, rejects_offset,
+             imported, rejected, completed, updated_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (source, fingerprint, byte_offset, line_number, rejects_offset, imported, rejected, int(completed)))
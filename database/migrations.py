@@ -0,0 +1,335 @@
+import sqlite3
+
+from database.bulk import TRIGGERS_ENABLED, create_bulk_control
+from database.changes import create_change_counters
+from database.harvest import create_harvest_calendar
+from database.imports import create_import_checkpoints
+from database.search import create_search_indexes
+
+# Each migration is (version, description, steps). A step is either a SQL
+# statement or a callable taking the connection. Migrations run in version
+# order, each inside its own transaction, and are recorded in schema_version
+# so they are applied exactly once per database.
+
+def _create_base_tables(connection):
+    """Create the original application tables"""
+    # Farmers table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS farmers (
+            farmer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            farm_size REAL,
+            registration_date DATE DEFAULT CURRENT_DATE
+        )
+    ''')
+    
+    # Crops table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS crops (
+            crop_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            variety TEXT,
+            growth_period INTEGER,
+            yield_per_acre REAL,
+            price_per_unit REAL
+        )
+    ''')
+    
+    # Plantings table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS plantings (
+            planting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            farmer_id INTEGER,
+            crop_id INTEGER,
+            planting_date DATE,
+            area_planted REAL,
+            expected_harvest_date DATE,
+            status TEXT DEFAULT 'Growing',
+            FOREIGN KEY (farmer_id) REFERENCES farmers (farmer_id),
+            FOREIGN KEY (crop_id) REFERENCES crops (crop_id)
+        )
+    ''')
+    
+    # Equipment table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS equipment (
+            equipment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT,
+            purchase_date DATE,
+            cost REAL,
+            status TEXT DEFAULT 'Active'
+        )
+    ''')
+    
+    # Inventory table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT,
+            quantity INTEGER,
+            unit TEXT,
+            cost_per_unit REAL,
+            supplier TEXT
+        )
+    ''')
+    
+    # Transactions table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            farmer_id INTEGER,
+            type TEXT, -- 'income' or 'expense'
+            category TEXT,
+            amount REAL,
+            description TEXT,
+            date DATE DEFAULT CURRENT_DATE,
+            FOREIGN KEY (farmer_id) REFERENCES farmers (farmer_id)
+        )
+    ''')
+    
+    # Weather data table
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS weather_data (
+            weather_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE,
+            temperature REAL,
+            humidity REAL,
+            rainfall REAL,
+            description TEXT
+        )
+    ''')
+
+# finance_rollup keeps per (year, month, farmer, type, category) totals of the
+# transactions table. NULL keys are folded to 0 / '' so upserts can match them.
+def _rollup_keys(ref):
+    """Return the rollup key expressions for a NEW/OLD row reference"""
+    return (
+        f"COALESCE(CAST(strftime('%Y', {ref}.date) AS INTEGER), 0)",
+        f"COALESCE(CAST(strftime('%m', {ref}.date) AS INTEGER), 0)",
+        f"COALESCE({ref}.farmer_id, 0)",
+        f"COALESCE({ref}.type, '')",
+        f"COALESCE({ref}.category, '')",
+    )
+
+def _rollup_add_sql(ref):
+    """SQL adding one transaction row to its rollup bucket"""
+    year, month, farmer_id, type_, category = _rollup_keys(ref)
+    return f'''
+        INSERT INTO finance_rollup (year, month, farmer_id, type, category, total_amount, transaction_count)
+        VALUES ({year}, {month}, {farmer_id}, {type_}, {category}, COALESCE({ref}.amount, 0), 1)
+        ON CONFLICT (year, month, farmer_id, type, category) DO UPDATE SET
+            total_amount = total_amount + excluded.total_amount,
+            transaction_count = transaction_count + 1;
+    '''
+
+def _rollup_remove_sql(ref):
+    """SQL removing one transaction row from its rollup bucket"""
+    year, month, farmer_id, type_, category = _rollup_keys(ref)
+    match = (f"year = {year} AND month = {month} AND farmer_id = {farmer_id} "
+             f"AND type = {type_} AND category = {category}")
+    return f'''
+        UPDATE finance_rollup
+        SET total_amount = total_amount - COALESCE({ref}.amount, 0),
+            transaction_count = transaction_count - 1
+        WHERE {match};
+        DELETE FROM finance_rollup WHERE {match} AND transaction_count <= 0;
+    '''
+
+def apply_finance_rollup_range(connection, first_id, last_id):
+    """Fold a contiguous range of new transactions into finance_rollup at once"""
+    connection.execute('''
+        INSERT INTO finance_rollup (year, month, farmer_id, type, category, total_amount, transaction_count)
+        SELECT COALESCE(CAST(strftime('%Y', date) AS INTEGER), 0),
+               COALESCE(CAST(strftime('%m', date) AS INTEGER), 0),
+               COALESCE(farmer_id, 0),
+               COALESCE(type, ''),
+               COALESCE(category, ''),
+               COALESCE(SUM(amount), 0),
+               COUNT(*)
+        FROM transactions
+        WHERE transaction_id BETWEEN ? AND ?
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (year, month, farmer_id, type, category) DO UPDATE SET
+            total_amount = total_amount + excluded.total_amount,
+            transaction_count = transaction_count + excluded.transaction_count
+    ''', (first_id, last_id))
+
+def rebuild_finance_rollups(connection):
+    """Recompute finance_rollup from scratch and return the number of buckets"""
+    connection.execute("DELETE FROM finance_rollup")
+    cursor = connection.execute('''
+        INSERT INTO finance_rollup (year, month, farmer_id, type, category, total_amount, transaction_count)
+        SELECT COALESCE(CAST(strftime('%Y', date) AS INTEGER), 0),
+               COALESCE(CAST(strftime('%m', date) AS INTEGER), 0),
+               COALESCE(farmer_id, 0),
+               COALESCE(type, ''),
+               COALESCE(category, ''),
+               COALESCE(SUM(amount), 0),
+               COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5
+    ''')
+    return cursor.rowcount
+
+def _create_finance_rollups(connection):
+    """Create the rollup table, its maintenance triggers and initial contents"""
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS finance_rollup (
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            farmer_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total_amount REAL NOT NULL DEFAULT 0,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (year, month, farmer_id, type, category)
+        ) WITHOUT ROWID
+    ''')
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_finance_rollup_farmer ON finance_rollup (farmer_id, year, month)"
+    )
+    # Bulk inserts defer the insert trigger inside their own transaction and
+    # fold the whole batch in with apply_finance_rollup_range instead of row by row
+    create_bulk_control(connection)
+    connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+        AFTER INSERT ON transactions
+        WHEN {TRIGGERS_ENABLED}
+        BEGIN
+            {_rollup_add_sql('NEW')}
+        END
+    ''')
+    connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_delete
+        AFTER DELETE ON transactions
+        BEGIN
+            {_rollup_remove_sql('OLD')}
+        END
+    ''')
+    connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+        AFTER UPDATE OF farmer_id, type, category, amount, date ON transactions
+        BEGIN
+            {_rollup_remove_sql('OLD')}
+            {_rollup_add_sql('NEW')}
+        END
+    ''')
+    rebuild_finance_rollups(connection)
+
+MIGRATIONS = [
+    (1, "Create base tables", [_create_base_tables]),
+    (2, "Index hot query columns", [
+        "CREATE INDEX IF NOT EXISTS idx_plantings_farmer_date ON plantings (farmer_id, planting_date)",
+        "CREATE INDEX IF NOT EXISTS idx_plantings_status_harvest ON plantings (status, expected_harvest_date)",
+        "CREATE INDEX IF NOT EXISTS idx_plantings_crop ON plantings (crop_id)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_farmer_date ON transactions (farmer_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date)",
+    ]),
+    (3, "Create users table", ['''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            full_name TEXT,
+            role TEXT DEFAULT 'user',
+            created_date DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''']),
+    (4, "Index transaction amounts for top-N queries", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_amount ON transactions (type, amount)",
+    ]),
+    (5, "Create trigger-maintained financial rollups", [_create_finance_rollups]),
+    (6, "Index listing sort orders for keyset pagination", [
+        "CREATE INDEX IF NOT EXISTS idx_farmers_name ON farmers (name)",
+        "CREATE INDEX IF NOT EXISTS idx_plantings_planting_date ON plantings (planting_date)",
+    ]),
+    (7, "Create full-text search indexes", [create_search_indexes]),
+    (8, "Create per-table change counters", [create_change_counters]),
+    (9, "Index user names for case-insensitive prefix search", [
+        "CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users (username COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_users_full_name_nocase ON users (full_name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_users_email_nocase ON users (email COLLATE NOCASE)",
+    ]),
+    (10, "Store harvest dates as indexed day numbers", [create_harvest_calendar]),
+    (11, "Cover per-farmer planting totals with the farmer index", [
+        "CREATE INDEX IF NOT EXISTS idx_plantings_farmer_date_area ON plantings (farmer_id, planting_date, area_planted)",
+        "DROP INDEX IF EXISTS idx_plantings_farmer_date",
+    ]),
+    (12, "Track resumable CSV import progress", [create_import_checkpoints]),
+    (13, "Cover planting areas by status, farmer and crop", [
+        "CREATE INDEX IF NOT EXISTS idx_plantings_status_farmer_crop ON plantings (status, farmer_id, crop_id, area_planted)",
+    ]),
+]
+
+LATEST_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+def ensure_version_table(connection):
+    """Create the schema_version bookkeeping table"""
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_date DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    connection.commit()
+
+def get_schema_version(connection):
+    """Return the highest migration version applied to the database"""
+    ensure_version_table(connection)
+    row = connection.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def apply_migrations(connection, migrations=MIGRATIONS):
+    """Apply every pending migration and return the list of versions applied"""
+    latest = max(version for version, _, _ in migrations)
+    
+    # Fast path: the header's user_version mirrors schema_version, so an
+    # up-to-date database costs a single PRAGMA read on startup
+    if connection.execute("PRAGMA user_version").fetchone()[0] >= latest:
+        return []
+    
+    current = get_schema_version(connection)
+    applied = []
+    
+    for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            # Another process may have applied it while we waited for the lock
+            if connection.execute("SELECT 1 FROM schema_version WHERE version = ?",
+                                  (version,)).fetchone():
+                connection.commit()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(connection)
+                else:
+                    connection.execute(step)
+            connection.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            connection.execute(f"PRAGMA user_version = {int(version)}")
+            connection.commit()
+        except sqlite3.Error as e:
+            connection.rollback()
+            raise sqlite3.DatabaseError(f"Migration {version} ({description}) failed: {e}") from e
+        
+        applied.append(version)
+    
+    if not applied:
+        # Databases migrated before user_version was tracked
+        connection.execute(f"PRAGMA user_version = {int(get_schema_version(connection))}")
+        connection.commit()
+    
+    return applied
@@ -0,0 +1,66 @@
+import os
+
+# Named SQLite tuning profiles applied to every connection the pool opens.
+# cache_size is negative to mean KiB rather than pages; mmap_size is bytes.
+PROFILES = {
+    # Plain SQLite defaults (rollback journal, full sync). Use this when the
+    # database lives on a network share, where WAL is not safe. WAL mode is
+    # persistent in the file, so it has to be switched off explicitly.
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+    },
+    
+    # Everyday GUI use: readers never block the writer and commits are cheap
+    'desktop': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    },
+    
+    # Large imports: skip fsyncs and give the writer a big page cache
+    'bulk-load': {
+        'busy_timeout': 30000,
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    },
+    
+    # Reporting workstations that mostly scan large tables
+    'read-heavy': {
+        'busy_timeout': 10000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -131072,
+        'mmap_size': 1073741824,
+        'temp_store': 'MEMORY',
+    },
+}
+
+DEFAULT_PROFILE = 'desktop'
+PROFILE_ENV_VAR = 'FMS_DB_PROFILE'
+
+# busy_timeout goes first so switching journal_mode waits out other
+# connections' locks; journal_mode then precedes the remaining settings
+PRAGMA_ORDER = ('busy_timeout', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+def resolve_profile(name=None):
+    """Pick the profile name from the argument, the environment or the default"""
+    name = name or os.environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE
+    if name not in PROFILES:
+        print(f"Unknown database profile '{name}', using '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE
+    return name
+
+def apply_profile(connection, name):
+    """Apply the PRAGMA settings of a named profile to a connection"""
+    settings = PROFILES[name]
+    for pragma in PRAGMA_ORDER:
+        if pragma in settings:
+            # PRAGMA values cannot be bound as parameters; they come from PROFILES only
+            connection.execute(f"PRAGMA {pragma} = {settings[pragma]}").fetchall()
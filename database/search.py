@@ -0,0 +1,166 @@
+import re
+import sqlite3
+import unicodedata
+
+from database.bulk import TRIGGERS_ENABLED
+
+# Full-text search over farmers and transactions using SQLite FTS5.
+# The FTS tables are external-content indexes: they store only the index and
+# read column values back from farmers / transactions, and triggers keep them
+# in step with every insert, update and delete. Queries are token-prefix
+# matches, so "ram ku" finds "Ramesh Kumar" and "555 12" finds "555-1234".
+
+FARMER_FTS_COLUMNS = ('name', 'phone', 'email', 'address')
+TRANSACTION_FTS_COLUMNS = ('description', 'category')
+
+# bm25 column weights: a hit in the name counts more than one in the address
+FARMER_RANK = "bm25(farmers_fts, 10.0, 4.0, 4.0, 1.0)"
+TRANSACTION_RANK = "bm25(transactions_fts, 2.0, 1.0)"
+
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def fts5_available(connection):
+    """True when this SQLite build can create FTS5 tables"""
+    try:
+        connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(content)")
+        connection.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def tokenize(text):
+    """Split text into the lower-case, accent-free tokens the FTS tokenizer produces"""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize('NFKD', str(text).lower())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(stripped)
+
+def build_fts_query(search_term):
+    """Turn free text into an FTS5 MATCH expression, or None if it has no tokens
+    
+    Every token must match the start of some word in the row. Tokens are
+    quoted, so FTS5 operators typed by the user are searched as plain text.
+    """
+    tokens = tokenize(search_term)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+def matches_tokens(search_term, values):
+    """In-memory equivalent of an FTS prefix query over the given column values"""
+    words = [word for value in values for word in tokenize(value)]
+    return all(any(word.startswith(token) for word in words) for token in tokenize(search_term))
+
+def narrows_tokens(previous_term, search_term):
+    """True when every row matching search_term also matches previous_term"""
+    tokens = tokenize(search_term)
+    return all(any(token.startswith(previous) for token in tokens) for previous in tokenize(previous_term))
+
+def _fts_triggers(table, fts_table, key, columns, insert_condition=None):
+    """Trigger statements keeping an external-content FTS table in sync"""
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f"NEW.{column}" for column in columns)
+    old_values = ', '.join(f"OLD.{column}" for column in columns)
+    delete_old = (f"INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) "
+                  f"VALUES ('delete', OLD.{key}, {old_values});")
+    insert_new = f"INSERT INTO {fts_table} (rowid, {column_list}) VALUES (NEW.{key}, {new_values});"
+    when = f"WHEN {insert_condition}" if insert_condition else ""
+    return [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert
+        AFTER INSERT ON {table}
+        {when}
+        BEGIN
+            {insert_new}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            {delete_old}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update
+        AFTER UPDATE OF {column_list} ON {table}
+        BEGIN
+            {delete_old}
+            {insert_new}
+        END
+        ''',
+    ]
+
+def create_search_indexes(connection):
+    """Create the FTS5 tables and triggers and index the existing rows
+    
+    Builds without FTS5 are left without the tables; searches then fall back
+    to LIKE scans.
+    """
+    if not fts5_available(connection):
+        print("SQLite FTS5 is not available; full-text search will use LIKE scans")
+        return
+    
+    connection.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS farmers_fts USING fts5(
+            {', '.join(FARMER_FTS_COLUMNS)},
+            content='farmers', content_rowid='farmer_id',
+            tokenize='{TOKENIZER}', prefix='2 3'
+        )
+    ''')
+    connection.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            {', '.join(TRANSACTION_FTS_COLUMNS)},
+            content='transactions', content_rowid='transaction_id',
+            tokenize='{TOKENIZER}', prefix='2 3'
+        )
+    ''')
+    
+    # Bulk inserts defer the insert triggers and index their whole id range
+    # at once afterwards, exactly as they do for the finance rollups
+    for statement in _fts_triggers('farmers', 'farmers_fts', 'farmer_id', FARMER_FTS_COLUMNS, TRIGGERS_ENABLED):
+        connection.execute(statement)
+    for statement in _fts_triggers('transactions', 'transactions_fts', 'transaction_id',
+                                   TRANSACTION_FTS_COLUMNS, TRIGGERS_ENABLED):
+        connection.execute(statement)
+    
+    rebuild_search_indexes(connection)
+
+def search_indexes_exist(connection):
+    """True when the FTS tables have been created in this database"""
+    row = connection.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name IN ('farmers_fts', 'transactions_fts')"
+    ).fetchone()
+    return row[0] == 2
+
+def _index_range(connection, table, fts_table, key, columns, first_id, last_id):
+    """Add a contiguous id range of new rows to an FTS index"""
+    if not search_indexes_exist(connection):
+        return
+    column_list = ', '.join(columns)
+    connection.execute(f'''
+        INSERT INTO {fts_table} (rowid, {column_list})
+        SELECT {key}, {column_list}
+        FROM {table}
+        WHERE {key} BETWEEN ? AND ?
+    ''', (first_id, last_id))
+
+def index_farmer_range(connection, first_id, last_id):
+    """Add a contiguous range of new farmers to the full-text index"""
+    _index_range(connection, 'farmers', 'farmers_fts', 'farmer_id', FARMER_FTS_COLUMNS, first_id, last_id)
+
+def index_transaction_range(connection, first_id, last_id):
+    """Add a contiguous range of new transactions to the full-text index"""
+    _index_range(connection, 'transactions', 'transactions_fts', 'transaction_id',
+                 TRANSACTION_FTS_COLUMNS, first_id, last_id)
+
+def rebuild_search_indexes(connection):
+    """Rebuild both FTS indexes from their content tables and return True"""
+    if not search_indexes_exist(connection):
+        return False
+    connection.execute("INSERT INTO farmers_fts (farmers_fts) VALUES ('rebuild')")
+    connection.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    return True
@@ -0,0 +1,52 @@
+import tkinter as tk
+
+AUTO_REFRESH_MS = 1000
+
+class AutoRefresh:
+    """Poll a ChangeMonitor with root.after and report which tables changed
+    
+    on_change(tables) runs on the Tk thread with the set of changed table
+    names, only when something was committed since the previous poll. An idle
+    poll is a single PRAGMA on the monitor's connection.
+    """
+    
+    def __init__(self, root, monitor, on_change, interval_ms=AUTO_REFRESH_MS):
+        self.root = root
+        self.monitor = monitor
+        self.on_change = on_change
+        self.interval_ms = interval_ms
+        self._after_id = None
+    
+    def start(self):
+        """Record the current state and start polling"""
+        self.stop()
+        self._check()
+    
+    def stop(self):
+        """Stop polling; start() resumes it"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+    
+    def close(self):
+        """Stop polling and release the monitor's connection"""
+        self.stop()
+        self.monitor.close()
+    
+    def _check(self):
+        self._after_id = None
+        try:
+            changed = self.monitor.poll()
+            if changed:
+                self.on_change(changed)
+        except Exception as e:
+            print(f"Change detection error: {e}")
+        
+        try:
+            self._after_id = self.root.after(self.interval_ms, self._check)
+        except tk.TclError:
+            # The window is gone
+            self._after_id = None
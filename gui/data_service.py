@@ -0,0 +1,173 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncDataService:
+    """Run manager calls on a database worker thread and deliver results to Tk
+    
+    Every request has a key (for example the tab it feeds). Submitting a new
+    request under the same key supersedes the old one, and cancel(key) drops
+    it outright; results of superseded or cancelled requests are discarded.
+    Callbacks always run on the Tk thread, scheduled through root.after.
+    """
+    
+    POLL_INTERVAL_MS = 25
+    
+    def __init__(self, root, farmer_manager=None, crop_manager=None, finance_manager=None, max_workers=1):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._results = queue.Queue()
+        self._generations = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._poll_id = None
+        self._closed = False
+        
+        # Facades: service.farmers.get_all_farmers(on_success=...) and so on
+        self.farmers = _ManagerProxy(self, farmer_manager)
+        self.crops = _ManagerProxy(self, crop_manager)
+        self.finance = _ManagerProxy(self, finance_manager)
+    
+    def _next_token(self, key):
+        """Register a new request for key and return its token"""
+        with self._lock:
+            token = self._generations.get(key, 0) + 1
+            self._generations[key] = token
+            self._inflight[key] = token
+            self._pending += 1
+            return token
+    
+    def is_current(self, key, token):
+        """True while the request identified by token is still the latest for key"""
+        with self._lock:
+            return not self._closed and self._generations.get(key) == token
+    
+    def has_pending(self, key):
+        """True while the latest request for key has not delivered its result"""
+        with self._lock:
+            return key in self._inflight
+    
+    def submit(self, key, func, *args, on_success=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) on the worker thread and return the request token"""
+        if self._closed:
+            return None
+        token = self._next_token(key)
+        
+        def task():
+            # Skip work that was superseded while it sat in the queue
+            if not self.is_current(key, token):
+                self._results.put((key, token, 'skip', None, None))
+                return
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._results.put((key, token, 'error', e, on_error))
+                return
+            self._results.put((key, token, 'done', result, on_success))
+        
+        self._executor.submit(task)
+        self._schedule_poll()
+        return token
+    
+    def submit_stream(self, key, func, *args, on_batch=None, on_done=None, on_error=None, **kwargs):
+        """Iterate func(*args, **kwargs) on the worker, delivering each item to on_batch
+        
+        func should return an iterator of row batches. Iteration stops as soon as
+        the request is superseded or cancelled. on_done(count) gets the number of
+        batches once the iterator is exhausted.
+        """
+        if self._closed:
+            return None
+        token = self._next_token(key)
+        
+        def task():
+            count = 0
+            try:
+                for batch in func(*args, **kwargs):
+                    if not self.is_current(key, token):
+                        self._results.put((key, token, 'skip', None, None))
+                        return
+                    self._results.put((key, token, 'batch', batch, on_batch))
+                    count += 1
+            except Exception as e:
+                self._results.put((key, token, 'error', e, on_error))
+                return
+            self._results.put((key, token, 'done', count, on_done))
+        
+        self._executor.submit(task)
+        self._schedule_poll()
+        return token
+    
+    def cancel(self, key=None):
+        """Drop pending results for key, or for every key when key is None"""
+        with self._lock:
+            keys = list(self._generations) if key is None else [key]
+            for name in keys:
+                self._generations[name] = self._generations.get(name, 0) + 1
+                self._inflight.pop(name, None)
+    
+    def _schedule_poll(self):
+        """Make sure the Tk-side result pump is running"""
+        if self._poll_id is None and not self._closed:
+            try:
+                self._poll_id = self.root.after(self.POLL_INTERVAL_MS, self._poll)
+            except tk.TclError:
+                self._poll_id = None
+    
+    def _poll(self):
+        """Deliver finished results on the Tk thread"""
+        self._poll_id = None
+        while True:
+            try:
+                key, token, kind, value, callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind != 'batch':
+                # Streamed batches come before their request's final message
+                with self._lock:
+                    self._pending -= 1
+                    if self._inflight.get(key) == token:
+                        del self._inflight[key]
+            if kind == 'skip' or not self.is_current(key, token):
+                continue
+            try:
+                if callback:
+                    callback(value)
+                elif kind == 'error':
+                    print(f"Background request '{key}' failed: {value}")
+            except Exception as e:
+                print(f"Callback for '{key}' failed: {e}")
+        
+        with self._lock:
+            pending = self._pending
+        if pending > 0:
+            self._schedule_poll()
+    
+    def shutdown(self):
+        """Cancel everything and stop the worker thread"""
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class _ManagerProxy:
+    """Expose a manager's methods as non-blocking calls on an AsyncDataService"""
+    
+    def __init__(self, service, manager):
+        self._service = service
+        self._manager = manager
+    
+    def __getattr__(self, name):
+        method = getattr(self._manager, name)
+        
+        def call(*args, key=None, on_success=None, on_error=None, **kwargs):
+            return self._service.submit(key or name, method, *args,
+                                        on_success=on_success, on_error=on_error, **kwargs)
+        
+        return call
@@ -0,0 +1,69 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+EXPORT_KEY = 'export'
+
+class ExportDialog:
+    """Progress window for one export running on an AsyncDataService
+    
+    The export streams (rows_written, total_rows) steps from
+    ExportManager.iter_export; each step moves the progress bar on the Tk
+    thread. Cancel (or closing the window) cancels the request, which stops
+    the worker at its next batch and removes the partial file.
+    """
+    
+    def __init__(self, root, data_service, export_manager, dataset, path, **filters):
+        self.root = root
+        self.data_service = data_service
+        self.export_manager = export_manager
+        self.dataset = dataset
+        self.path = path
+        self.filters = filters
+        self.rows_written = 0
+        
+        self.window = tk.Toplevel(root)
+        self.window.title("Export")
+        self.window.transient(root)
+        self.window.resizable(False, False)
+        
+        self.status_label = ttk.Label(self.window, text=f"Exporting {dataset}...")
+        self.status_label.pack(padx=20, pady=(15, 5), anchor=tk.W)
+        self.progress = ttk.Progressbar(self.window, length=320, mode='determinate')
+        self.progress.pack(padx=20, pady=5)
+        ttk.Button(self.window, text="Cancel", command=self.cancel).pack(pady=(5, 15))
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+    
+    @staticmethod
+    def is_running(data_service):
+        """True while an export is in progress on data_service"""
+        return data_service.has_pending(EXPORT_KEY)
+    
+    def start(self):
+        """Submit the export to the worker thread"""
+        self.data_service.submit_stream(EXPORT_KEY, self.export_manager.iter_export,
+                                        self.dataset, self.path, on_batch=self.on_progress,
+                                        on_done=self.on_done, on_error=self.on_error, **self.filters)
+    
+    def on_progress(self, step):
+        self.rows_written, total = step
+        self.progress.configure(maximum=max(total, 1), value=self.rows_written)
+        self.status_label.configure(text=f"Exported {self.rows_written:,} of {total:,} {self.dataset}")
+    
+    def on_done(self, _):
+        self.close()
+        messagebox.showinfo("Export", f"Exported {self.rows_written:,} {self.dataset} to {self.path}")
+    
+    def on_error(self, error):
+        self.close()
+        messagebox.showerror("Error", f"Export failed: {str(error)}")
+    
+    def cancel(self):
+        """Stop the export and discard the partial file"""
+        self.data_service.cancel(EXPORT_KEY)
+        self.close()
+    
+    def close(self):
+        try:
+            self.window.destroy()
+        except tk.TclError:
+            pass
@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
 from datetime import datetime
-import hashlib
 import re
 
+from database.db_manager import get_database_manager
+from modules.auth import get_auth_service
+from gui.data_service import AsyncDataService
+
 class LoginWindow:
     def __init__(self, root):
         self.root = root
@@ -16,6 +18,9 @@ class LoginWindow:
         # Center the window
         self.center_window()
         
+        # Password hashing and account lookups run on this worker
+        self.data_service = None
+        
         # Initialize database
         self.init_database()
         
@@ -34,36 +39,26 @@ class LoginWindow:
     def init_database(self):
         """Initialize user database"""
         try:
-            self.conn = sqlite3.connect('farm_management.db')
-            self.cursor = self.conn.cursor()
-            
-            # Create users table if not exists
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    full_name TEXT,
-                    role TEXT DEFAULT 'user',
-                    created_date DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create default admin user if not exists
-            self.cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
-            if self.cursor.fetchone()[0] == 0:
-                admin_password = self.hash_password("admin123")
-                self.cursor.execute('''
-                    INSERT INTO users (username, email, password_hash, full_name, role)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', ('admin', 'admin@farm.com', admin_password, 'System Administrator', 'admin'))
+            # The shared manager has already created the users table
+            self.db = get_database_manager()
+            self.auth = get_auth_service()
+            self.user_manager = self.auth.user_manager
             
-            self.conn.commit()
+            # Create default admin user if not exists; a login submitted
+            # meanwhile queues behind it on the same worker
+            self.run_in_background('bootstrap', self.create_default_admin,
+                                   on_error=lambda e: messagebox.showerror(
+                                       "Database Error", f"Failed to initialize database: {str(e)}"))
             
         except Exception as e:
             messagebox.showerror("Database Error", f"Failed to initialize database: {str(e)}")
     
+    def create_default_admin(self):
+        """Create the default admin account when it is missing; runs on the worker"""
+        if not self.user_manager.get_user_by_username('admin'):
+            if not self.auth.register('admin', 'admin@farm.com', "admin123", 'System Administrator', 'admin'):
+                raise RuntimeError("users table is not available")
+    
     def create_widgets(self):
         """Create the login/signup interface with CSS-like styling"""
         # Main container with gradient-like background
@@ -178,11 +173,11 @@ class LoginWindow:
         self.login_password.pack(fill=tk.X, pady=(0, 0), ipady=12)
         
         # Login button with modern CSS-like styling
-        login_btn = tk.Button(form_frame, text="Sign In", font=("Arial", 16, "bold"),
+        self.login_btn = tk.Button(form_frame, text="Sign In", font=("Arial", 16, "bold"),
                              bg='#059669', fg='white', relief='flat', 
                              padx=50, pady=15, cursor='hand2', command=self.login,
                              activebackground='#047857', activeforeground='white')
-        login_btn.pack(pady=(0, 30))
+        self.login_btn.pack(pady=(0, 30))
         
         # Demo credentials with modern styling
         demo_frame = tk.Frame(form_frame, bg='#f8fafc', relief='flat', bd=1)
@@ -302,11 +297,11 @@ class LoginWindow:
         self.signup_confirm_password.pack(fill=tk.X, pady=(0, 0), ipady=12)
         
         # Signup button with modern CSS-like styling
-        signup_btn = tk.Button(form_frame, text="Create Account", font=("Arial", 16, "bold"),
+        self.signup_btn = tk.Button(form_frame, text="Create Account", font=("Arial", 16, "bold"),
                                bg='#3b82f6', fg='white', relief='flat', 
                                padx=50, pady=15, cursor='hand2', command=self.signup,
                                activebackground='#2563eb', activeforeground='white')
-        signup_btn.pack(pady=(0, 30))
+        self.signup_btn.pack(pady=(0, 30))
         
         # Set focus to first field and bind Enter key for navigation
         self.signup_fullname.focus_set()
@@ -320,9 +315,18 @@ class LoginWindow:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
     
-    def hash_password(self, password):
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    def run_in_background(self, key, func, *args, on_success=None, on_error=None):
+        """Run a slow call such as password hashing off the Tk thread"""
+        if self.data_service is None:
+            self.data_service = AsyncDataService(self.root)
+        self.data_service.submit(key, func, *args, on_success=on_success, on_error=on_error)
+    
+    def set_busy(self, busy):
+        """Disable the form buttons while a request is running"""
+        state = tk.DISABLED if busy else tk.NORMAL
+        self.login_btn.config(state=state)
+        self.signup_btn.config(state=state)
+        self.root.config(cursor='watch' if busy else '')
     
     def validate_email(self, email):
         """Validate email format"""
@@ -338,25 +342,25 @@ class LoginWindow:
             messagebox.showerror("Error", "Please enter both username and password")
             return
         
-        try:
-            # Check credentials
-            password_hash = self.hash_password(password)
-            self.cursor.execute('''
-                SELECT user_id, username, full_name, role FROM users 
-                WHERE username = ? AND password_hash = ?
-            ''', (username, password_hash))
-            
-            user = self.cursor.fetchone()
-            
-            if user:
-                messagebox.showinfo("Success", f"Welcome back, {user[2]}!")
-                self.root.destroy()  # Close login window
-                self.open_main_application(user)
-            else:
-                messagebox.showerror("Error", "Invalid username or password")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Login failed: {str(e)}")
+        # Key derivation is deliberately slow, so keep it off the Tk thread
+        self.set_busy(True)
+        self.run_in_background('login', self.auth.authenticate, username, password,
+                               on_success=self.on_login_result, on_error=self.on_login_error)
+    
+    def on_login_result(self, user):
+        """Finish a login once the credentials have been checked"""
+        self.set_busy(False)
+        if user:
+            messagebox.showinfo("Success", f"Welcome back, {user[2]}!")
+            self.data_service.shutdown()
+            self.root.destroy()  # Close login window
+            self.open_main_application(user)
+        else:
+            messagebox.showerror("Error", "Invalid username or password")
+    
+    def on_login_error(self, error):
+        self.set_busy(False)
+        messagebox.showerror("Error", f"Login failed: {str(error)}")
     
     def signup(self):
         """Handle signup"""
@@ -387,36 +391,42 @@ class LoginWindow:
             messagebox.showerror("Error", "Passwords do not match")
             return
         
-        try:
-            # Check if username or email already exists
-            self.cursor.execute("SELECT COUNT(*) FROM users WHERE username = ? OR email = ?", 
-                              (username, email))
-            if self.cursor.fetchone()[0] > 0:
-                messagebox.showerror("Error", "Username or email already exists")
-                return
-            
-            # Create new user
-            password_hash = self.hash_password(password)
-            self.cursor.execute('''
-                INSERT INTO users (username, email, password_hash, full_name, role)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (username, email, password_hash, fullname, 'user'))
-            
-            self.conn.commit()
-            messagebox.showinfo("Success", "Account created successfully! You can now login.")
-            
-            # Clear form
-            self.signup_fullname.delete(0, tk.END)
-            self.signup_username.delete(0, tk.END)
-            self.signup_email.delete(0, tk.END)
-            self.signup_password.delete(0, tk.END)
-            self.signup_confirm_password.delete(0, tk.END)
-            
-            # Switch to login tab
-            self.notebook.select(0)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Signup failed: {str(e)}")
+        # Create new user; the duplicate check and hashing run on the worker
+        self.set_busy(True)
+        self.run_in_background('signup', self.register_user, username, email, password, fullname,
+                               on_success=self.on_signup_result, on_error=self.on_signup_error)
+    
+    def register_user(self, username, email, password, fullname):
+        """Create an account unless the username or email is taken; runs on the worker"""
+        if self.user_manager.user_exists(username, email):
+            raise ValueError("Username or email already exists")
+        return self.auth.register(username, email, password, fullname, 'user')
+    
+    def on_signup_result(self, inserted):
+        """Finish a signup once the account has been stored"""
+        self.set_busy(False)
+        if not inserted:
+            self.on_signup_error(RuntimeError("could not create the account"))
+            return
+        
+        messagebox.showinfo("Success", "Account created successfully! You can now login.")
+        
+        # Clear form
+        self.signup_fullname.delete(0, tk.END)
+        self.signup_username.delete(0, tk.END)
+        self.signup_email.delete(0, tk.END)
+        self.signup_password.delete(0, tk.END)
+        self.signup_confirm_password.delete(0, tk.END)
+        
+        # Switch to login tab
+        self.notebook.select(0)
+    
+    def on_signup_error(self, error):
+        self.set_busy(False)
+        if isinstance(error, ValueError):
+            messagebox.showerror("Error", str(error))
+        else:
+            messagebox.showerror("Error", f"Signup failed: {str(error)}")
     
     def open_main_application(self, user):
         """Open the main application after successful login"""
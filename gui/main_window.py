@@ -1,21 +1,55 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
+from gui.data_service import AsyncDataService
+from gui.virtual_tree import VirtualTreeview
+from gui.search_controller import SearchController
+from gui.tree_sync import TreeReconciler
+from gui.auto_refresh import AutoRefresh
+from database.changes import ChangeMonitor
+from modules.dashboard import LEADERBOARD_PAGE_SIZE, LEADERBOARD_SORTS, DashboardManager
+from modules.analytics import AnalyticsManager
+from modules.harvest import DEFAULT_DAYS_AHEAD, HarvestCalendar
+from modules.user import UserManager
+from modules.auth import get_auth_service
+from utils.profiling import profile_phase
 # import matplotlib.pyplot as plt
 # from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 # import matplotlib
 # matplotlib.use('TkAgg')
 
 class MainWindow:
-    def __init__(self, root, farmer_manager, crop_manager, finance_manager, user=None):
+    def __init__(self, root, farmer_manager, crop_manager, finance_manager, user=None, dashboard_manager=None,
+                 user_manager=None, auth_service=None, analytics_manager=None, harvest_calendar=None,
+                 export_manager=None):
         self.root = root
         self.farmer_manager = farmer_manager
         self.crop_manager = crop_manager
         self.finance_manager = finance_manager
+        self.dashboard_manager = dashboard_manager or DashboardManager(farmer_manager.db)
+        self.user_manager = user_manager or UserManager(farmer_manager.db)
+        self.analytics_manager = analytics_manager or AnalyticsManager(farmer_manager.db)
+        self.harvest_calendar = harvest_calendar or HarvestCalendar(farmer_manager.db)
+        # Created on the first export, like the modules it needs
+        self.export_manager = export_manager
+        self.auth_service = auth_service or get_auth_service()
         self.user = user
+        self.financial_summary = None
         
-        self.setup_ui()
+        # Database work runs on a worker thread; results come back via root.after
+        self.data_service = AsyncDataService(root, farmer_manager, crop_manager, finance_manager)
+        # Exports get their own worker so a long one does not hold up tab loads
+        self.export_service = AsyncDataService(root)
+        self.stale_tabs = set()
+        
+        # Reload tabs when their tables change, including from other workstations
+        self.auto_refresh = AutoRefresh(root, ChangeMonitor(farmer_manager.db.db_path), self.on_data_changed)
+        
+        with profile_phase("main_window.setup_ui"):
+            self.setup_ui()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         self.load_dashboard_data()
+        self.auto_refresh.start()
     
     def setup_ui(self):
         """Setup the main user interface"""
@@ -30,13 +64,76 @@ class MainWindow:
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Create tabs
+        # Create tabs; only the dashboard is built now, the others are built
+        # and loaded the first time they are selected
+        self.tab_builders = {}
+        self.built_tabs = set()
+        self.tab_views = {}
         self.create_dashboard_tab()
         self.create_farmers_tab()
         self.create_crops_tab()
         self.create_finance_tab()
         self.create_reports_tab()
         self.create_users_tab()  # Add users tab
+        self.build_tab(str(self.dashboard_frame))
+        
+        # Background request keys feeding each tab, and how to reload them;
+        # the virtual trees of each tab are in tab_views
+        self.tab_requests = {
+            str(self.dashboard_frame): (('dashboard', 'leaderboard'), self.load_dashboard_data),
+            str(self.farmers_frame): (('farmers',), self.load_farmers_data),
+            str(self.crops_frame): (('crops', 'plantings'), self.load_crops_tab_data),
+            str(self.finance_frame): (('transactions',), self.load_transactions_data),
+            str(self.reports_frame): (('financial_report', 'crop_report'), self.load_reports_data),
+            str(self.users_frame): (('users',), self.load_users_data),
+        }
+        
+        # Tabs showing each tracked table, for change-driven reloads
+        self.table_tabs = {
+            'farmers': (str(self.dashboard_frame), str(self.farmers_frame), str(self.crops_frame),
+                        str(self.finance_frame)),
+            'crops': (str(self.dashboard_frame), str(self.crops_frame), str(self.reports_frame)),
+            'plantings': (str(self.dashboard_frame), str(self.crops_frame), str(self.reports_frame)),
+            'transactions': (str(self.dashboard_frame), str(self.finance_frame), str(self.reports_frame)),
+            'users': (str(self.users_frame),),
+        }
+    
+    def on_tab_changed(self, event=None):
+        """Build the shown tab on first use, cancel loads for hidden tabs and reload a stale shown tab"""
+        current = self.notebook.select()
+        if current not in self.built_tabs:
+            # Building a tab loads its data
+            self.build_tab(current)
+            self.stale_tabs.discard(current)
+        for tab, (keys, loader) in self.tab_requests.items():
+            if tab == current:
+                continue
+            for key in keys:
+                if self.data_service.has_pending(key):
+                    self.data_service.cancel(key)
+                    self.stale_tabs.add(tab)
+            # Virtual trees load their count and pages under keys of their own
+            for view in self.tab_views.get(tab, ()):
+                if view.cancel():
+                    self.stale_tabs.add(tab)
+        
+        if current in self.stale_tabs:
+            self.stale_tabs.discard(current)
+            self.tab_requests[current][1]()
+    
+    def on_data_changed(self, tables):
+        """Reload the shown tab if it displays a changed table and mark the others stale"""
+        self.dashboard_manager.invalidate()
+        if 'transactions' in tables:
+            self.financial_summary = None
+        
+        tabs = {tab for table in tables for tab in self.table_tabs.get(table, ()) if tab in self.built_tabs}
+        current = self.notebook.select()
+        for tab in tabs:
+            if tab == current:
+                self.tab_requests[tab][1]()
+            else:
+                self.stale_tabs.add(tab)
     
     def create_header(self):
         """Create header with user information and logout button"""
@@ -74,9 +171,23 @@ class MainWindow:
         tk.Label(title_frame, text="🌾 Farmer Management System", 
                 font=("Arial", 18, "bold"), bg='#1e40af', fg='white').pack(expand=True)
     
+    def is_admin(self):
+        """Role check served from the login session cache, not the database"""
+        if not self.user:
+            return False
+        if self.auth_service.get_session(self.user[0]) is not None:
+            return self.auth_service.has_role(self.user[0], 'admin')
+        # Opened without going through the login window
+        return self.user[3] == 'admin'
+    
     def logout(self):
         """Handle logout"""
         if messagebox.askyesno("Logout", "Are you sure you want to logout?"):
+            if self.user:
+                self.auth_service.logout(self.user[0])
+            self.auto_refresh.close()
+            self.data_service.shutdown()
+            self.export_service.shutdown()
             self.root.destroy()
             # Restart with login
             import sys
@@ -87,11 +198,21 @@ class MainWindow:
             login_app = LoginWindow(root)
             login_app.run()
     
+    def build_tab(self, tab):
+        """Create a tab's widgets, which also starts loading its data"""
+        if tab in self.built_tabs or tab not in self.tab_builders:
+            return
+        self.built_tabs.add(tab)
+        self.tab_builders[tab]()
+    
     def create_dashboard_tab(self):
         """Create the dashboard tab"""
         self.dashboard_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.dashboard_frame, text="📊 Dashboard")
-        
+        self.tab_builders[str(self.dashboard_frame)] = self.create_dashboard_content
+    
+    def create_dashboard_content(self):
+        """Create dashboard content with statistics"""
         # Dashboard title with better styling
         title_frame = tk.Frame(self.dashboard_frame, bg='#f8fafc')
         title_frame.pack(fill=tk.X, pady=(0, 20))
@@ -100,11 +221,6 @@ class MainWindow:
                                font=("Arial", 16, "bold"))
         title_label.pack(pady=15)
         
-        # Create dashboard content
-        self.create_dashboard_content()
-    
-    def create_dashboard_content(self):
-        """Create dashboard content with statistics"""
         # Statistics frame with better styling
         stats_frame = ttk.LabelFrame(self.dashboard_frame, text="📈 System Statistics", padding=15)
         stats_frame.pack(fill=tk.X, padx=15, pady=10)
@@ -126,6 +242,8 @@ class MainWindow:
                                            font=("Arial", 12))
         self.total_income_label.pack(anchor=tk.W, pady=5)
         
+        self.create_leaderboard(self.dashboard_frame)
+        
         # Recent activities frame with better styling
         activities_frame = ttk.LabelFrame(self.dashboard_frame, text="📋 Recent Activities", padding=15)
         activities_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
@@ -140,6 +258,40 @@ class MainWindow:
         self.activities_tree.column("Activity", width=150)
         self.activities_tree.column("Details", width=350)
         self.activities_tree.pack(fill=tk.BOTH, expand=True)
+        self.activities_sync = TreeReconciler(self.activities_tree, lambda transaction: transaction['transaction_id'],
+                                              self._activity_values)
+    
+    def create_leaderboard(self, parent):
+        """Create the paged farmer leaderboard on the dashboard"""
+        leaderboard_frame = ttk.LabelFrame(parent, text="🏆 Farmer Leaderboard", padding=15)
+        leaderboard_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        
+        control_frame = ttk.Frame(leaderboard_frame)
+        control_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        self.leaderboard_sort = 'net_profit'
+        self.leaderboard_offset = 0
+        self.leaderboard_sort_var = tk.StringVar(value=LEADERBOARD_SORTS[self.leaderboard_sort])
+        sort_combo = ttk.Combobox(control_frame, textvariable=self.leaderboard_sort_var, state="readonly",
+                                  values=list(LEADERBOARD_SORTS.values()), width=22)
+        sort_combo.pack(side=tk.LEFT)
+        sort_combo.bind("<<ComboboxSelected>>", self.on_leaderboard_sort)
+        
+        ttk.Button(control_frame, text="Next ▶", command=lambda: self.page_leaderboard(1)).pack(side=tk.RIGHT)
+        self.leaderboard_page_label = ttk.Label(control_frame, text="")
+        self.leaderboard_page_label.pack(side=tk.RIGHT, padx=10)
+        ttk.Button(control_frame, text="◀ Prev", command=lambda: self.page_leaderboard(-1)).pack(side=tk.RIGHT)
+        
+        self.leaderboard_tree = ttk.Treeview(leaderboard_frame,
+                                             columns=("Rank", "Farmer", "Plantings", "Area", "Income", "Expenses", "Net"),
+                                             show="headings", height=LEADERBOARD_PAGE_SIZE)
+        for column, width in (("Rank", 50), ("Farmer", 180), ("Plantings", 80), ("Area", 80),
+                              ("Income", 110), ("Expenses", 110), ("Net", 110)):
+            self.leaderboard_tree.heading(column, text=column)
+            self.leaderboard_tree.column(column, width=width)
+        self.leaderboard_tree.pack(fill=tk.BOTH, expand=True)
+        self.leaderboard_sync = TreeReconciler(self.leaderboard_tree, lambda row: row['farmer_id'],
+                                               self._leaderboard_values)
     
     def create_farmers_tab(self):
         """Create the farmers management tab"""
@@ -147,7 +299,7 @@ class MainWindow:
         self.notebook.add(self.farmers_frame, text="👥 Farmers")
         
         # Farmers management content
-        self.create_farmers_content()
+        self.tab_builders[str(self.farmers_frame)] = self.create_farmers_content
     
     def create_farmers_content(self):
         """Create farmers management content"""
@@ -159,6 +311,9 @@ class MainWindow:
         add_btn = ttk.Button(control_frame, text="➕ Add Farmer", command=self.add_farmer_dialog)
         add_btn.pack(side=tk.LEFT, padx=5)
         
+        export_btn = ttk.Button(control_frame, text="📤 Export", command=lambda: self.export_dataset('farmers'))
+        export_btn.pack(side=tk.LEFT, padx=5)
+        
         # Search frame
         search_frame = ttk.Frame(control_frame)
         search_frame.pack(side=tk.RIGHT, padx=5)
@@ -195,6 +350,21 @@ class MainWindow:
         self.farmers_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Only the visible rows are fetched and inserted
+        self.farmers_view = VirtualTreeview(self.farmers_tree, scrollbar, self.farmer_manager.count_farmers,
+                                            self._fetch_farmers_page, self._farmer_values,
+                                            data_service=self.data_service, key='farmers_list',
+                                            row_key=lambda farmer: farmer['farmer_id'])
+        self.tab_views[str(self.farmers_frame)] = (self.farmers_view,)
+        
+        # Typing in the search box queries once per pause and refines in memory
+        self.farmer_search = SearchController(
+            self.root, self.data_service, 'farmers', self.farmer_manager.iter_search_farmers,
+            self.farmer_manager.search_matches, self._show_farmer_results,
+            lambda: self.farmers_view.refresh(keep_position=False),
+            on_error=lambda e: messagebox.showerror("Error", f"Search failed: {str(e)}"),
+            narrows=self.farmer_manager.search_narrows)
+        
         # Bind double-click for editing
         self.farmers_tree.bind("<Double-1>", self.edit_farmer)
         
@@ -205,7 +375,10 @@ class MainWindow:
         """Create the crops management tab"""
         self.crops_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.crops_frame, text="🌱 Crops & Plantings")
-        
+        self.tab_builders[str(self.crops_frame)] = self.create_crops_tab_content
+    
+    def create_crops_tab_content(self):
+        """Create the crops and plantings sub-tabs"""
         # Create notebook for crops and plantings
         crops_notebook = ttk.Notebook(self.crops_frame)
         crops_notebook.pack(fill=tk.BOTH, expand=True)
@@ -254,6 +427,7 @@ class MainWindow:
         
         self.crops_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.crops_sync = TreeReconciler(self.crops_tree, lambda crop: crop['crop_id'], self._crop_values)
         
         self.load_crops_data()
     
@@ -269,6 +443,9 @@ class MainWindow:
         add_planting_btn = ttk.Button(control_frame, text="➕ Add Planting", command=self.add_planting_dialog)
         add_planting_btn.pack(side=tk.LEFT, padx=5)
         
+        export_btn = ttk.Button(control_frame, text="📤 Export", command=lambda: self.export_dataset('plantings'))
+        export_btn.pack(side=tk.LEFT, padx=5)
+        
         # Plantings treeview
         tree_frame = ttk.Frame(plantings_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -298,6 +475,12 @@ class MainWindow:
         self.plantings_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        self.plantings_view = VirtualTreeview(self.plantings_tree, scrollbar, self.crop_manager.count_plantings,
+                                              self._fetch_plantings_page, self._planting_values,
+                                              data_service=self.data_service, key='plantings_list',
+                                              row_key=lambda planting: planting['planting_id'])
+        self.tab_views[str(self.crops_frame)] = (self.plantings_view,)
+        
         self.load_plantings_data()
     
     def create_finance_tab(self):
@@ -306,7 +489,7 @@ class MainWindow:
         self.notebook.add(self.finance_frame, text="💰 Finance")
         
         # Finance content
-        self.create_finance_content()
+        self.tab_builders[str(self.finance_frame)] = self.create_finance_content
     
     def create_finance_content(self):
         """Create finance management content"""
@@ -317,6 +500,9 @@ class MainWindow:
         add_transaction_btn = ttk.Button(control_frame, text="➕ Add Transaction", command=self.add_transaction_dialog)
         add_transaction_btn.pack(side=tk.LEFT, padx=5)
         
+        export_btn = ttk.Button(control_frame, text="📤 Export", command=lambda: self.export_dataset('transactions'))
+        export_btn.pack(side=tk.LEFT, padx=5)
+        
         # Summary frame with better styling
         summary_frame = ttk.LabelFrame(self.finance_frame, text="💰 Financial Summary", padding=15)
         summary_frame.pack(fill=tk.X, padx=15, pady=10)
@@ -359,6 +545,13 @@ class MainWindow:
         self.transactions_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        self.transactions_view = VirtualTreeview(self.transactions_tree, scrollbar,
+                                                 self.finance_manager.count_transactions,
+                                                 self._fetch_transactions_page, self._transaction_values,
+                                                 data_service=self.data_service, key='transactions_list',
+                                                 row_key=lambda transaction: transaction['transaction_id'])
+        self.tab_views[str(self.finance_frame)] = (self.transactions_view,)
+        
         self.load_transactions_data()
     
     def create_reports_tab(self):
@@ -367,7 +560,7 @@ class MainWindow:
         self.notebook.add(self.reports_frame, text="📊 Reports")
         
         # Reports content
-        self.create_reports_content()
+        self.tab_builders[str(self.reports_frame)] = self.create_reports_content
     
     def create_reports_content(self):
         """Create reports content"""
@@ -420,151 +613,213 @@ class MainWindow:
         self.update_crop_report()
     
     # Data loading methods
-    def load_dashboard_data(self):
-        """Load dashboard data"""
-        try:
-            # Get statistics
-            farmers = self.farmer_manager.get_all_farmers()
-            crops = self.crop_manager.get_all_crops()
-            plantings = self.crop_manager.get_all_plantings()
-            financial_summary = self.finance_manager.get_financial_summary()
-            
-            # Update labels
-            self.total_farmers_label.config(text=f"👥 Total Farmers: {len(farmers)}")
-            self.total_crops_label.config(text=f"🌱 Total Crops: {len(crops)}")
-            
-            active_plantings = [p for p in plantings if p['status'] == 'Growing']
-            self.active_plantings_label.config(text=f"🌿 Active Plantings: {len(active_plantings)}")
-            
-            self.total_income_label.config(text=f"💰 Total Income: ₹{financial_summary['total_income']:,.2f}")
-            
-            # Load recent activities
-            self.load_recent_activities()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load dashboard data: {str(e)}")
+    # Each loader submits the database work to self.data_service and renders
+    # the result in a matching _show_* callback on the Tk thread.
+    def load_dashboard_data(self, refresh=False):
+        """Load dashboard statistics and recent activities"""
+        # One aggregate read; its cost does not grow with the table sizes
+        self.data_service.submit('dashboard', self.dashboard_manager.get_dashboard_stats, refresh,
+                                 on_success=self._show_dashboard_data,
+                                 on_error=lambda e: self._show_load_error("dashboard data", e))
+        self.load_leaderboard(refresh)
+    
+    def load_leaderboard(self, refresh=False):
+        """Load the current leaderboard page"""
+        self.data_service.submit('leaderboard', self.dashboard_manager.get_leaderboard, self.leaderboard_sort,
+                                 offset=self.leaderboard_offset, refresh=refresh,
+                                 on_success=self._show_leaderboard,
+                                 on_error=lambda e: self._show_load_error("leaderboard", e))
+    
+    def _show_leaderboard(self, page):
+        """Render one leaderboard page"""
+        if page is None:
+            return
+        self.leaderboard_offset = page['offset']
+        self.leaderboard_sync.update(page['rows'])
+        pages = max(1, -(-page['total'] // LEADERBOARD_PAGE_SIZE))
+        self.leaderboard_page_label.config(
+            text=f"Page {page['offset'] // LEADERBOARD_PAGE_SIZE + 1} of {pages}")
+    
+    def _leaderboard_values(self, row):
+        """Treeview values for a leaderboard row"""
+        return (
+            row['rank'],
+            row['name'],
+            row['total_plantings'],
+            f"{row['total_area']:.1f}",
+            f"₹{row['total_income']:,.2f}",
+            f"₹{row['total_expenses']:,.2f}",
+            f"₹{row['net_profit']:,.2f}"
+        )
+    
+    def on_leaderboard_sort(self, event=None):
+        """Rank by the chosen statistic, starting from the first page"""
+        label = self.leaderboard_sort_var.get()
+        self.leaderboard_sort = next(key for key, text in LEADERBOARD_SORTS.items() if text == label)
+        self.leaderboard_offset = 0
+        self.load_leaderboard()
+    
+    def page_leaderboard(self, step):
+        """Move the leaderboard by one page; served from the cached ranking"""
+        self.leaderboard_offset = max(0, self.leaderboard_offset + step * LEADERBOARD_PAGE_SIZE)
+        self.load_leaderboard()
+    
+    def _show_dashboard_data(self, stats):
+        """Render dashboard statistics"""
+        if stats is None:
+            return
+        
+        # Update labels
+        self.total_farmers_label.config(text=f"👥 Total Farmers: {stats['total_farmers']}")
+        self.total_crops_label.config(text=f"🌱 Total Crops: {stats['total_crops']}")
+        self.active_plantings_label.config(text=f"🌿 Active Plantings: {stats['active_plantings']}")
+        self.total_income_label.config(text=f"💰 Total Income: ₹{stats['total_income']:,.2f}")
+        
+        self._show_recent_activities(stats['recent_activities'])
+    
+    def _show_load_error(self, what, error):
+        """Report a failed background load"""
+        messagebox.showerror("Error", f"Failed to load {what}: {str(error)}")
     
     def load_farmers_data(self):
         """Load farmers data into treeview"""
-        try:
-            # Clear existing items
-            for item in self.farmers_tree.get_children():
-                self.farmers_tree.delete(item)
-            
-            # Get farmers data
-            farmers = self.farmer_manager.get_all_farmers()
-            
-            # Insert data
-            for farmer in farmers:
-                self.farmers_tree.insert("", "end", values=(
-                    farmer['farmer_id'],
-                    farmer['name'],
-                    farmer['phone'] or "",
-                    farmer['email'] or "",
-                    f"{farmer['farm_size']:.1f}" if farmer['farm_size'] else ""
-                ))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load farmers data: {str(e)}")
+        # A pending search must not overwrite the fresh listing
+        self.farmer_search.reset()
+        search_term = self.farmer_search_var.get()
+        if search_term.strip():
+            self.farmer_search.run(search_term)
+        else:
+            self.farmers_view.refresh()
+    
+    def _fetch_farmers_page(self, offset, limit, after):
+        """Fetch one page of farmers, by keyset when the previous row is known"""
+        if after is not None:
+            return self.farmer_manager.get_all_farmers(after_id=after['farmer_id'], after_name=after['name'],
+                                                       limit=limit)
+        return self.farmer_manager.get_all_farmers(limit=limit, offset=offset)
+    
+    def _farmer_values(self, farmer):
+        """Treeview values for a farmer row"""
+        return (
+            farmer['farmer_id'],
+            farmer['name'],
+            farmer['phone'] or "",
+            farmer['email'] or "",
+            f"{farmer['farm_size']:.1f}" if farmer['farm_size'] else ""
+        )
+    
+    def load_crops_tab_data(self):
+        """Load both trees of the crops and plantings tab"""
+        self.load_crops_data()
+        self.load_plantings_data()
     
     def load_crops_data(self):
         """Load crops data into treeview"""
-        try:
-            # Clear existing items
-            for item in self.crops_tree.get_children():
-                self.crops_tree.delete(item)
-            
-            # Get crops data
-            crops = self.crop_manager.get_all_crops()
-            
-            # Insert data
-            for crop in crops:
-                self.crops_tree.insert("", "end", values=(
-                    crop['crop_id'],
-                    crop['name'],
-                    crop['variety'] or "",
-                    crop['growth_period'] or "",
-                    f"{crop['yield_per_acre']:.1f}" if crop['yield_per_acre'] else "",
-                    f"₹{crop['price_per_unit']:.2f}" if crop['price_per_unit'] else ""
-                ))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load crops data: {str(e)}")
+        self.data_service.crops.get_all_crops(
+            key='crops', on_success=self._show_crops,
+            on_error=lambda e: self._show_load_error("crops data", e))
+    
+    def _show_crops(self, crops):
+        """Update the crops treeview to match the loaded crops"""
+        self.crops_sync.update(crops or [])
+    
+    def _crop_values(self, crop):
+        """Treeview values for one crop"""
+        return (
+            crop['crop_id'],
+            crop['name'],
+            crop['variety'] or "",
+            crop['growth_period'] or "",
+            f"{crop['yield_per_acre']:.1f}" if crop['yield_per_acre'] else "",
+            f"₹{crop['price_per_unit']:.2f}" if crop['price_per_unit'] else ""
+        )
     
     def load_plantings_data(self):
         """Load plantings data into treeview"""
-        try:
-            # Clear existing items
-            for item in self.plantings_tree.get_children():
-                self.plantings_tree.delete(item)
-            
-            # Get plantings data
-            plantings = self.crop_manager.get_all_plantings()
-            
-            # Insert data
-            for planting in plantings:
-                self.plantings_tree.insert("", "end", values=(
-                    planting['planting_id'],
-                    planting['farmer_name'],
-                    planting['crop_name'],
-                    planting['planting_date'],
-                    f"{planting['area_planted']:.1f}",
-                    planting['expected_harvest_date'],
-                    planting['status']
-                ))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load plantings data: {str(e)}")
+        self.plantings_view.refresh()
+    
+    def _fetch_plantings_page(self, offset, limit, after):
+        """Fetch one page of plantings, by keyset when the previous row is known"""
+        if after is not None:
+            return self.crop_manager.get_all_plantings(after_id=after['planting_id'],
+                                                       after_date=after['planting_date'], limit=limit)
+        return self.crop_manager.get_all_plantings(limit=limit, offset=offset)
+    
+    def _planting_values(self, planting):
+        """Treeview values for a planting row"""
+        return (
+            planting['planting_id'],
+            planting['farmer_name'],
+            planting['crop_name'],
+            planting['planting_date'],
+            f"{planting['area_planted']:.1f}",
+            planting['expected_harvest_date'],
+            planting['status']
+        )
     
     def load_transactions_data(self):
         """Load transactions data into treeview"""
-        try:
-            # Clear existing items
-            for item in self.transactions_tree.get_children():
-                self.transactions_tree.delete(item)
-            
-            # Get transactions data
-            transactions = self.finance_manager.get_transactions()
-            
-            # Update summary
-            summary = self.finance_manager.get_financial_summary()
-            self.total_income_summary.config(text=f"💵 Total Income: ₹{summary['total_income']:,.2f}")
-            self.total_expenses_summary.config(text=f"💸 Total Expenses: ₹{summary['total_expenses']:,.2f}")
-            self.net_profit_summary.config(text=f"📈 Net Profit: ₹{summary['net_profit']:,.2f}")
-            
-            # Insert data
-            for transaction in transactions:
-                self.transactions_tree.insert("", "end", values=(
-                    transaction['transaction_id'],
-                    transaction['farmer_name'],
-                    transaction['type'].title(),
-                    transaction['category'],
-                    f"₹{transaction['amount']:.2f}",
-                    transaction['date'],
-                    transaction['description'] or ""
-                ))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load transactions data: {str(e)}")
+        self.transactions_view.refresh()
+        self.data_service.submit('transactions', self._fetch_summary, on_success=self._show_transaction_summary,
+                                 on_error=lambda e: self._show_load_error("transactions data", e))
+    
+    def _fetch_transactions_page(self, offset, limit, after):
+        """Fetch one page of transactions, by keyset when the previous row is known"""
+        if after is not None:
+            return self.finance_manager.get_transactions(after_id=after['transaction_id'],
+                                                         after_date=after['date'], limit=limit)
+        return self.finance_manager.get_transactions(limit=limit, offset=offset)
     
-    def load_recent_activities(self):
-        """Load recent activities into treeview"""
+    def _transaction_values(self, transaction):
+        """Treeview values for a transaction row"""
+        return (
+            transaction['transaction_id'],
+            transaction['farmer_name'],
+            transaction['type'].title(),
+            transaction['category'],
+            f"₹{transaction['amount']:.2f}",
+            transaction['date'],
+            transaction['description'] or ""
+        )
+    
+    def _show_transaction_summary(self, summary):
+        """Update the summary labels on the finance tab"""
+        self.financial_summary = summary
+        self.total_income_summary.config(text=f"💵 Total Income: ₹{summary['total_income']:,.2f}")
+        self.total_expenses_summary.config(text=f"💸 Total Expenses: ₹{summary['total_expenses']:,.2f}")
+        self.net_profit_summary.config(text=f"📈 Net Profit: ₹{summary['net_profit']:,.2f}")
+    
+    def get_financial_summary(self, refresh=False):
+        """Return the shared financial summary, computing it once per refresh"""
+        if refresh or getattr(self, 'financial_summary', None) is None:
+            self.financial_summary = self._fetch_summary()
+        return self.financial_summary
+    
+    def _fetch_summary(self):
+        """Compute the financial summary, falling back to zeros on failure
+        
+        Safe to call on the worker thread; it does not touch any widgets.
+        """
         try:
-            # Clear existing items
-            for item in self.activities_tree.get_children():
-                self.activities_tree.delete(item)
-            
-            # Get recent transactions
-            recent_transactions = self.finance_manager.get_transactions()
-            for transaction in recent_transactions[:10]:  # Show last 10
-                self.activities_tree.insert("", "end", values=(
-                    transaction['date'],
-                    f"{transaction['type'].title()} Transaction",
-                    f"{transaction['farmer_name']} - {transaction['category']} - ₹{transaction['amount']:.2f}"
-                ))
-                
+            return self.finance_manager.get_summary()
         except Exception as e:
-            print(f"Failed to load recent activities: {str(e)}")
+            print(f"Failed to compute financial summary: {str(e)}")
+            return {
+                'total_income': 0, 'total_expenses': 0, 'net_profit': 0,
+                'transaction_count': 0, 'categories': [], 'top_income': [], 'top_expenses': []
+            }
+    
+    def _show_recent_activities(self, recent_transactions):
+        """Update the recent activities treeview to match the latest transactions"""
+        self.activities_sync.update(recent_transactions or [])
+    
+    def _activity_values(self, transaction):
+        """Treeview values for one recent transaction"""
+        return (
+            transaction['date'],
+            f"{transaction['type'].title()} Transaction",
+            f"{transaction['farmer_name']} - {transaction['category']} - ₹{transaction['amount']:.2f}"
+        )
     
     # Dialog methods (to be implemented)
     def add_farmer_dialog(self):
@@ -578,31 +833,15 @@ class MainWindow:
             messagebox.showinfo("Info", "Edit Farmer dialog will be implemented")
     
     def search_farmers(self, *args):
-        """Search farmers based on search term"""
-        search_term = self.farmer_search_var.get()
-        if search_term:
-            try:
-                # Clear existing items
-                for item in self.farmers_tree.get_children():
-                    self.farmers_tree.delete(item)
-                
-                # Search farmers
-                farmers = self.farmer_manager.search_farmers(search_term)
-                
-                # Insert results
-                for farmer in farmers:
-                    self.farmers_tree.insert("", "end", values=(
-                        farmer['farmer_id'],
-                        farmer['name'],
-                        farmer['phone'] or "",
-                        farmer['email'] or "",
-                        f"{farmer['farm_size']:.1f}" if farmer['farm_size'] else ""
-                    ))
-            except Exception as e:
-                messagebox.showerror("Error", f"Search failed: {str(e)}")
+        """Search farmers once typing pauses"""
+        self.farmer_search.schedule(self.farmer_search_var.get())
+    
+    def _show_farmer_results(self, farmers, replace):
+        """Show a batch of farmer search results as it arrives"""
+        if replace:
+            self.farmers_view.show_rows(farmers)
         else:
-            # Reload all farmers
-            self.load_farmers_data()
+            self.farmers_view.append_rows(farmers)
     
     def add_crop_dialog(self):
         """Show add crop dialog"""
@@ -616,62 +855,151 @@ class MainWindow:
         """Show add transaction dialog"""
         messagebox.showinfo("Info", "Add Transaction dialog will be implemented")
     
+    def export_dataset(self, dataset, **filters):
+        """Ask for a CSV or XLSX file and export dataset to it in the background"""
+        # Exports are rare, so their modules are not loaded at startup
+        from gui.export_dialog import ExportDialog
+        from modules.export import ExportManager
+        
+        if ExportDialog.is_running(self.export_service):
+            messagebox.showinfo("Export", "Another export is still running")
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title=f"Export {dataset.title()}", defaultextension=".csv",
+            initialfile=f"{dataset}_{datetime.now():%Y%m%d}.csv",
+            filetypes=[("CSV files", "*.csv"), ("Excel workbooks", "*.xlsx")])
+        if not path:
+            return
+        if self.export_manager is None:
+            self.export_manager = ExportManager(self.farmer_manager.db, self.farmer_manager,
+                                                self.crop_manager, self.finance_manager)
+        ExportDialog(self.root, self.export_service, self.export_manager, dataset, path, **filters).start()
+    
+    def load_reports_data(self):
+        """Refresh both report texts"""
+        self.update_financial_report()
+        self.update_crop_report()
+    
     def update_financial_report(self):
         """Update financial report text"""
-        try:
-            self.financial_report_text.delete(1.0, tk.END)
-            
-            # Get monthly data
-            monthly_data = self.finance_manager.get_monthly_summary()
-            
-            report_text = "Financial Summary Report\n"
-            report_text += "=" * 50 + "\n\n"
-            
-            if monthly_data:
-                report_text += "Monthly Financial Summary:\n"
+        cached_summary = self.financial_summary
+        
+        def fetch():
+            return (self.finance_manager.get_monthly_summary(),
+                    self.finance_manager.get_yearly_summary(),
+                    cached_summary or self._fetch_summary())
+        
+        self.data_service.submit('financial_report', fetch, on_success=self._show_financial_report,
+                                 on_error=lambda e: print(f"Failed to update financial report: {str(e)}"))
+    
+    def _show_financial_report(self, result):
+        """Render the financial report text"""
+        monthly_data, yearly_data, summary = result
+        self.financial_summary = summary
+        self.financial_report_text.delete(1.0, tk.END)
+        
+        report_text = "Financial Summary Report\n"
+        report_text += "=" * 50 + "\n\n"
+        
+        if monthly_data:
+            report_text += "Monthly Financial Summary:\n"
+            report_text += "-" * 30 + "\n"
+            for row in monthly_data:
+                report_text += f"{row['year']}-{row['month']:02d}: Income ₹{row['monthly_income']:,.2f}, Expenses ₹{row['monthly_expenses']:,.2f}, Profit ₹{row['monthly_profit']:,.2f}\n"
+        else:
+            report_text += "No financial data available.\n"
+        
+        if yearly_data:
+            report_text += "\nYearly Financial Summary:\n"
+            report_text += "-" * 30 + "\n"
+            for row in yearly_data:
+                report_text += f"{row['year']}: Income ₹{row['yearly_income']:,.2f}, Expenses ₹{row['yearly_expenses']:,.2f}, Profit ₹{row['yearly_profit']:,.2f}\n"
+        
+        if summary['categories']:
+            report_text += "\nBreakdown by Category:\n"
+            report_text += "-" * 30 + "\n"
+            for entry in summary['categories']:
+                report_text += f"{entry['category']} ({entry['type']}): ₹{entry['total']:,.2f} in {entry['count']} transactions\n"
+        
+        for title, key in (("Top Income", 'top_income'), ("Top Expenses", 'top_expenses')):
+            if summary[key]:
+                report_text += f"\n{title}:\n"
                 report_text += "-" * 30 + "\n"
-                for row in monthly_data:
-                    report_text += f"Month {row['month']}: Income ₹{row['monthly_income']:,.2f}, Expenses ₹{row['monthly_expenses']:,.2f}, Profit ₹{row['monthly_profit']:,.2f}\n"
-            else:
-                report_text += "No financial data available.\n"
-            
-            self.financial_report_text.insert(tk.END, report_text)
-            
-        except Exception as e:
-            print(f"Failed to update financial report: {str(e)}")
+                for entry in summary[key]:
+                    report_text += f"{entry['date']}: ₹{entry['amount']:,.2f} - {entry['description'] or entry['category']}\n"
+        
+        self.financial_report_text.insert(tk.END, report_text)
     
     def update_crop_report(self):
         """Update crop report text"""
-        try:
-            self.crop_report_text.delete(1.0, tk.END)
-            
-            # Get crop statistics
-            crop_stats = self.crop_manager.get_crop_statistics()
-            
-            report_text = "Crop Planting Report\n"
-            report_text += "=" * 50 + "\n\n"
+        self.data_service.submit('crop_report', self._fetch_crop_report, on_success=self._show_crop_report,
+                                 on_error=lambda e: print(f"Failed to update crop report: {str(e)}"))
+    
+    def _fetch_crop_report(self):
+        """Load the planting statistics and the yield and revenue projections"""
+        return {
+            'crop_stats': self.crop_manager.get_crop_statistics()['crop_stats'],
+            'economics': self.analytics_manager.get_crop_economics(),
+            'due_harvests': self.harvest_calendar.get_due_harvests(),
+        }
+    
+    def _show_crop_report(self, report):
+        """Render the crop report text"""
+        self.crop_report_text.delete(1.0, tk.END)
+        
+        report_text = "Crop Planting Report\n"
+        report_text += "=" * 50 + "\n\n"
+        
+        if report['crop_stats']:
+            report_text += "Plantings by Crop:\n"
+            report_text += "-" * 20 + "\n"
+            for row in report['crop_stats']:
+                total_area = row['total_area'] if row['total_area'] is not None else 0
+                report_text += f"{row['crop_name']}: {row['total_plantings']} plantings, {total_area:.1f} acres\n"
+        else:
+            report_text += "No crop data available.\n"
+        
+        economics = report['economics']
+        if economics and economics['plantings']:
+            report_text += "\nExpected Yield and Revenue (Growing plantings):\n"
+            report_text += "-" * 20 + "\n"
+            report_text += (f"Total: {economics['plantings']} plantings, {economics['area']:.1f} acres, "
+                            f"{economics['expected_yield']:,.1f} units, ₹{economics['expected_revenue']:,.2f}\n")
             
-            if crop_stats['crop_stats']:
-                report_text += "Plantings by Crop:\n"
-                report_text += "-" * 20 + "\n"
-                for row in crop_stats['crop_stats']:
-                    total_area = row['total_area'] if row['total_area'] is not None else 0
-                    report_text += f"{row['crop_name']}: {row['total_plantings']} plantings, {total_area:.1f} acres\n"
-            else:
-                report_text += "No crop data available.\n"
+            report_text += "\nBy Crop:\n"
+            for row in economics['by_crop']:
+                report_text += (f"{row['crop_name']}: {row['expected_yield']:,.1f} units, "
+                                f"₹{row['expected_revenue']:,.2f}\n")
             
-            self.crop_report_text.insert(tk.END, report_text)
+            report_text += "\nBy Harvest Month:\n"
+            for row in economics['by_month']:
+                report_text += (f"{row['month']}: {row['plantings']} plantings, "
+                                f"{row['expected_yield']:,.1f} units, ₹{row['expected_revenue']:,.2f}\n")
             
-        except Exception as e:
-            print(f"Failed to update crop report: {str(e)}") 
-
+            report_text += f"\nTop {len(economics['top_farmers'])} Farmers by Expected Revenue:\n"
+            for row in economics['top_farmers']:
+                report_text += (f"{row['farmer_name']}: {row['plantings']} plantings, "
+                                f"₹{row['expected_revenue']:,.2f}\n")
+        
+        if report['due_harvests']:
+            report_text += f"\nHarvests Due in the Next {DEFAULT_DAYS_AHEAD} Days:\n"
+            report_text += "-" * 20 + "\n"
+            week_start = ""
+            for row in report['due_harvests']:
+                if row['week_start'] != week_start:
+                    week_start = row['week_start']
+                    report_text += "Overdue:\n" if week_start is None else f"Week of {week_start}:\n"
+                report_text += f"  {row['crop_name']}: {row['plantings']} plantings, {row['area']:.1f} acres\n"
+        
+        self.crop_report_text.insert(tk.END, report_text)
+    
     def create_users_tab(self):
         """Create the users management tab"""
         self.users_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.users_frame, text="👤 Users")
         
         # Users management content
-        self.create_users_content()
+        self.tab_builders[str(self.users_frame)] = self.create_users_content
     
     def create_users_content(self):
         """Create users management content"""
@@ -680,7 +1008,7 @@ class MainWindow:
         control_frame.pack(fill=tk.X, padx=10, pady=5)
         
         # Add user button (only for admin)
-        if self.user and self.user[3] == 'admin':
+        if self.is_admin():
             add_user_btn = ttk.Button(control_frame, text="➕ Add User", command=self.add_user_dialog)
             add_user_btn.pack(side=tk.LEFT, padx=5)
         
@@ -722,107 +1050,79 @@ class MainWindow:
         self.users_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Only the visible rows are fetched and inserted
+        self.users_view = VirtualTreeview(self.users_tree, scrollbar, self.user_manager.count_users,
+                                          self._fetch_users_page, self._user_values,
+                                          data_service=self.data_service, key='users_list',
+                                          row_key=lambda user: user['user_id'])
+        self.tab_views[str(self.users_frame)] = (self.users_view,)
+        
         # Bind double-click for editing (only for admin)
-        if self.user and self.user[3] == 'admin':
+        if self.is_admin():
             self.users_tree.bind("<Double-1>", self.edit_user)
         
+        # Prefix search on the indexed username, full name and email columns
+        self.user_search = SearchController(
+            self.root, self.data_service, 'users', self.user_manager.iter_search_users,
+            self.user_manager.search_matches, self._show_user_results,
+            lambda: self.users_view.refresh(keep_position=False),
+            on_error=lambda e: messagebox.showerror("Error", f"Search failed: {str(e)}"),
+            narrows=self.user_manager.search_narrows)
+        
         # Load users data
         self.load_users_data()
     
     def load_users_data(self):
         """Load users data into treeview"""
-        try:
-            # Clear existing items
-            for item in self.users_tree.get_children():
-                self.users_tree.delete(item)
-            
-            # Get users data from database
-            import sqlite3
-            conn = sqlite3.connect('farm_management.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT user_id, username, full_name, email, role, created_date 
-                FROM users 
-                ORDER BY user_id
-            ''')
-            
-            users = cursor.fetchall()
-            conn.close()
-            
-            # Insert data
-            for user in users:
-                # Format the created date
-                created_date = user[5] if user[5] else "N/A"
-                if created_date != "N/A":
-                    try:
-                        # Parse and format the date
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(created_date.replace('Z', '+00:00'))
-                        created_date = dt.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        created_date = "N/A"
-                
-                self.users_tree.insert("", "end", values=(
-                    user[0],  # ID
-                    user[1],  # Username
-                    user[2] or "",  # Full Name
-                    user[3] or "",  # Email
-                    user[4] or "user",  # Role
-                    created_date  # Created Date
-                ))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load users data: {str(e)}")
+        # A pending search must not overwrite the fresh listing
+        self.user_search.reset()
+        search_term = self.user_search_var.get()
+        if search_term.strip():
+            self.user_search.run(search_term)
+        else:
+            self.users_view.refresh()
     
-    def search_users(self, *args):
-        """Search users based on search term"""
-        search_term = self.user_search_var.get().lower()
-        if search_term:
-            try:
-                # Clear existing items
-                for item in self.users_tree.get_children():
-                    self.users_tree.delete(item)
-                
-                # Search users in database
-                import sqlite3
-                conn = sqlite3.connect('farm_management.db')
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT user_id, username, full_name, email, role, created_date 
-                    FROM users 
-                    WHERE LOWER(username) LIKE ? OR LOWER(full_name) LIKE ? OR LOWER(email) LIKE ?
-                    ORDER BY user_id
-                ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
-                
-                users = cursor.fetchall()
-                conn.close()
-                
-                # Insert results
-                for user in users:
-                    created_date = user[5] if user[5] else "N/A"
-                    if created_date != "N/A":
-                        try:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(created_date.replace('Z', '+00:00'))
-                            created_date = dt.strftime('%Y-%m-%d %H:%M')
-                        except:
-                            created_date = "N/A"
-                    
-                    self.users_tree.insert("", "end", values=(
-                        user[0], user[1], user[2] or "", user[3] or "", 
-                        user[4] or "user", created_date
-                    ))
-            except Exception as e:
-                messagebox.showerror("Error", f"Search failed: {str(e)}")
+    def _fetch_users_page(self, offset, limit, after):
+        """Fetch one page of users, by keyset when the previous row is known"""
+        if after is not None:
+            return self.user_manager.get_users(after_id=after['user_id'], limit=limit)
+        return self.user_manager.get_users(limit=limit, offset=offset)
+    
+    def _show_user_results(self, users, replace):
+        """Show a batch of user search results as it arrives"""
+        if replace:
+            self.users_view.show_rows(users)
         else:
-            # Reload all users
-            self.load_users_data()
+            self.users_view.append_rows(users)
+    
+    def _user_values(self, user):
+        """Treeview values for a user row"""
+        # Format the created date
+        created_date = user[5] if user[5] else "N/A"
+        if created_date != "N/A":
+            try:
+                # Parse and format the date
+                dt = datetime.fromisoformat(created_date.replace('Z', '+00:00'))
+                created_date = dt.strftime('%Y-%m-%d %H:%M')
+            except:
+                created_date = "N/A"
+        
+        return (
+            user[0],  # ID
+            user[1],  # Username
+            user[2] or "",  # Full Name
+            user[3] or "",  # Email
+            user[4] or "user",  # Role
+            created_date  # Created Date
+        )
+    
+    def search_users(self, *args):
+        """Search users once typing pauses"""
+        self.user_search.schedule(self.user_search_var.get())
     
     def add_user_dialog(self):
         """Show add user dialog (admin only)"""
-        if not self.user or self.user[3] != 'admin':
+        if not self.is_admin():
             messagebox.showerror("Error", "Only administrators can add users")
             return
         
@@ -830,7 +1130,7 @@ class MainWindow:
     
     def edit_user(self, event):
         """Edit selected user (admin only)"""
-        if not self.user or self.user[3] != 'admin':
+        if not self.is_admin():
             messagebox.showerror("Error", "Only administrators can edit users")
             return
         
@@ -0,0 +1,101 @@
+import tkinter as tk
+
+DEBOUNCE_MS = 250
+
+class SearchController:
+    """Debounced, incremental search-as-you-type on top of AsyncDataService
+    
+    schedule(term) is meant to be called on every keystroke; the search only
+    runs once typing pauses for delay_ms. Each search streams its results in
+    batches under one data service key, so a newer search or reset() drops
+    whatever the previous one had not delivered yet. When narrows(previous,
+    term) says the new term can only match a subset of the previous, fully
+    loaded result, those rows are filtered in memory with matches(row, term)
+    instead of querying again. By default a term narrows any term it contains.
+    
+    fetch_batches(term) runs on the worker and returns an iterator of row
+    lists. on_results(rows, replace) runs on the Tk thread for every batch;
+    replace is True for the first batch of a new result. on_clear() runs
+    when the term becomes empty, and on_error(exception) if a search fails.
+    """
+    
+    def __init__(self, root, data_service, key, fetch_batches, matches, on_results, on_clear,
+                 on_error=None, narrows=None, delay_ms=DEBOUNCE_MS):
+        self.root = root
+        self.data_service = data_service
+        self.key = key
+        self.fetch_batches = fetch_batches
+        self.matches = matches
+        self.on_results = on_results
+        self.on_clear = on_clear
+        self.on_error = on_error or (lambda e: print(f"Search failed: {str(e)}"))
+        self.narrows = narrows or (lambda previous, term: previous.lower() in term.lower())
+        self.delay_ms = delay_ms
+        
+        self._after_id = None
+        self._term = ""
+        self._rows = []
+        self._complete = False
+    
+    def schedule(self, term):
+        """Run the search for term once typing pauses"""
+        self._cancel_timer()
+        try:
+            self._after_id = self.root.after(self.delay_ms, lambda: self.run(term))
+        except tk.TclError:
+            self._after_id = None
+    
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+    
+    def reset(self):
+        """Forget the cached result and drop any search still in flight"""
+        self._cancel_timer()
+        self.data_service.cancel(self.key)
+        self._term = ""
+        self._rows = []
+        self._complete = False
+    
+    def run(self, term):
+        """Search for term now"""
+        self._after_id = None
+        term = term.strip()
+        if term == self._term and self._complete:
+            return
+        
+        if not term:
+            self.reset()
+            self.on_clear()
+            return
+        
+        if self._complete and self._term and self.narrows(self._term, term):
+            # The new result is a subset of the one already loaded
+            self.data_service.cancel(self.key)
+            self._rows = [row for row in self._rows if self.matches(row, term)]
+            self._term = term
+            self.on_results(self._rows, True)
+            return
+        
+        self._term = term
+        self._rows = []
+        self._complete = False
+        state = {'replace': True}
+        
+        def on_batch(rows):
+            self._rows.extend(rows)
+            self.on_results(rows, state['replace'])
+            state['replace'] = False
+        
+        def on_done(count):
+            self._complete = True
+            if state['replace']:
+                # No batches at all: show the empty result
+                self.on_results([], True)
+        
+        self.data_service.submit_stream(self.key, self.fetch_batches, term, on_batch=on_batch,
+                                        on_done=on_done, on_error=self.on_error)
@@ -0,0 +1,82 @@
+class TreeReconciler:
+    """Keep a flat ttk.Treeview in step with a result set keyed by primary key
+    
+    Every row becomes the tree item whose iid is str(row_key(row)), so a
+    reload only inserts the new rows, deletes the rows that went away, moves
+    rows whose position changed and rewrites the values of rows that changed.
+    Untouched items keep their selection and focus and do not flicker.
+    format_row(row) returns the values tuple for the tree.
+    """
+    
+    def __init__(self, tree, row_key, format_row):
+        self.tree = tree
+        self.row_key = row_key
+        self.format_row = format_row
+        self._values = {}
+    
+    def item_id(self, row):
+        """Tree item id for a row"""
+        return str(self.row_key(row))
+    
+    def update(self, rows):
+        """Make the tree show exactly rows, in order; returns the change counts"""
+        return self.update_items((self.item_id(row), tuple(self.format_row(row))) for row in rows)
+    
+    def update_items(self, items):
+        """Make the tree show exactly the (iid, values) items, in order
+        
+        Returns a dict counting the inserted, updated, moved and deleted items.
+        """
+        items = list(items)
+        wanted = {iid for iid, _ in items}
+        stats = {'inserted': 0, 'updated': 0, 'moved': 0, 'deleted': 0}
+        
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                self._values.pop(iid, None)
+            stats['deleted'] = len(stale)
+        
+        # Items placed so far are in final order, so an insert or move to
+        # index lands in place; moves are only needed if kept rows reordered
+        kept = list(self.tree.get_children())
+        kept_set = set(kept)
+        reordered = kept != [iid for iid, _ in items if iid in kept_set]
+        
+        for index, (iid, values) in enumerate(items):
+            if iid not in kept_set:
+                self.tree.insert("", index, iid=iid, values=values)
+                stats['inserted'] += 1
+            else:
+                if reordered:
+                    self.tree.move(iid, "", index)
+                    stats['moved'] += 1
+                if self._values.get(iid) != values:
+                    self.tree.item(iid, values=values)
+                    stats['updated'] += 1
+            self._values[iid] = values
+        return stats
+    
+    def extend(self, rows):
+        """Append rows after the current items, updating any already shown"""
+        stats = {'inserted': 0, 'updated': 0, 'moved': 0, 'deleted': 0}
+        shown = set(self.tree.get_children())
+        for row in rows:
+            iid = self.item_id(row)
+            values = tuple(self.format_row(row))
+            if iid in shown:
+                if self._values.get(iid) != values:
+                    self.tree.item(iid, values=values)
+                    stats['updated'] += 1
+            else:
+                self.tree.insert("", "end", iid=iid, values=values)
+                shown.add(iid)
+                stats['inserted'] += 1
+            self._values[iid] = values
+        return stats
+    
+    def clear(self):
+        """Remove every item"""
+        self.tree.delete(*self.tree.get_children())
+        self._values.clear()
@@ -0,0 +1,270 @@
+from collections import OrderedDict
+
+from gui.tree_sync import TreeReconciler
+
+class VirtualTreeview:
+    """Show a large result set in a ttk.Treeview one visible window at a time
+    
+    The tree only ever holds the rows that fit on screen. Rows are fetched
+    from the database in pages of page_size as the user scrolls, and the
+    pages around the visible window are prefetched and kept in a small LRU
+    cache. The scrollbar is driven by the total row count, not by the tree.
+    
+    count_rows() returns the total number of rows. fetch_page(offset, limit,
+    after) returns up to limit rows starting at offset; after is the last row
+    of the previous page when it is cached, so sources can continue by keyset
+    instead of OFFSET. format_row(row) returns the values tuple for the tree.
+    row_key(row) is the row's primary key, used as its tree item id so
+    redraws only touch rows that changed; it defaults to the first column.
+    With a data_service both calls run on its worker thread under key.
+    """
+    
+    def __init__(self, tree, scrollbar, count_rows, fetch_page, format_row,
+                 data_service=None, key=None, page_size=100, prefetch_pages=1, max_pages=20, row_key=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.count_rows = count_rows
+        self.fetch_page = fetch_page
+        self.format_row = format_row
+        self.data_service = data_service
+        self.key = key or str(tree)
+        self.page_size = page_size
+        self.prefetch_pages = prefetch_pages
+        self.max_pages = max_pages
+        
+        self.total = 0
+        self.offset = 0
+        self._pages = OrderedDict()
+        self._stale_pages = {}
+        self._requested = set()
+        self._static_rows = None
+        self._generation = 0
+        self.sync = TreeReconciler(tree, row_key or (lambda row: format_row(row)[0]), format_row)
+        
+        # The tree no longer scrolls itself; the scrollbar moves our window
+        self.scrollbar.configure(command=self.on_scrollbar)
+        self.tree.configure(yscrollcommand="")
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self.on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self.on_arrow(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible_rows()))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(self.total))
+        self.tree.bind("<Configure>", lambda e: self.render(), add="+")
+    
+    def _run(self, key, func, args, on_success):
+        """Call func on the data service worker, or inline without one"""
+        if self.data_service is not None:
+            self.data_service.submit(key, func, *args, on_success=on_success,
+                                     on_error=lambda e: print(f"Failed to load rows for {self.key}: {e}"))
+            return
+        try:
+            result = func(*args)
+        except Exception as e:
+            print(f"Failed to load rows for {self.key}: {e}")
+            return
+        on_success(result)
+    
+    def refresh(self, keep_position=True):
+        """Drop cached pages and reload the row count and the visible window"""
+        self._generation += 1
+        # Old pages stay on screen until their replacements arrive, so the
+        # reload only touches the rows that actually changed
+        self._stale_pages = dict(self._pages) if keep_position and self._static_rows is None else {}
+        self._pages.clear()
+        self._requested.clear()
+        self._static_rows = None
+        if not keep_position:
+            self.offset = 0
+        generation = self._generation
+        
+        def on_count(total):
+            if generation != self._generation:
+                return
+            self.total = total or 0
+            self.render()
+        
+        self._run(f"{self.key}:count", self.count_rows, (), on_count)
+    
+    def cancel(self):
+        """Cancel this view's queued loads and return True if any were pending
+        
+        Missing pages are requested again the next time they are shown; call
+        refresh() to reload the row count if it was still loading.
+        """
+        pending = bool(self._requested)
+        self._generation += 1
+        if self.data_service is not None:
+            pending = self.data_service.has_pending(f"{self.key}:count") or pending
+            self.data_service.cancel(f"{self.key}:count")
+            for page in self._requested:
+                self.data_service.cancel(f"{self.key}:page:{page}")
+        self._requested.clear()
+        return pending
+    
+    def show_rows(self, rows):
+        """Display an already loaded list of rows, such as search results"""
+        self._generation += 1
+        self._pages.clear()
+        self._stale_pages = {}
+        self._requested.clear()
+        self._static_rows = list(rows or [])
+        self.total = len(self._static_rows)
+        self.offset = 0
+        self.render()
+    
+    def append_rows(self, rows):
+        """Add rows to the list shown by show_rows, keeping the scroll position"""
+        if self._static_rows is None:
+            self.show_rows(rows)
+            return
+        self._static_rows.extend(rows)
+        self.total = len(self._static_rows)
+        self.render()
+    
+    def visible_rows(self):
+        """Number of rows the tree can show at its current size"""
+        rows = int(self.tree.cget("height") or 0)
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            height = self.tree.winfo_height()
+            if bbox and bbox[3] > 0 and height > 1:
+                rows = max(rows, (height - bbox[1]) // bbox[3])
+        return max(rows, 1)
+    
+    def _clamp(self, offset):
+        return max(0, min(offset, self.total - self.visible_rows()))
+    
+    def scroll(self, rows):
+        """Move the visible window by a number of rows"""
+        self.scroll_to(self.offset + rows)
+        return "break"
+    
+    def scroll_to(self, offset):
+        """Move the visible window so it starts at row offset"""
+        offset = self._clamp(offset)
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return "break"
+    
+    def on_scrollbar(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+    
+    def on_mousewheel(self, event):
+        """Scroll three rows per wheel notch"""
+        return self.scroll(-3 if event.delta > 0 else 3)
+    
+    def on_arrow(self, step):
+        """Scroll when the arrow keys move past the first or last visible row"""
+        children = self.tree.get_children()
+        focus = self.tree.focus()
+        if not children or focus not in children:
+            return None
+        index = children.index(focus) + step
+        if 0 <= index < len(children):
+            return None
+        self.scroll(step)
+        children = self.tree.get_children()
+        if children:
+            target = children[0] if step < 0 else children[-1]
+            self.tree.focus(target)
+            self.tree.selection_set(target)
+        return "break"
+    
+    def _get_page(self, page):
+        """Return a cached page, requesting it from the source when missing"""
+        if self._static_rows is not None:
+            start = page * self.page_size
+            return self._static_rows[start:start + self.page_size]
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+        if page not in self._requested:
+            self._request_page(page)
+        # Without a data service the fetch above completed inline
+        if page in self._pages:
+            return self._pages[page]
+        return self._stale_pages.get(page)
+    
+    def _request_page(self, page):
+        """Fetch one page, continuing from the previous page's last row if cached"""
+        self._requested.add(page)
+        generation = self._generation
+        previous = self._pages.get(page - 1)
+        after = previous[-1] if previous else None
+        
+        def on_page(rows):
+            self._requested.discard(page)
+            if generation != self._generation:
+                return
+            self._pages[page] = list(rows or [])
+            self._stale_pages.pop(page, None)
+            # A short page means the list ends here, whatever the count said
+            end = page * self.page_size + len(self._pages[page])
+            if len(self._pages[page]) < self.page_size and end < self.total:
+                self.total = end
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+            if self.data_service is not None:
+                self.render()
+        
+        self._run(f"{self.key}:page:{page}", self.fetch_page,
+                  (page * self.page_size, self.page_size, after), on_page)
+    
+    def rows_in_window(self):
+        """Rows for the visible window, with None for rows still loading"""
+        if not self.total:
+            return []
+        visible = self.visible_rows()
+        end = min(self.offset + visible, self.total)
+        first_page = self.offset // self.page_size
+        last_page = max(end - 1, self.offset) // self.page_size
+        
+        rows = []
+        for page in range(first_page, last_page + 1):
+            page_rows = self._get_page(page)
+            start = page * self.page_size
+            for index in range(max(self.offset, start), min(end, start + self.page_size)):
+                if page_rows is None:
+                    rows.append(None)
+                elif index - start < len(page_rows):
+                    rows.append(page_rows[index - start])
+        
+        # Warm the cache around the window so short scrolls never wait
+        if self._static_rows is None:
+            last_available = (self.total - 1) // self.page_size
+            for page in range(first_page - self.prefetch_pages, last_page + self.prefetch_pages + 1):
+                if 0 <= page <= last_available:
+                    self._get_page(page)
+        return rows
+    
+    def render(self):
+        """Redraw the visible window and update the scrollbar"""
+        self.offset = self._clamp(self.offset)
+        rows = self.rows_in_window()
+        # Rows keep their item ids across redraws, so scrolling by one row
+        # touches two items and the selection survives reloads
+        items = []
+        for index, row in enumerate(rows, self.offset):
+            if row is None:
+                items.append((f"pending:{index}", ("…",)))
+            else:
+                items.append((self.sync.item_id(row), tuple(self.format_row(row))))
+        self.sync.update_items(items)
+        
+        if self.total:
+            first = self.offset / self.total
+            last = min(1.0, (self.offset + max(len(rows), 1)) / self.total)
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
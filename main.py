@@ -1,16 +1,16 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
 import sys
 import os
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database.db_manager import DatabaseManager
-from modules.farmer import FarmerManager
-from modules.crop import CropManager
-from modules.finance import FinanceManager
-from gui.main_window import MainWindow
+# Profiling starts before anything heavy is imported
+from utils.profiling import enable_startup_profiling_from_argv, get_startup_profiler, profile_phase
+enable_startup_profiling_from_argv(sys.argv)
+
+with profile_phase("imports.tkinter"):
+    import tkinter as tk
+    from tkinter import ttk, messagebox
 
 class FarmerManagementSystem:
     def __init__(self, root, user=None):
@@ -21,23 +21,46 @@ class FarmerManagementSystem:
         self.root.geometry("1200x700")
         self.root.configure(bg='#f0f0f0')
         
-        # Initialize managers
-        self.db_manager = DatabaseManager()
-        self.farmer_manager = FarmerManager()
-        self.crop_manager = CropManager()
-        self.finance_manager = FinanceManager()
+        # The main window's modules are only needed after login
+        with profile_phase("imports.main_window"):
+            from database.db_manager import get_database_manager
+            from modules.farmer import FarmerManager
+            from modules.crop import CropManager
+            from modules.finance import FinanceManager
+            from modules.dashboard import DashboardManager
+            from modules.analytics import AnalyticsManager
+            from modules.harvest import HarvestCalendar
+            from modules.user import UserManager
+            from gui.main_window import MainWindow
+        
+        # Initialize managers around one shared database manager
+        with profile_phase("managers"):
+            self.db_manager = get_database_manager()
+            self.farmer_manager = FarmerManager(self.db_manager)
+            self.crop_manager = CropManager(self.db_manager)
+            self.finance_manager = FinanceManager(self.db_manager)
+            self.dashboard_manager = DashboardManager(self.db_manager)
+            self.user_manager = UserManager(self.db_manager)
+            self.analytics_manager = AnalyticsManager(self.db_manager)
+            self.harvest_calendar = HarvestCalendar(self.db_manager)
         
         # Create main window
-        self.main_window = MainWindow(
-            self.root, 
-            self.farmer_manager, 
-            self.crop_manager, 
-            self.finance_manager,
-            self.user
-        )
+        with profile_phase("main_window"):
+            self.main_window = MainWindow(
+                self.root, 
+                self.farmer_manager, 
+                self.crop_manager, 
+                self.finance_manager,
+                self.user,
+                self.dashboard_manager,
+                self.user_manager,
+                analytics_manager=self.analytics_manager,
+                harvest_calendar=self.harvest_calendar
+            )
         
         # Center the window
         self.center_window()
+        self.root.after_idle(lambda: get_startup_profiler().mark("main_window_ready", write=True))
         
     def center_window(self):
         """Center the window on screen"""
@@ -55,10 +78,101 @@ class FarmerManagementSystem:
         except Exception as e:
             messagebox.showerror("Error", f"Application error: {str(e)}")
         finally:
-            # Cleanup
+            # Cleanup: stop change polling and the GUI's database worker, then close the shared connection pool
+            if hasattr(self, 'main_window'):
+                self.main_window.auto_refresh.close()
+                self.main_window.data_service.shutdown()
+                self.main_window.export_service.shutdown()
             if hasattr(self, 'db_manager'):
                 self.db_manager.disconnect()
 
+def run_login():
+    """Show the login window, timing its imports and setup when profiling"""
+    with profile_phase("imports.login_window"):
+        from gui.login_window import LoginWindow
+    root = tk.Tk()
+    with profile_phase("login_window"):
+        login_app = LoginWindow(root)
+    root.after_idle(lambda: get_startup_profiler().mark("login_window_ready", write=True))
+    login_app.run()
+
+def run_export(argv):
+    """Export a dataset to CSV or XLSX from the command line, printing progress"""
+    import argparse
+    from modules.export import EXPORT_COLUMNS, EXPORT_FORMATS, ExportManager
+    parser = argparse.ArgumentParser(prog="main.py --export", description="Export records without the GUI")
+    parser.add_argument('dataset', choices=sorted(EXPORT_COLUMNS))
+    parser.add_argument('path', help="output file; the format follows the extension unless --format is given")
+    parser.add_argument('--format', choices=EXPORT_FORMATS)
+    parser.add_argument('--farmer-id', type=int, help="only this farmer's transactions or plantings")
+    parser.add_argument('--type', choices=('income', 'expense'), help="transactions of this type only")
+    parser.add_argument('--start-date', help="transactions on or after YYYY-MM-DD")
+    parser.add_argument('--end-date', help="transactions on or before YYYY-MM-DD")
+    args = parser.parse_args(argv)
+    
+    filters = {}
+    if args.farmer_id is not None:
+        if args.dataset == 'farmers':
+            parser.error("--farmer-id applies to transactions and plantings")
+        filters['farmer_id'] = args.farmer_id
+    if args.type or args.start_date or args.end_date:
+        if args.dataset != 'transactions':
+            parser.error("--type, --start-date and --end-date apply to transactions")
+        filters.update(transaction_type=args.type, start_date=args.start_date, end_date=args.end_date)
+    
+    def progress(written, total):
+        print(f"\rExported {written:,} of {total:,} {args.dataset}", end="", file=sys.stderr, flush=True)
+    
+    written = ExportManager().export(args.dataset, args.path, args.format, progress, **filters)
+    print(file=sys.stderr)
+    if written is None:
+        sys.exit(1)
+    print(f"Exported {written:,} {args.dataset} to {args.path}")
+
+def run_import(argv):
+    """Bulk-import a CSV file of farmers or transactions from the command line"""
+    import argparse
+    from database.db_manager import DatabaseManager
+    from database.profiles import PROFILE_ENV_VAR
+    from modules.importer import IMPORT_CHUNK_SIZE, IMPORT_DATASETS, CsvImporter
+    parser = argparse.ArgumentParser(prog="main.py --import", description="Import records from a CSV file")
+    parser.add_argument('dataset', choices=IMPORT_DATASETS)
+    parser.add_argument('path', help="CSV file with a header row")
+    parser.add_argument('--rejects', help="where to write rejected rows (default: PATH.rejects.csv)")
+    parser.add_argument('--restart', action='store_true', help="ignore the checkpoint of an earlier run")
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help="rows per transaction")
+    args = parser.parse_args(argv)
+    
+    # Imports use the bulk-load profile unless FMS_DB_PROFILE says otherwise
+    db = DatabaseManager(profile=os.environ.get(PROFILE_ENV_VAR) or 'bulk-load')
+    
+    def progress(summary):
+        percent = summary['bytes_read'] * 100 // max(summary['total_bytes'], 1)
+        print(f"\rLine {summary['line']:,} ({percent}%): {summary['imported']:,} imported, "
+              f"{summary['rejected']:,} rejected", end="", file=sys.stderr, flush=True)
+    
+    try:
+        summary = CsvImporter(db, chunk_size=args.chunk_size).import_file(
+            args.dataset, args.path, args.rejects, args.restart, args.encoding, progress)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        sys.exit(1)
+    finally:
+        db.disconnect()
+    print(file=sys.stderr)
+    if summary is None:
+        print("Run the same command again to resume after the last committed chunk")
+        sys.exit(1)
+    totals = ""
+    if summary['resumed_from']:
+        print(f"Resumed after line {summary['resumed_from']:,}")
+        totals = " (including earlier runs)"
+    print(f"Imported {summary['imported']:,} {args.dataset}, rejected {summary['rejected']:,}{totals} "
+          f"in {summary['elapsed']:.1f}s")
+    if summary['rejected']:
+        print(f"Rejected rows: {summary['rejects_path']}")
+
 def main():
     """Main entry point"""
     try:
@@ -68,12 +182,34 @@ def main():
             root = tk.Tk()
             app = FarmerManagementSystem(root)
             app.run()
+        elif len(sys.argv) > 1 and sys.argv[1] == '--rebuild-rollups':
+            # Recompute the financial rollup tables from all transactions
+            from modules.finance import FinanceManager
+            if not FinanceManager().rebuild_financial_rollups():
+                sys.exit(1)
+            print("Financial rollups rebuilt")
+        elif len(sys.argv) > 1 and sys.argv[1] == '--rebuild-search':
+            # Rebuild the full-text search indexes from the farmers and transactions tables
+            from modules.finance import FinanceManager
+            if not FinanceManager().rebuild_search_indexes():
+                sys.exit(1)
+            print("Search indexes rebuilt")
+        elif len(sys.argv) > 1 and sys.argv[1] == '--export':
+            # Headless export, e.g. main.py --export transactions ledger.xlsx --start-date 2024-04-01
+            run_export(sys.argv[2:])
+        elif len(sys.argv) > 1 and sys.argv[1] == '--import':
+            # Bulk CSV import, e.g. main.py --import transactions ledger.csv; rerun to resume
+            run_import(sys.argv[2:])
+        elif len(sys.argv) > 1 and sys.argv[1] == '--benchmark-auth':
+            # Time password hashing here to pick FMS_PBKDF2_ITERATIONS for this deployment
+            from modules.auth import ITERATIONS_ENV, benchmark, configured_iterations, recommend_iterations
+            for iterations, elapsed_ms in benchmark():
+                print(f"{iterations:>9,} iterations: {elapsed_ms:7.1f} ms per hash")
+            print(f"Configured: {configured_iterations():,} iterations")
+            print(f"Recommended for ~250 ms: {ITERATIONS_ENV}={recommend_iterations()}")
         else:
             # Start with login
-            from gui.login_window import LoginWindow
-            root = tk.Tk()
-            login_app = LoginWindow(root)
-            login_app.run()
+            run_login()
     except Exception as e:
         print(f"Failed to start application: {e}")
         sys.exit(1)
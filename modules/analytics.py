@@ -0,0 +1,224 @@
+import threading
+
+from database.changes import read_change_versions
+from database.db_manager import get_database_manager
+from database.harvest import from_day
+
+# NumPy is optional and costly to import, so it is loaded on first use
+np = None
+_numpy_checked = False
+
+TOP_FARMER_LIMIT = 10
+
+# Harvest month as year * 12 + month - 1, or -1 when no harvest date is set
+UNSCHEDULED_MONTH = -1
+
+# Tables whose changes invalidate the cached projections
+SOURCE_TABLES = ('plantings', 'crops', 'farmers')
+
+# Growing plantings summed per (harvest day, crop) and per (farmer, crop).
+# Each GROUP BY follows the column order of a covering index
+# (idx_plantings_harvest_day, idx_plantings_status_farmer_crop), so SQLite
+# aggregates in one ordered index scan without sorting, and only the groups
+# reach Python. Rows are (key, crop_id, plantings, area). Without ANALYZE
+# statistics the planner would pick the status index for the farmer groups
+# and sort, hence the INDEXED BY.
+HARVEST_GROUPS_QUERY = '''
+    SELECT harvest_day, COALESCE(crop_id, 0), COUNT(*), SUM(COALESCE(area_planted, 0.0))
+    FROM plantings
+    WHERE status = 'Growing'
+    GROUP BY harvest_day, crop_id
+'''
+FARMER_GROUPS_QUERY = '''
+    SELECT COALESCE(farmer_id, 0), COALESCE(crop_id, 0), COUNT(*), SUM(COALESCE(area_planted, 0.0))
+    FROM plantings INDEXED BY idx_plantings_status_farmer_crop
+    WHERE status = 'Growing'
+    GROUP BY farmer_id, crop_id
+'''
+
+def numpy_available():
+    """Import NumPy on first call and report whether it is installed"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # Optional: the pure-Python path gives the same results
+            pass
+    return np is not None
+
+def harvest_month(day):
+    """Harvest month index of a harvest day number"""
+    if day is None:
+        return UNSCHEDULED_MONTH
+    harvest_date = from_day(day)
+    return harvest_date.year * 12 + harvest_date.month - 1
+
+def month_label(month_index):
+    """'YYYY-MM' for a harvest month index"""
+    if month_index == UNSCHEDULED_MONTH:
+        return "Unscheduled"
+    year, month = divmod(int(month_index), 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+def project_numpy(rows, crop_yields, crop_prices):
+    """Vectorized projections over (key, crop_id, plantings, area) groups
+    
+    Returns {key: [plantings, area, expected_yield, expected_revenue]}.
+    """
+    data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    keys = data[:, 0].astype(np.int64)
+    crop_ids = data[:, 1].astype(np.int64)
+    size = max(crop_yields, default=0) + 1
+    size = max(size, int(crop_ids.max()) + 1 if len(crop_ids) else 0)
+    yield_lookup = np.zeros(size)
+    price_lookup = np.zeros(size)
+    for crop_id, value in crop_yields.items():
+        yield_lookup[crop_id] = value
+    for crop_id, value in crop_prices.items():
+        price_lookup[crop_id] = value
+    
+    area = data[:, 3]
+    expected_yield = area * yield_lookup[crop_ids]
+    revenue = expected_yield * price_lookup[crop_ids]
+    groups, inverse = np.unique(keys, return_inverse=True)
+    sums = [np.bincount(inverse, weights=values, minlength=len(groups))
+            for values in (data[:, 2], area, expected_yield, revenue)]
+    return {int(key): [int(count), float(a), float(y), float(r)]
+            for key, count, a, y, r in zip(groups, *sums)}
+
+def project_python(rows, crop_yields, crop_prices):
+    """Pure-Python equivalent of project_numpy, one pass over the groups"""
+    totals = {}
+    for key, crop_id, plantings, area in rows:
+        expected_yield = area * crop_yields.get(crop_id, 0.0)
+        revenue = expected_yield * crop_prices.get(crop_id, 0.0)
+        group = totals.get(key)
+        if group is None:
+            totals[key] = [plantings, area, expected_yield, revenue]
+        else:
+            group[0] += plantings
+            group[1] += area
+            group[2] += expected_yield
+            group[3] += revenue
+    return totals
+
+def _as_rows(groups, key_name):
+    """Turn {key: totals} into dicts sorted by expected revenue"""
+    rows = [{key_name: key, 'plantings': totals[0], 'area': totals[1],
+             'expected_yield': totals[2], 'expected_revenue': totals[3]}
+            for key, totals in groups.items()]
+    rows.sort(key=lambda row: row['expected_revenue'], reverse=True)
+    return rows
+
+class AnalyticsManager:
+    """Expected yield and revenue of the Growing plantings
+    
+    Expected yield is area_planted * yield_per_acre and expected revenue is
+    that times price_per_unit, totalled by crop, farmer and harvest month.
+    SQLite sums the plantings per crop and harvest day and per farmer and
+    crop, and those groups are projected with NumPy when it is installed.
+    Results are cached until the change counters of the plantings, crops or
+    farmers tables move.
+    """
+    
+    def __init__(self, db=None, use_numpy=None):
+        self.db = db or get_database_manager()
+        # None means "if installed", decided when the first report is computed
+        self.use_numpy = use_numpy
+        self._cache = None
+        self._lock = threading.Lock()
+    
+    def _source_versions(self, connection):
+        versions = read_change_versions(connection)
+        return tuple(versions.get(table, 0) for table in SOURCE_TABLES)
+    
+    def _load_groups(self, connection, query):
+        """Fetch (key, crop_id, plantings, area) groups as plain tuples"""
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        return cursor.execute(query).fetchall()
+    
+    def _read_economics(self, connection, farmer_limit, versions):
+        """Load the planting groups and crop parameters and compute the projections"""
+        crops = connection.execute(
+            "SELECT crop_id, name, yield_per_acre, price_per_unit FROM crops").fetchall()
+        crop_names = {row['crop_id']: row['name'] for row in crops}
+        crop_yields = {row['crop_id']: row['yield_per_acre'] or 0.0 for row in crops}
+        crop_prices = {row['crop_id']: row['price_per_unit'] or 0.0 for row in crops}
+        
+        harvest_groups = self._load_groups(connection, HARVEST_GROUPS_QUERY)
+        farmer_groups = self._load_groups(connection, FARMER_GROUPS_QUERY)
+        months = {}
+        crop_groups, month_groups = [], []
+        for day, crop_id, plantings, area in harvest_groups:
+            if day not in months:
+                months[day] = harvest_month(day)
+            crop_groups.append((crop_id, crop_id, plantings, area))
+            month_groups.append((months[day], crop_id, plantings, area))
+        
+        if self.use_numpy is None:
+            self.use_numpy = numpy_available()
+        project = project_numpy if self.use_numpy and numpy_available() and harvest_groups else project_python
+        by_crop = project(crop_groups, crop_yields, crop_prices)
+        by_farmer = project(farmer_groups, crop_yields, crop_prices)
+        by_month = project(month_groups, crop_yields, crop_prices)
+        
+        crop_rows = _as_rows(by_crop, 'crop_id')
+        for row in crop_rows:
+            row['crop_name'] = crop_names.get(row['crop_id'], "Unknown")
+        
+        farmer_rows = _as_rows(by_farmer, 'farmer_id')[:farmer_limit]
+        if farmer_rows:
+            placeholders = ", ".join("?" * len(farmer_rows))
+            names = dict(connection.execute(
+                f"SELECT farmer_id, name FROM farmers WHERE farmer_id IN ({placeholders})",
+                [row['farmer_id'] for row in farmer_rows]).fetchall())
+            for row in farmer_rows:
+                row['farmer_name'] = names.get(row['farmer_id'], "Unknown")
+        
+        month_rows = sorted(_as_rows(by_month, 'month'), key=lambda row: row['month'])
+        for row in month_rows:
+            row['month'] = month_label(row['month'])
+        
+        return {
+            'plantings': sum(row['plantings'] for row in crop_rows),
+            'area': sum(row['area'] for row in crop_rows),
+            'expected_yield': sum(row['expected_yield'] for row in crop_rows),
+            'expected_revenue': sum(row['expected_revenue'] for row in crop_rows),
+            'by_crop': crop_rows,
+            'top_farmers': farmer_rows,
+            'by_month': month_rows,
+            'farmer_limit': farmer_limit,
+            'versions': versions,
+        }
+    
+    def _read_cached(self, connection, farmer_limit, refresh):
+        versions = self._source_versions(connection)
+        with self._lock:
+            cached = self._cache
+        if (not refresh and cached is not None and cached['versions'] == versions
+                and cached['farmer_limit'] == farmer_limit):
+            return cached
+        return self._read_economics(connection, farmer_limit, versions)
+    
+    def get_crop_economics(self, farmer_limit=TOP_FARMER_LIMIT, refresh=False):
+        """Project expected yield and revenue of the Growing plantings
+        
+        Returns a dict with the plantings count, total area, expected_yield
+        and expected_revenue, plus by_crop and top_farmers (sorted by expected
+        revenue) and by_month (in harvest order). Pass refresh=True to
+        recompute even if the source tables have not changed.
+        """
+        economics = self.db.run_read(self._read_cached, farmer_limit, refresh)
+        if economics is None:
+            return None
+        with self._lock:
+            self._cache = economics
+        return economics
+    
+    def invalidate(self):
+        """Drop the cached projections"""
+        with self._lock:
+            self._cache = None
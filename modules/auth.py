@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import threading
+import time
+
+from modules.user import UserManager
+
+# Passwords are stored as "pbkdf2_sha256$<iterations>$<salt>$<hash>", so the
+# cost can be raised per deployment without invalidating existing accounts:
+# hashes made with a different iteration count, and legacy unsalted SHA-256
+# hex digests, are re-hashed the next time their owner logs in.
+
+ALGORITHM = 'pbkdf2_sha256'
+DEFAULT_ITERATIONS = 260000
+MIN_ITERATIONS = 10000
+ITERATIONS_ENV = 'FMS_PBKDF2_ITERATIONS'
+SALT_BYTES = 16
+SESSION_TTL = 8 * 60 * 60
+
+_LEGACY_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
+def configured_iterations():
+    """PBKDF2 iteration count from FMS_PBKDF2_ITERATIONS, or the default"""
+    value = os.environ.get(ITERATIONS_ENV)
+    if not value:
+        return DEFAULT_ITERATIONS
+    try:
+        return max(MIN_ITERATIONS, int(value))
+    except ValueError:
+        print(f"Ignoring invalid {ITERATIONS_ENV}={value!r}")
+        return DEFAULT_ITERATIONS
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+def hash_password(password, iterations=None, salt=None):
+    """Derive a salted PBKDF2-SHA256 hash string for a password"""
+    iterations = iterations or configured_iterations()
+    salt = salt or secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{ALGORITHM}${iterations}${_b64(salt)}${_b64(digest)}"
+
+def is_legacy_hash(stored_hash):
+    """True for the unsalted SHA-256 hex digests older versions stored"""
+    return bool(stored_hash) and _LEGACY_HASH_RE.match(stored_hash) is not None
+
+def verify_password(password, stored_hash):
+    """Check a password against a stored PBKDF2 or legacy SHA-256 hash"""
+    if not stored_hash:
+        return False
+    if is_legacy_hash(stored_hash):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, stored_hash)
+    try:
+        algorithm, iterations, salt, digest = stored_hash.split('$')
+        if algorithm != ALGORITHM:
+            return False
+        candidate = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _unb64(salt), int(iterations))
+        return hmac.compare_digest(candidate, _unb64(digest))
+    except ValueError:
+        return False
+
+def needs_rehash(stored_hash, iterations=None):
+    """True when a stored hash is legacy or uses a different iteration count"""
+    if is_legacy_hash(stored_hash):
+        return True
+    try:
+        algorithm, stored_iterations, _, _ = stored_hash.split('$')
+        return algorithm != ALGORITHM or int(stored_iterations) != (iterations or configured_iterations())
+    except (AttributeError, ValueError):
+        return True
+
+def benchmark(iteration_counts=(100000, 260000, 600000), rounds=3):
+    """Return [(iterations, milliseconds per hash)] measured on this machine"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    results = []
+    for iterations in iteration_counts:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            hashlib.pbkdf2_hmac('sha256', b'benchmark password', salt, iterations)
+        results.append((iterations, (time.perf_counter() - start) * 1000 / rounds))
+    return results
+
+def recommend_iterations(target_ms=250, sample_iterations=50000):
+    """Iteration count that takes about target_ms per hash on this machine"""
+    (_, elapsed_ms), = benchmark((sample_iterations,), rounds=2)
+    iterations = int(sample_iterations * target_ms / max(elapsed_ms, 0.001))
+    # Round to a readable figure
+    return max(MIN_ITERATIONS, iterations // 10000 * 10000)
+
+class AuthService:
+    """Password authentication with PBKDF2 hashes and an in-process session cache
+    
+    authenticate() and register() derive keys and are meant to run on a
+    worker thread. Successful logins are cached as sessions keyed by
+    user_id, so role checks and re-authentication need no database query.
+    """
+    
+    def __init__(self, user_manager=None, iterations=None, session_ttl=SESSION_TTL):
+        self.user_manager = user_manager or UserManager()
+        self.iterations = iterations or configured_iterations()
+        self.session_ttl = session_ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+        # Unknown usernames still pay for one hash, so timing does not reveal them
+        self._dummy_hash = None
+    
+    def authenticate(self, username, password):
+        """Return (user_id, username, full_name, role) for valid credentials, else None"""
+        user = self.user_manager.get_user_by_username(username)
+        if user is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = hash_password(secrets.token_hex(8), self.iterations)
+            verify_password(password, self._dummy_hash)
+            return None
+        
+        stored_hash = user['password_hash']
+        if not verify_password(password, stored_hash):
+            return None
+        
+        if needs_rehash(stored_hash, self.iterations):
+            stored_hash = hash_password(password, self.iterations)
+            self.user_manager.set_password_hash(user['user_id'], stored_hash)
+        
+        account = (user['user_id'], user['username'], user['full_name'], user['role'])
+        with self._lock:
+            self._sessions[user['user_id']] = {
+                'user': account,
+                'password_hash': stored_hash,
+                'expires': time.monotonic() + self.session_ttl,
+            }
+        return account
+    
+    def register(self, username, email, password, full_name=None, role='user'):
+        """Create an account with a freshly salted hash"""
+        return self.user_manager.create_user(username, email, hash_password(password, self.iterations),
+                                             full_name, role)
+    
+    def get_session(self, user_id):
+        """Return the cached session for user_id, or None if absent or expired"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session and session['expires'] < time.monotonic():
+                del self._sessions[user_id]
+                session = None
+            return session
+    
+    def has_role(self, user_id, role):
+        """Role check against the session cache"""
+        session = self.get_session(user_id)
+        return bool(session) and session['user'][3] == role
+    
+    def reauthenticate(self, user_id, password):
+        """Confirm a logged-in user's password without querying the database"""
+        session = self.get_session(user_id)
+        return bool(session) and verify_password(password, session['password_hash'])
+    
+    def logout(self, user_id):
+        """Drop a user's session"""
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+_auth_service = None
+_auth_service_lock = threading.Lock()
+
+def get_auth_service():
+    """Return the process-wide AuthService, shared by the login and main windows"""
+    global _auth_service
+    with _auth_service_lock:
+        if _auth_service is None:
+            _auth_service = AuthService()
+        return _auth_service
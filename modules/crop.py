@@ -1,9 +1,12 @@
-from database.db_manager import DatabaseManager
-from datetime import datetime, timedelta
+from database.db_manager import DEFAULT_BATCH_SIZE, get_database_manager, keyset_query
+from database.bulk import insert_many, set_triggers_deferred
+from database.changes import note_table_change
+from database.harvest import INSERT_PLANTING_SQL, to_day
+from datetime import date
 
 class CropManager:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
     
     def add_crop(self, name, variety=None, growth_period=None, yield_per_acre=None, price_per_unit=None):
         """Add a new crop type to the database"""
@@ -27,41 +30,86 @@ class CropManager:
     
     def add_planting(self, farmer_id, crop_id, planting_date, area_planted, expected_harvest_date=None):
         """Add a new planting record"""
-        if not expected_harvest_date:
-            # Calculate expected harvest date based on crop growth period
-            crop = self.get_crop_by_id(crop_id)
-            if crop and crop['growth_period']:
-                planting_dt = datetime.strptime(planting_date, '%Y-%m-%d')
-                expected_harvest_date = (planting_dt + timedelta(days=crop['growth_period'])).strftime('%Y-%m-%d')
+        # Without a harvest date the INSERT derives it from the crop's growth period
+        params = (farmer_id, crop_id, planting_date, area_planted, expected_harvest_date, 'Growing')
+        return self.db.execute_query(INSERT_PLANTING_SQL, params)
+    
+    def add_plantings_bulk(self, plantings):
+        """Add many planting records in one transaction and return their new IDs
+        
+        Each item is a (farmer_id, crop_id, planting_date, area_planted,
+        expected_harvest_date, status) tuple; the last two fields are optional.
+        Missing harvest dates are derived from the crop's growth period.
+        """
+        def rows():
+            for planting in plantings:
+                farmer_id, crop_id, planting_date, area_planted = planting[:4]
+                expected_harvest_date = planting[4] if len(planting) > 4 else None
+                status = planting[5] if len(planting) > 5 and planting[5] else 'Growing'
+                yield (farmer_id, crop_id, planting_date, area_planted, expected_harvest_date, status)
         
+        def insert_batch(connection):
+            # Bump the change counter once for the whole batch rather than per row
+            set_triggers_deferred(connection, True)
+            ids = insert_many(connection, INSERT_PLANTING_SQL, rows())
+            if ids:
+                note_table_change(connection, 'plantings')
+            set_triggers_deferred(connection, False)
+            return ids
+        
+        return self.db.run_in_transaction(insert_batch)
+    
+    def _plantings_query(self, farmer_id=None, after_id=None, after_date=None, limit=None, offset=None):
+        """Build the planting listing query, newest first by (planting_date, planting_id), undated last
+        
+        Farmers and crops are LEFT JOINed so a planting whose farmer was deleted
+        is still listed, named 'Unknown', and count_plantings stays a plain
+        count of the table.
+        """
         query = '''
-            INSERT INTO plantings (farmer_id, crop_id, planting_date, area_planted, expected_harvest_date)
-            VALUES (?, ?, ?, ?, ?)
+            SELECT p.*, COALESCE(f.name, 'Unknown') as farmer_name, COALESCE(c.name, 'Unknown') as crop_name
+            FROM plantings p
+            LEFT JOIN farmers f ON p.farmer_id = f.farmer_id
+            LEFT JOIN crops c ON p.crop_id = c.crop_id
+            WHERE 1=1
         '''
-        params = (farmer_id, crop_id, planting_date, area_planted, expected_harvest_date)
+        params = []
+        
+        if farmer_id:
+            query += " AND p.farmer_id = ?"
+            params.append(farmer_id)
+        
+        # Resume after a known row; its date is looked up when not supplied
+        return keyset_query(query, params, 'p.planting_date', 'p.planting_id', after_id, after_date,
+                            "(SELECT planting_date FROM plantings WHERE planting_id = ?)", limit, offset)
+    
+    def get_all_plantings(self, farmer_id=None, after_id=None, after_date=None, limit=None, offset=None):
+        """Get all planting records, optionally filtered by farmer and paged by keyset
+        
+        Pass the planting_id (and optionally planting_date) of the last row of
+        the previous page as after_id/after_date to fetch the next `limit` rows.
+        offset skips rows instead, for jumping to an arbitrary position.
+        """
+        query, params = self._plantings_query(farmer_id, after_id, after_date, limit, offset)
         return self.db.execute_query(query, params)
     
-    def get_all_plantings(self, farmer_id=None):
-        """Get all planting records, optionally filtered by farmer"""
+    def count_plantings(self, farmer_id=None, status=None):
+        """Count planting records, optionally for one farmer and/or status"""
+        query = "SELECT COUNT(*) as total FROM plantings WHERE 1=1"
+        params = []
         if farmer_id:
-            query = '''
-                SELECT p.*, f.name as farmer_name, c.name as crop_name
-                FROM plantings p
-                JOIN farmers f ON p.farmer_id = f.farmer_id
-                JOIN crops c ON p.crop_id = c.crop_id
-                WHERE p.farmer_id = ?
-                ORDER BY p.planting_date DESC
-            '''
-            return self.db.execute_query(query, (farmer_id,))
-        else:
-            query = '''
-                SELECT p.*, f.name as farmer_name, c.name as crop_name
-                FROM plantings p
-                JOIN farmers f ON p.farmer_id = f.farmer_id
-                JOIN crops c ON p.crop_id = c.crop_id
-                ORDER BY p.planting_date DESC
-            '''
-            return self.db.execute_query(query)
+            query += " AND farmer_id = ?"
+            params.append(farmer_id)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        result = self.db.execute_query(query, params)
+        return result[0]['total'] if result else 0
+    
+    def iter_plantings(self, farmer_id=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream planting records newest first without loading them all at once"""
+        query, params = self._plantings_query(farmer_id)
+        return self.db.iter_query(query, params, batch_size)
     
     def update_planting_status(self, planting_id, status):
         """Update the status of a planting (Growing, Harvested, Failed)"""
@@ -114,6 +162,7 @@ class CropManager:
     
     def get_harvest_schedule(self, days_ahead=30):
         """Get upcoming harvests in the next N days"""
+        # A range on the harvest_day index instead of comparing TEXT dates
         query = '''
             SELECT 
                 p.planting_id,
@@ -127,7 +176,7 @@ class CropManager:
             JOIN farmers f ON p.farmer_id = f.farmer_id
             JOIN crops c ON p.crop_id = c.crop_id
             WHERE p.status = 'Growing'
-            AND p.expected_harvest_date <= date('now', '+' || ? || ' days')
-            ORDER BY p.expected_harvest_date
+            AND p.harvest_day <= ?
+            ORDER BY p.harvest_day, p.planting_id
         '''
-        return self.db.execute_query(query, (days_ahead,)) 
\ No newline at end of file
+        return self.db.execute_query(query, (to_day(date.today()) + days_ahead,))
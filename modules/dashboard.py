@@ -0,0 +1,137 @@
+import threading
+import time
+
+from database.db_manager import get_database_manager
+from modules.farmer import FarmerManager
+
+DEFAULT_CACHE_TTL = 5.0
+RECENT_ACTIVITY_LIMIT = 10
+LEADERBOARD_PAGE_SIZE = 10
+
+# Leaderboard orderings: statistic -> label
+LEADERBOARD_SORTS = {
+    'net_profit': "Top earners",
+    'total_income': "Highest income",
+    'total_area': "Largest planted area",
+    'total_plantings': "Most plantings",
+}
+
+class DashboardManager:
+    def __init__(self, db=None, cache_ttl=DEFAULT_CACHE_TTL, farmer_manager=None):
+        self.db = db or get_database_manager()
+        self.farmer_manager = farmer_manager or FarmerManager(self.db)
+        self.cache_ttl = cache_ttl
+        self._cache = None
+        self._cached_at = 0.0
+        self._farmer_stats = None
+        self._farmer_stats_at = 0.0
+        self._rankings = {}
+        self._lock = threading.Lock()
+    
+    def _read_stats(self, connection, recent_limit):
+        """Run the dashboard queries on one connection inside one snapshot"""
+        # Counts come from the smallest covering index of each table and the
+        # money totals from the finance rollup, so no query reads every row
+        totals = connection.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM farmers) as total_farmers,
+                (SELECT COUNT(*) FROM crops) as total_crops,
+                (SELECT COUNT(*) FROM plantings) as total_plantings,
+                (SELECT COUNT(*) FROM plantings WHERE status = 'Growing') as active_plantings,
+                (SELECT COALESCE(SUM(area_planted), 0) FROM plantings WHERE status = 'Growing') as active_area,
+                (SELECT COALESCE(SUM(total_amount), 0) FROM finance_rollup WHERE type = 'income') as total_income,
+                (SELECT COALESCE(SUM(total_amount), 0) FROM finance_rollup WHERE type = 'expense') as total_expenses,
+                (SELECT COALESCE(SUM(transaction_count), 0) FROM finance_rollup) as transaction_count
+        ''').fetchone()
+        
+        recent = connection.execute('''
+            SELECT t.transaction_id, t.date, t.type, t.category, t.amount, f.name as farmer_name
+            FROM transactions t
+            JOIN farmers f ON t.farmer_id = f.farmer_id
+            ORDER BY t.date DESC, t.transaction_id DESC
+            LIMIT ?
+        ''', (recent_limit,)).fetchall()
+        
+        stats = dict(totals)
+        stats['net_profit'] = stats['total_income'] - stats['total_expenses']
+        stats['recent_activities'] = [dict(row) for row in recent]
+        return stats
+    
+    def get_dashboard_stats(self, refresh=False, recent_limit=RECENT_ACTIVITY_LIMIT):
+        """Return dashboard counts, totals and recent activity in one read
+        
+        The result is a dict with total_farmers, total_crops, total_plantings,
+        active_plantings, active_area, total_income, total_expenses,
+        net_profit, transaction_count and recent_activities. It is cached for
+        cache_ttl seconds; pass refresh=True to bypass the cache.
+        """
+        with self._lock:
+            fresh = time.monotonic() - self._cached_at < self.cache_ttl
+            if not refresh and self._cache is not None and fresh:
+                return self._cache
+        
+        stats = self.db.run_read(self._read_stats, recent_limit)
+        if stats is None:
+            return None
+        
+        with self._lock:
+            self._cache = stats
+            self._cached_at = time.monotonic()
+        return stats
+    
+    def _ranking(self, sort_by, descending, refresh):
+        """All farmer statistics ordered by sort_by, sorted once per cache lifetime"""
+        with self._lock:
+            fresh = time.monotonic() - self._farmer_stats_at < self.cache_ttl
+            if refresh or self._farmer_stats is None or not fresh:
+                self._farmer_stats = None
+                self._rankings = {}
+            ranking = self._rankings.get((sort_by, descending))
+            if ranking is not None:
+                return ranking
+            stats = self._farmer_stats
+        
+        if stats is None:
+            rows = self.farmer_manager.get_all_farmer_statistics()
+            if rows is None:
+                return None
+            stats = [dict(row) for row in rows]
+        
+        # Ties keep farmer ID order, so pages never overlap
+        ranking = sorted(stats, key=lambda row: row['farmer_id'])
+        ranking.sort(key=lambda row: row[sort_by], reverse=descending)
+        with self._lock:
+            if self._farmer_stats is not stats:
+                self._farmer_stats = stats
+                self._farmer_stats_at = time.monotonic()
+                self._rankings = {}
+            self._rankings[(sort_by, descending)] = ranking
+        return ranking
+    
+    def get_leaderboard(self, sort_by='net_profit', descending=True, offset=0, limit=LEADERBOARD_PAGE_SIZE,
+                        refresh=False):
+        """Return one page of farmers ranked by a statistic
+        
+        sort_by is a key of LEADERBOARD_SORTS. The result is a dict with the
+        page's rows (farmer statistics plus their 1-based rank), total, offset
+        and sort_by. Every farmer's statistics come from one grouped query,
+        cached like the dashboard statistics, so paging does not query again.
+        """
+        if sort_by not in LEADERBOARD_SORTS:
+            raise ValueError(f"Unknown leaderboard ordering: {sort_by}")
+        ranking = self._ranking(sort_by, descending, refresh)
+        if ranking is None:
+            return None
+        
+        # Paging past the end shows the last page
+        last_page = (len(ranking) - 1) // limit * limit if ranking else 0
+        offset = max(0, min(offset, last_page))
+        rows = [dict(row, rank=rank) for rank, row in enumerate(ranking[offset:offset + limit], offset + 1)]
+        return {'rows': rows, 'total': len(ranking), 'offset': offset, 'sort_by': sort_by}
+    
+    def invalidate(self):
+        """Drop the cached statistics so the next call reads the database"""
+        with self._lock:
+            self._cache = None
+            self._farmer_stats = None
+            self._rankings = {}
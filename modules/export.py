@@ -0,0 +1,158 @@
+import csv
+import os
+from itertools import islice
+from operator import itemgetter
+
+from database.db_manager import get_database_manager
+from modules.crop import CropManager
+from modules.farmer import FarmerManager
+from modules.finance import FinanceManager
+from utils.xlsx import XlsxWriter
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+# Rows fetched and written per step; progress is reported once per batch
+EXPORT_BATCH_SIZE = 5000
+
+# Columns written for each dataset, as (header, row key)
+EXPORT_COLUMNS = {
+    'transactions': (
+        ("Transaction ID", 'transaction_id'),
+        ("Date", 'date'),
+        ("Farmer ID", 'farmer_id'),
+        ("Farmer", 'farmer_name'),
+        ("Type", 'type'),
+        ("Category", 'category'),
+        ("Amount", 'amount'),
+        ("Description", 'description'),
+    ),
+    'plantings': (
+        ("Planting ID", 'planting_id'),
+        ("Farmer ID", 'farmer_id'),
+        ("Farmer", 'farmer_name'),
+        ("Crop", 'crop_name'),
+        ("Planting Date", 'planting_date'),
+        ("Area (acres)", 'area_planted'),
+        ("Expected Harvest", 'expected_harvest_date'),
+        ("Status", 'status'),
+    ),
+    'farmers': (
+        ("Farmer ID", 'farmer_id'),
+        ("Name", 'name'),
+        ("Phone", 'phone'),
+        ("Email", 'email'),
+        ("Address", 'address'),
+        ("Farm Size (acres)", 'farm_size'),
+        ("Registered", 'registration_date'),
+    ),
+}
+
+def export_format(path, fmt=None):
+    """Validate fmt, or infer it from the file extension"""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.') or 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+def _batches(rows, batch_size):
+    """Group a row iterator into lists of at most batch_size rows"""
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+class ExportManager:
+    """Stream transactions, plantings and farmers to CSV or XLSX files
+    
+    Rows come from the managers' iter_* cursors a batch at a time and go
+    straight to the file, so memory use does not grow with the export.
+    Files are written under a ".part" name and renamed when complete; a
+    failed or abandoned export leaves no partial file behind.
+    """
+    
+    def __init__(self, db=None, farmer_manager=None, crop_manager=None, finance_manager=None):
+        self.db = db or get_database_manager()
+        self.farmer_manager = farmer_manager or FarmerManager(self.db)
+        self.crop_manager = crop_manager or CropManager(self.db)
+        self.finance_manager = finance_manager or FinanceManager(self.db)
+    
+    def count_rows(self, dataset, **filters):
+        """Number of rows an export of dataset with these filters will write"""
+        if dataset == 'transactions':
+            return self.finance_manager.count_transactions(**filters)
+        if dataset == 'plantings':
+            return self.crop_manager.count_plantings(**filters)
+        return self.farmer_manager.count_farmers(**filters)
+    
+    def _iter_rows(self, dataset, batch_size, filters):
+        if dataset == 'transactions':
+            return self.finance_manager.iter_transactions(batch_size=batch_size, **filters)
+        if dataset == 'plantings':
+            return self.crop_manager.iter_plantings(batch_size=batch_size, **filters)
+        return self.farmer_manager.iter_farmers(batch_size=batch_size, **filters)
+    
+    def iter_export(self, dataset, path, fmt=None, batch_size=EXPORT_BATCH_SIZE, **filters):
+        """Export dataset to path, yielding (rows_written, total_rows) as it goes
+        
+        Filters are passed to the dataset's iterator: farmer_id, start_date,
+        end_date and transaction_type for transactions, farmer_id for
+        plantings. The first item is (0, total) before any row is written.
+        Closing the generator early abandons the export.
+        """
+        if dataset not in EXPORT_COLUMNS:
+            raise ValueError(f"Unknown dataset '{dataset}', expected one of {', '.join(EXPORT_COLUMNS)}")
+        fmt = export_format(path, fmt)
+        return self._write(dataset, path, fmt, batch_size, filters)
+    
+    def _write(self, dataset, path, fmt, batch_size, filters):
+        headers = [header for header, _ in EXPORT_COLUMNS[dataset]]
+        values = itemgetter(*[key for _, key in EXPORT_COLUMNS[dataset]])
+        total = self.count_rows(dataset, **filters)
+        yield 0, total
+        
+        part_path = path + ".part"
+        written = 0
+        rows = self._iter_rows(dataset, batch_size, filters)
+        try:
+            if fmt == 'csv':
+                # utf-8-sig so Excel detects the encoding of names and the rupee sign
+                with open(part_path, 'w', newline='', encoding='utf-8-sig') as handle:
+                    writer = csv.writer(handle)
+                    writer.writerow(headers)
+                    for batch in _batches(rows, batch_size):
+                        writer.writerows(map(values, batch))
+                        written += len(batch)
+                        yield written, total
+            else:
+                with XlsxWriter(part_path, dataset.title(), headers) as workbook:
+                    for batch in _batches(rows, batch_size):
+                        workbook.write_rows(map(values, batch))
+                        written += len(batch)
+                        yield written, total
+            os.replace(part_path, path)
+        except BaseException:
+            # Includes GeneratorExit when the caller stops iterating early
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        finally:
+            # Hand the read connection back now rather than when rows is collected
+            rows.close()
+    
+    def export(self, dataset, path, fmt=None, progress=None, batch_size=EXPORT_BATCH_SIZE, **filters):
+        """Export dataset to path and return the number of rows written
+        
+        progress(rows_written, total_rows) is called after every batch.
+        Returns None if the export fails.
+        """
+        steps = self.iter_export(dataset, path, fmt, batch_size, **filters)
+        written = 0
+        try:
+            for written, total in steps:
+                if progress:
+                    progress(written, total)
+        except Exception as e:
+            print(f"Error exporting {dataset}: {e}")
+            return None
+        return written
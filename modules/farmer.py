@@ -1,9 +1,12 @@
-from database.db_manager import DatabaseManager
+from database.db_manager import DEFAULT_BATCH_SIZE, get_database_manager
+from database.bulk import insert_many, set_triggers_deferred
+from database.changes import note_table_change
+from database.search import FARMER_RANK, build_fts_query, index_farmer_range, matches_tokens, narrows_tokens
 from datetime import datetime
 
 class FarmerManager:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
     
     def add_farmer(self, name, phone=None, email=None, address=None, farm_size=None):
         """Add a new farmer to the database"""
@@ -14,10 +17,80 @@ class FarmerManager:
         params = (name, phone, email, address, farm_size)
         return self.db.execute_query(query, params)
     
-    def get_all_farmers(self):
-        """Get all farmers from the database"""
-        query = "SELECT * FROM farmers ORDER BY name"
-        return self.db.execute_query(query)
+    def add_farmers_bulk(self, farmers):
+        """Add many farmers in one transaction and return their new IDs
+        
+        Each item is a (name, phone, email, address, farm_size) tuple, which may
+        be shorter than five fields, or a dict keyed by those column names.
+        """
+        return self.db.run_in_transaction(self.insert_farmers, farmers)
+    
+    def insert_farmers(self, connection, farmers):
+        """add_farmers_bulk inside the caller's write transaction on connection"""
+        query = '''
+            INSERT INTO farmers (name, phone, email, address, farm_size)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        fields = ('name', 'phone', 'email', 'address', 'farm_size')
+        
+        def rows():
+            for farmer in farmers:
+                if isinstance(farmer, dict):
+                    yield tuple(farmer.get(field) for field in fields)
+                else:
+                    yield tuple(farmer) + (None,) * (len(fields) - len(farmer))
+        
+        # Index the whole batch for full-text search at once rather than per row
+        set_triggers_deferred(connection, True)
+        ids = insert_many(connection, query, rows())
+        if ids:
+            index_farmer_range(connection, ids[0], ids[-1])
+            note_table_change(connection, 'farmers')
+        set_triggers_deferred(connection, False)
+        return ids
+    
+    def _farmers_query(self, after_id=None, after_name=None, limit=None, offset=None):
+        """Build the farmer listing query, ordered by (name, farmer_id) for keyset paging"""
+        query = "SELECT * FROM farmers"
+        params = []
+        
+        if after_id is not None:
+            # Resume after a known row; its name is looked up when not supplied
+            if after_name is None:
+                query += " WHERE (name, farmer_id) > ((SELECT name FROM farmers WHERE farmer_id = ?), ?)"
+                params.extend([after_id, after_id])
+            else:
+                query += " WHERE (name, farmer_id) > (?, ?)"
+                params.extend([after_name, after_id])
+        
+        query += " ORDER BY name, farmer_id"
+        if limit or offset:
+            query += " LIMIT ?"
+            params.append(limit or -1)
+        if offset:
+            query += " OFFSET ?"
+            params.append(offset)
+        return query, params
+    
+    def get_all_farmers(self, after_id=None, after_name=None, limit=None, offset=None):
+        """Get all farmers from the database, optionally one keyset page at a time
+        
+        Pass the farmer_id (and optionally name) of the last row of the previous
+        page as after_id/after_name to fetch the next page of `limit` rows.
+        offset skips rows instead, for jumping to an arbitrary position.
+        """
+        query, params = self._farmers_query(after_id, after_name, limit, offset)
+        return self.db.execute_query(query, params)
+    
+    def count_farmers(self):
+        """Count all farmers"""
+        result = self.db.execute_query("SELECT COUNT(*) as total FROM farmers")
+        return result[0]['total'] if result else 0
+    
+    def iter_farmers(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream all farmers ordered by name without loading them all at once"""
+        query, params = self._farmers_query()
+        return self.db.iter_query(query, params, batch_size)
     
     def get_farmer_by_id(self, farmer_id):
         """Get a specific farmer by ID"""
@@ -52,17 +125,66 @@ class FarmerManager:
         query = "DELETE FROM farmers WHERE farmer_id = ?"
         return self.db.execute_query(query, (farmer_id,))
     
-    def search_farmers(self, search_term):
-        """Search farmers by name, phone, or email"""
-        query = '''
-            SELECT * FROM farmers 
-            WHERE name LIKE ? OR phone LIKE ? OR email LIKE ?
-            ORDER BY name
-        '''
-        search_pattern = f"%{search_term}%"
-        params = (search_pattern, search_pattern, search_pattern)
+    def _uses_full_text(self, search_term):
+        """True when search_term can be answered from the FTS index"""
+        return self.db.has_search_indexes() and build_fts_query(search_term) is not None
+    
+    def _search_farmers_query(self, search_term, limit=None):
+        """Build the farmer search query
+        
+        With the FTS index every word of the term must start a word in the
+        name, phone, email or address, and results are ranked by relevance.
+        Without it the term is matched literally as a substring.
+        """
+        if self._uses_full_text(search_term):
+            query = f'''
+                SELECT f.* FROM farmers_fts
+                JOIN farmers f ON f.farmer_id = farmers_fts.rowid
+                WHERE farmers_fts MATCH ?
+                ORDER BY {FARMER_RANK}, f.name
+            '''
+            params = [build_fts_query(search_term)]
+        else:
+            query = '''
+                SELECT * FROM farmers 
+                WHERE name LIKE ? ESCAPE '\\' OR phone LIKE ? ESCAPE '\\'
+                   OR email LIKE ? ESCAPE '\\' OR address LIKE ? ESCAPE '\\'
+                ORDER BY name
+            '''
+            escaped = search_term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params = [f"%{escaped}%"] * 4
+        
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+    
+    def search_farmers(self, search_term, limit=None):
+        """Search farmers by name, phone, email or address, best matches first"""
+        query, params = self._search_farmers_query(search_term, limit)
         return self.db.execute_query(query, params)
     
+    def iter_search_farmers(self, search_term, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream farmer search results as lists of at most batch_size rows"""
+        query, params = self._search_farmers_query(search_term)
+        return self.db.iter_batches(query, params, batch_size)
+    
+    def search_matches(self, farmer, search_term):
+        """In-memory equivalent of search_farmers for one farmer row"""
+        values = [farmer['name'], farmer['phone'], farmer['email'], farmer['address']]
+        if self._uses_full_text(search_term):
+            return matches_tokens(search_term, values)
+        search_term = search_term.lower()
+        return any(search_term in (value or "").lower() for value in values)
+    
+    def search_narrows(self, previous_term, search_term):
+        """True when search_term can only match a subset of previous_term's results"""
+        if self._uses_full_text(previous_term) and self._uses_full_text(search_term):
+            return narrows_tokens(previous_term, search_term)
+        if self._uses_full_text(previous_term) or self._uses_full_text(search_term):
+            return False
+        return previous_term.lower() in search_term.lower()
+    
     def get_farmer_statistics(self, farmer_id):
         """Get statistics for a specific farmer"""
         # Get planting information
@@ -87,4 +209,36 @@ class FarmerManager:
         return {
             'planting_stats': planting_stats[0] if planting_stats else {},
             'finance_stats': finance_stats[0] if finance_stats else {}
-        } 
\ No newline at end of file
+        }
+    
+    def get_all_farmer_statistics(self):
+        """Get planting and financial totals for every farmer in one grouped query
+        
+        Each row has farmer_id, name, total_plantings, total_area,
+        total_income, total_expenses and net_profit; farmers without
+        plantings or transactions get zeros. Money totals come from the
+        finance rollup rather than the transactions table.
+        """
+        query = '''
+            SELECT f.farmer_id, f.name,
+                   COALESCE(p.total_plantings, 0) as total_plantings,
+                   COALESCE(p.total_area, 0) as total_area,
+                   COALESCE(r.total_income, 0) as total_income,
+                   COALESCE(r.total_expenses, 0) as total_expenses,
+                   COALESCE(r.total_income, 0) - COALESCE(r.total_expenses, 0) as net_profit
+            FROM farmers f
+            LEFT JOIN (
+                SELECT farmer_id, COUNT(*) as total_plantings, SUM(area_planted) as total_area
+                FROM plantings
+                GROUP BY farmer_id
+            ) p ON p.farmer_id = f.farmer_id
+            LEFT JOIN (
+                SELECT farmer_id,
+                       SUM(CASE WHEN type = 'income' THEN total_amount ELSE 0 END) as total_income,
+                       SUM(CASE WHEN type = 'expense' THEN total_amount ELSE 0 END) as total_expenses
+                FROM finance_rollup
+                GROUP BY farmer_id
+            ) r ON r.farmer_id = f.farmer_id
+            ORDER BY f.farmer_id
+        '''
+        return self.db.execute_query(query)
@@ -1,9 +1,13 @@
-from database.db_manager import DatabaseManager
+from database.db_manager import DEFAULT_BATCH_SIZE, get_database_manager, keyset_query
+from database.bulk import insert_many, set_triggers_deferred
+from database.changes import note_table_change
+from database.migrations import apply_finance_rollup_range, rebuild_finance_rollups
+from database.search import TRANSACTION_RANK, build_fts_query, index_transaction_range, rebuild_search_indexes
 from datetime import datetime, date
 
 class FinanceManager:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
     
     def add_transaction(self, farmer_id, transaction_type, category, amount, description=None, transaction_date=None):
         """Add a new financial transaction"""
@@ -17,63 +21,234 @@ class FinanceManager:
         params = (farmer_id, transaction_type, category, amount, description, transaction_date)
         return self.db.execute_query(query, params)
     
-    def get_transactions(self, farmer_id=None, start_date=None, end_date=None, transaction_type=None):
-        """Get transactions with optional filters"""
-        base_query = '''
-            SELECT t.*, f.name as farmer_name
-            FROM transactions t
-            JOIN farmers f ON t.farmer_id = f.farmer_id
-            WHERE 1=1
+    def add_transactions_bulk(self, transactions):
+        """Add many transactions in one transaction and return their new IDs
+        
+        Each item is a (farmer_id, transaction_type, category, amount,
+        description, transaction_date) tuple; the last two fields are optional
+        and the date defaults to today.
+        """
+        return self.db.run_in_transaction(self.insert_transactions, transactions)
+    
+    def insert_transactions(self, connection, transactions):
+        """add_transactions_bulk inside the caller's write transaction on connection"""
+        today = date.today().strftime('%Y-%m-%d')
+        
+        def rows():
+            for transaction in transactions:
+                farmer_id, transaction_type, category, amount = transaction[:4]
+                description = transaction[4] if len(transaction) > 4 else None
+                transaction_date = transaction[5] if len(transaction) > 5 and transaction[5] else today
+                yield (farmer_id, transaction_type, category, amount, description, transaction_date)
+        
+        query = '''
+            INSERT INTO transactions (farmer_id, type, category, amount, description, date)
+            VALUES (?, ?, ?, ?, ?, ?)
         '''
+        
+        # Update the rollups and search index once for the whole batch rather than per row
+        set_triggers_deferred(connection, True)
+        ids = insert_many(connection, query, rows())
+        if ids:
+            apply_finance_rollup_range(connection, ids[0], ids[-1])
+            index_transaction_range(connection, ids[0], ids[-1])
+            note_table_change(connection, 'transactions')
+        set_triggers_deferred(connection, False)
+        return ids
+    
+    def _transaction_filters(self, farmer_id=None, start_date=None, end_date=None,
+                             transaction_type=None, alias=''):
+        """Build the WHERE conditions and parameters shared by transaction queries"""
+        prefix = f"{alias}." if alias else ""
+        conditions = []
         params = []
         
         if farmer_id:
-            base_query += " AND t.farmer_id = ?"
+            conditions.append(f"{prefix}farmer_id = ?")
             params.append(farmer_id)
         
         if start_date:
-            base_query += " AND t.date >= ?"
+            conditions.append(f"{prefix}date >= ?")
             params.append(start_date)
         
         if end_date:
-            base_query += " AND t.date <= ?"
+            conditions.append(f"{prefix}date <= ?")
             params.append(end_date)
         
         if transaction_type:
-            base_query += " AND t.type = ?"
+            conditions.append(f"{prefix}type = ?")
             params.append(transaction_type)
         
-        base_query += " ORDER BY t.date DESC"
+        return conditions, params
+    
+    def _transactions_query(self, farmer_id=None, start_date=None, end_date=None, transaction_type=None,
+                            after_id=None, after_date=None, limit=None, offset=None):
+        """Build the transaction listing query, newest first by (date, transaction_id), undated last
+        
+        The farmer is LEFT JOINed so count_transactions, a plain count of the
+        table, always matches the rows listed; a deleted farmer is named 'Unknown'.
+        """
+        base_query = '''
+            SELECT t.*, COALESCE(f.name, 'Unknown') as farmer_name
+            FROM transactions t
+            LEFT JOIN farmers f ON t.farmer_id = f.farmer_id
+            WHERE 1=1
+        '''
+        conditions, params = self._transaction_filters(farmer_id, start_date, end_date,
+                                                       transaction_type, alias='t')
+        for condition in conditions:
+            base_query += f" AND {condition}"
+        
+        # Resume after a known row; its date is looked up when not supplied
+        return keyset_query(base_query, params, 't.date', 't.transaction_id', after_id, after_date,
+                            "(SELECT date FROM transactions WHERE transaction_id = ?)", limit, offset)
+    
+    def get_transactions(self, farmer_id=None, start_date=None, end_date=None, transaction_type=None,
+                         after_id=None, after_date=None, limit=None, offset=None):
+        """Get transactions with optional filters, optionally one keyset page at a time
+        
+        Pass the transaction_id (and optionally date) of the last row of the
+        previous page as after_id/after_date to fetch the next `limit` rows.
+        offset skips rows instead, for jumping to an arbitrary position.
+        """
+        query, params = self._transactions_query(farmer_id, start_date, end_date, transaction_type,
+                                                 after_id, after_date, limit, offset)
+        return self.db.execute_query(query, params)
+    
+    def search_transactions(self, search_term, farmer_id=None, limit=50):
+        """Search transaction descriptions and categories, best matches first
+        
+        Uses the FTS index when it exists, where every word of the term must
+        start a word of the description or category; otherwise falls back to
+        a substring scan ordered by date.
+        """
+        fts_query = build_fts_query(search_term) if self.db.has_search_indexes() else None
+        if fts_query:
+            query = '''
+                SELECT t.*, f.name as farmer_name
+                FROM transactions_fts
+                JOIN transactions t ON t.transaction_id = transactions_fts.rowid
+                JOIN farmers f ON t.farmer_id = f.farmer_id
+                WHERE transactions_fts MATCH ?
+            '''
+            params = [fts_query]
+            order = f" ORDER BY {TRANSACTION_RANK}, t.date DESC"
+        else:
+            query = '''
+                SELECT t.*, f.name as farmer_name
+                FROM transactions t
+                JOIN farmers f ON t.farmer_id = f.farmer_id
+                WHERE (t.description LIKE ? ESCAPE '\\' OR t.category LIKE ? ESCAPE '\\')
+            '''
+            escaped = search_term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params = [f"%{escaped}%"] * 2
+            order = " ORDER BY t.date DESC, t.transaction_id DESC"
         
-        return self.db.execute_query(base_query, params)
+        if farmer_id:
+            query += " AND t.farmer_id = ?"
+            params.append(farmer_id)
+        query += order
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute_query(query, params)
+    
+    def count_transactions(self, farmer_id=None, start_date=None, end_date=None, transaction_type=None):
+        """Count transactions matching the same filters as get_transactions"""
+        conditions, params = self._transaction_filters(farmer_id, start_date, end_date, transaction_type)
+        query = "SELECT COUNT(*) as total FROM transactions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        result = self.db.execute_query(query, params)
+        return result[0]['total'] if result else 0
+    
+    def iter_transactions(self, farmer_id=None, start_date=None, end_date=None, transaction_type=None,
+                          batch_size=DEFAULT_BATCH_SIZE):
+        """Stream filtered transactions newest first without loading them all at once"""
+        query, params = self._transactions_query(farmer_id, start_date, end_date, transaction_type)
+        return self.db.iter_query(query, params, batch_size)
+    
+    def get_summary(self, start_date=None, end_date=None, farmer_id=None, top_n=5):
+        """Compute totals, category breakdown and top transactions in one round trip
+        
+        Income, expenses and categories come from a single grouped pass over
+        transactions; the top-N lists ride along in the same statement and are
+        served by the (type, amount) index when no filters are given.
+        """
+        conditions, params = self._transaction_filters(farmer_id, start_date, end_date)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        
+        parts = [f'''
+            SELECT 'group' as kind, type, category, COUNT(*) as transaction_count,
+                   SUM(amount) as amount, NULL as description, NULL as date,
+                   NULL as transaction_id, NULL as farmer_id
+            FROM transactions
+            {where}
+            GROUP BY type, category
+        ''']
+        query_params = list(params)
+        
+        if top_n:
+            for transaction_type in ('income', 'expense'):
+                top_where = " AND ".join(conditions + ["type = ?"])
+                parts.append(f'''
+                    SELECT * FROM (
+                        SELECT 'top' as kind, type, category, 1 as transaction_count,
+                               amount, description, date, transaction_id, farmer_id
+                        FROM transactions
+                        WHERE {top_where}
+                        ORDER BY amount DESC
+                        LIMIT ?
+                    )
+                ''')
+                query_params.extend(params + [transaction_type, top_n])
+        
+        rows = self.db.execute_query(" UNION ALL ".join(parts), query_params)
+        if rows is None:
+            raise RuntimeError("financial summary query failed")
+        
+        summary = {
+            'total_income': 0,
+            'total_expenses': 0,
+            'net_profit': 0,
+            'transaction_count': 0,
+            'categories': [],
+            'top_income': [],
+            'top_expenses': [],
+        }
+        for row in rows:
+            if row['kind'] == 'group':
+                amount = row['amount'] or 0
+                if row['type'] == 'income':
+                    summary['total_income'] += amount
+                elif row['type'] == 'expense':
+                    summary['total_expenses'] += amount
+                summary['transaction_count'] += row['transaction_count']
+                summary['categories'].append({
+                    'type': row['type'],
+                    'category': row['category'],
+                    'total': amount,
+                    'count': row['transaction_count'],
+                })
+            else:
+                key = 'top_income' if row['type'] == 'income' else 'top_expenses'
+                summary[key].append({
+                    'transaction_id': row['transaction_id'],
+                    'farmer_id': row['farmer_id'],
+                    'category': row['category'],
+                    'description': row['description'],
+                    'amount': row['amount'],
+                    'date': row['date'],
+                })
+        
+        summary['net_profit'] = summary['total_income'] - summary['total_expenses']
+        summary['categories'].sort(key=lambda c: c['total'], reverse=True)
+        return summary
     
-    def get_financial_summary(self):
+    def get_financial_summary(self, start_date=None, end_date=None, farmer_id=None):
         """Get financial summary"""
         try:
-            # Get total income
-            self.db.cursor.execute("""
-                SELECT COALESCE(SUM(amount), 0) as total_income 
-                FROM transactions 
-                WHERE type = 'income'
-            """)
-            total_income = self.db.cursor.fetchone()[0]
-            
-            # Get total expenses
-            self.db.cursor.execute("""
-                SELECT COALESCE(SUM(amount), 0) as total_expenses 
-                FROM transactions 
-                WHERE type = 'expense'
-            """)
-            total_expenses = self.db.cursor.fetchone()[0]
-            
-            # Calculate net profit
-            net_profit = total_income - total_expenses
-            
-            return {
-                'total_income': total_income,
-                'total_expenses': total_expenses,
-                'net_profit': net_profit
-            }
+            return self.get_summary(start_date, end_date, farmer_id, top_n=0)
         except Exception as e:
             print(f"Error getting financial summary: {e}")
             return {'total_income': 0, 'total_expenses': 0, 'net_profit': 0}
@@ -81,46 +256,96 @@ class FinanceManager:
     def get_category_breakdown(self):
         """Get breakdown by category"""
         try:
-            self.db.cursor.execute("""
-                SELECT category, SUM(amount) as total
-                FROM transactions
-                GROUP BY category
-                ORDER BY total DESC
-            """)
-            return self.db.cursor.fetchall()
+            totals = {}
+            for entry in self.get_summary(top_n=0)['categories']:
+                totals[entry['category']] = totals.get(entry['category'], 0) + entry['total']
+            return [
+                {'category': category, 'total': total}
+                for category, total in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+            ]
         except Exception as e:
             print(f"Error getting category breakdown: {e}")
             return []
     
-    def get_monthly_summary(self):
-        """Get monthly financial summary"""
+    def get_monthly_summary(self, farmer_id=None, year=None):
+        """Get monthly financial summary from the rollup table"""
         try:
-            self.db.cursor.execute("""
+            conditions, params = self._rollup_filters(farmer_id, year)
+            result = self.db.execute_query(f"""
                 SELECT 
-                    strftime('%m', date) as month,
-                    SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) as monthly_income,
-                    SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) as monthly_expenses,
-                    SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END) as monthly_profit
-                FROM transactions
-                GROUP BY strftime('%m', date)
-                ORDER BY month
-            """)
-            return self.db.cursor.fetchall()
+                    year,
+                    month,
+                    SUM(CASE WHEN type = 'income' THEN total_amount ELSE 0 END) as monthly_income,
+                    SUM(CASE WHEN type = 'expense' THEN total_amount ELSE 0 END) as monthly_expenses,
+                    SUM(CASE WHEN type = 'income' THEN total_amount
+                             WHEN type = 'expense' THEN -total_amount ELSE 0 END) as monthly_profit
+                FROM finance_rollup
+                {conditions}
+                GROUP BY year, month
+                ORDER BY year, month
+            """, params)
+            return result or []
         except Exception as e:
             print(f"Error getting monthly summary: {e}")
             return []
     
+    def get_yearly_summary(self, farmer_id=None):
+        """Get yearly financial summary from the rollup table"""
+        try:
+            conditions, params = self._rollup_filters(farmer_id)
+            result = self.db.execute_query(f"""
+                SELECT 
+                    year,
+                    SUM(CASE WHEN type = 'income' THEN total_amount ELSE 0 END) as yearly_income,
+                    SUM(CASE WHEN type = 'expense' THEN total_amount ELSE 0 END) as yearly_expenses,
+                    SUM(CASE WHEN type = 'income' THEN total_amount
+                             WHEN type = 'expense' THEN -total_amount ELSE 0 END) as yearly_profit
+                FROM finance_rollup
+                {conditions}
+                GROUP BY year
+                ORDER BY year
+            """, params)
+            return result or []
+        except Exception as e:
+            print(f"Error getting yearly summary: {e}")
+            return []
+    
+    def _rollup_filters(self, farmer_id=None, year=None):
+        """Build the WHERE clause used by rollup reports"""
+        conditions = []
+        params = []
+        if farmer_id:
+            conditions.append("farmer_id = ?")
+            params.append(farmer_id)
+        if year:
+            conditions.append("year = ?")
+            params.append(int(year))
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return where, params
+    
+    def rebuild_financial_rollups(self):
+        """Recompute the financial rollup table from the full transaction history"""
+        return self.db.run_in_transaction(rebuild_finance_rollups) is not None
+    
+    def rebuild_search_indexes(self):
+        """Rebuild the full-text indexes over farmers and transactions"""
+        return self.db.run_in_transaction(rebuild_search_indexes) is True
+    
+    def _get_top_transactions(self, transaction_type, limit):
+        """Get the largest transactions of one type"""
+        query = """
+            SELECT description, amount, date
+            FROM transactions
+            WHERE type = ?
+            ORDER BY amount DESC
+            LIMIT ?
+        """
+        return self.db.execute_query(query, (transaction_type, limit)) or []
+    
     def get_top_expenses(self, limit=5):
         """Get top expenses"""
         try:
-            self.db.cursor.execute("""
-                SELECT description, amount, date
-                FROM transactions
-                WHERE type = 'expense'
-                ORDER BY amount DESC
-                LIMIT ?
-            """, (limit,))
-            return self.db.cursor.fetchall()
+            return self._get_top_transactions('expense', limit)
         except Exception as e:
             print(f"Error getting top expenses: {e}")
             return []
@@ -128,14 +353,7 @@ class FinanceManager:
     def get_top_income(self, limit=5):
         """Get top income sources"""
         try:
-            self.db.cursor.execute("""
-                SELECT description, amount, date
-                FROM transactions
-                WHERE type = 'income'
-                ORDER BY amount DESC
-                LIMIT ?
-            """, (limit,))
-            return self.db.cursor.fetchall()
+            return self._get_top_transactions('income', limit)
         except Exception as e:
             print(f"Error getting top income: {e}")
             return []
@@ -0,0 +1,59 @@
+from datetime import date
+
+from database.db_manager import get_database_manager
+from database.harvest import from_day, schedule_harvests, to_day
+
+DEFAULT_DAYS_AHEAD = 30
+
+class HarvestCalendar:
+    """Harvests due in the coming days, grouped by week and crop
+    
+    Reads only the (status, harvest_day, crop_id, area_planted) index.
+    Weeks start on Monday.
+    """
+    
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
+    
+    def get_due_harvests(self, days_ahead=DEFAULT_DAYS_AHEAD, today=None):
+        """Growing plantings due by days_ahead days from now, overdue ones included
+        
+        Returns dicts with week_start ('YYYY-MM-DD' of the Monday), crop_id,
+        crop_name, plantings and area, ordered by week and crop name.
+        Plantings whose harvest date has passed are grouped per crop with
+        week_start None and come first, as get_harvest_schedule lists them too.
+        """
+        first_day = to_day(today or date.today())
+        # Day 0 (1970-01-01) was a Thursday, so (day + 3) % 7 is days since Monday
+        query = '''
+            SELECT due.week_day, due.crop_id, COALESCE(c.name, 'Unknown') as crop_name,
+                   due.plantings, due.area
+            FROM (
+                SELECT CASE WHEN harvest_day < ? THEN NULL
+                            ELSE harvest_day - (harvest_day + 3) % 7 END as week_day, crop_id,
+                       COUNT(*) as plantings, COALESCE(SUM(area_planted), 0) as area
+                FROM plantings
+                WHERE status = 'Growing' AND harvest_day <= ?
+                GROUP BY week_day, crop_id
+            ) due
+            LEFT JOIN crops c ON c.crop_id = due.crop_id
+            ORDER BY due.week_day, crop_name
+        '''
+        rows = self.db.execute_query(query, (first_day, first_day + days_ahead))
+        if rows is None:
+            return None
+        return [{
+            'week_start': None if row['week_day'] is None else from_day(row['week_day']).isoformat(),
+            'crop_id': row['crop_id'],
+            'crop_name': row['crop_name'],
+            'plantings': row['plantings'],
+            'area': row['area'],
+        } for row in rows]
+    
+    def reschedule(self):
+        """Recompute missing harvest dates and every harvest_day in bulk
+        
+        Run after importing plantings with raw SQL or editing dates outside
+        CropManager. Returns the number of plantings changed, or None on error.
+        """
+        return self.db.run_in_transaction(schedule_harvests)
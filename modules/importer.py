@@ -0,0 +1,331 @@
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import time
+
+from database.db_manager import get_database_manager
+from database.imports import read_checkpoint, save_checkpoint
+from modules.farmer import FarmerManager
+from modules.finance import FinanceManager
+from utils.helpers import validate_date, validate_email, validate_phone, validate_positive_number
+
+IMPORT_DATASETS = ('farmers', 'transactions')
+
+# Rows validated and committed per write transaction
+IMPORT_CHUNK_SIZE = 50000
+
+REJECTS_SUFFIX = '.rejects.csv'
+
+# A file is recognised on resume by a hash of (up to) this many leading bytes
+FINGERPRINT_BYTES = 65536
+
+TRANSACTION_TYPES = ('income', 'expense')
+
+# Columns each dataset reads, with the header spellings accepted for them.
+# Headers match case-insensitively, with spaces read as underscores and unit
+# suffixes such as "(acres)" ignored, so exported files import unchanged.
+IMPORT_COLUMNS = {
+    'farmers': {
+        'name': ('name', 'farmer_name'),
+        'phone': ('phone',),
+        'email': ('email',),
+        'address': ('address',),
+        'farm_size': ('farm_size',),
+    },
+    'transactions': {
+        'farmer_id': ('farmer_id',),
+        'type': ('type', 'transaction_type'),
+        'category': ('category',),
+        'amount': ('amount',),
+        'description': ('description',),
+        'date': ('date', 'transaction_date'),
+    },
+}
+
+REQUIRED_COLUMNS = {
+    'farmers': ('name',),
+    'transactions': ('farmer_id', 'type', 'amount', 'date'),
+}
+
+_UNIT_SUFFIX_RE = re.compile(r'\s*\(.*\)$')
+_BOM = b'\xef\xbb\xbf'
+
+def normalize_header(name):
+    """Lowercase a header, drop any "(unit)" suffix and turn spaces into underscores"""
+    return _UNIT_SUFFIX_RE.sub('', name.strip().lower()).replace(' ', '_')
+
+def map_columns(dataset, header):
+    """Return {column: position in header}, with None for absent optional columns"""
+    positions = {}
+    for index, name in enumerate(header):
+        positions.setdefault(normalize_header(name), index)
+    columns = {column: next((positions[name] for name in spellings if name in positions), None)
+               for column, spellings in IMPORT_COLUMNS[dataset].items()}
+    missing = [column for column in REQUIRED_COLUMNS[dataset] if columns[column] is None]
+    if missing:
+        raise ValueError(f"Missing required column(s) for {dataset}: {', '.join(missing)}")
+    return columns
+
+def file_fingerprint(path, length):
+    """SHA-1 of the first length bytes of a file"""
+    with open(path, 'rb') as handle:
+        return hashlib.sha1(handle.read(length)).hexdigest()
+
+def _number(text):
+    """A non-negative finite float from text, or None"""
+    if not validate_positive_number(text):
+        return None
+    value = float(text)
+    return value if math.isfinite(value) else None
+
+def _decoded_lines(handle, consumed, encoding):
+    """Decode a binary file line by line, adding each line's size in bytes to consumed[0]"""
+    for raw in handle:
+        consumed[0] += len(raw)
+        yield raw.decode(encoding)
+
+class CsvImporter:
+    """Bulk-load farmer registrations and transaction ledgers from CSV files
+    
+    The file is read as a stream and handled chunk_size records at a time:
+    each chunk is validated with the utils.helpers validators, its good rows
+    go in through FarmerManager.insert_farmers or
+    FinanceManager.insert_transactions in one write transaction, and its bad
+    rows are appended to a rejects CSV together with their line number and
+    the reason. The same transaction records a checkpoint (byte offset, line
+    number, counts), so an interrupted import picks up after the last
+    committed chunk, and running it again once the file has grown imports
+    only the new rows.
+    """
+    
+    def __init__(self, db=None, farmer_manager=None, finance_manager=None, chunk_size=IMPORT_CHUNK_SIZE):
+        self.db = db or get_database_manager()
+        self.farmer_manager = farmer_manager or FarmerManager(self.db)
+        self.finance_manager = finance_manager or FinanceManager(self.db)
+        self.chunk_size = chunk_size
+        self._known_farmers = set()
+        self._valid_dates = {}
+    
+    def _resume_point(self, source, path):
+        """The usable checkpoint for source, or None to start from the top"""
+        checkpoint = self.db.run_read(read_checkpoint, source)
+        if checkpoint is None:
+            return None
+        offset = checkpoint['byte_offset']
+        if (os.path.getsize(path) < offset
+                or file_fingerprint(path, min(offset, FINGERPRINT_BYTES)) != checkpoint['fingerprint']):
+            print(f"{path} has changed since it was last imported; starting from the top")
+            return None
+        return checkpoint
+    
+    def import_file(self, dataset, path, rejects_path=None, restart=False, encoding='utf-8', progress=None):
+        """Import a CSV file of farmers or transactions
+        
+        Rejected rows go to rejects_path (by default the file name plus
+        ".rejects.csv"). Unless restart is True, an import of the same file
+        continues from its checkpoint. progress(summary) is called after
+        every chunk. Returns the summary dict (imported and rejected row
+        counts, last line read, bytes read, elapsed seconds), or None if the
+        import stopped on an error; committed chunks stay imported either way.
+        """
+        if dataset not in IMPORT_DATASETS:
+            raise ValueError(f"Unknown dataset '{dataset}', expected one of {', '.join(IMPORT_DATASETS)}")
+        rejects_path = rejects_path or os.path.splitext(path)[0] + REJECTS_SUFFIX
+        source = f"{dataset}:{os.path.abspath(path)}"
+        checkpoint = None if restart else self._resume_point(source, path)
+        
+        summary = {
+            'dataset': dataset,
+            'path': path,
+            'rejects_path': rejects_path,
+            'resumed_from': checkpoint['line_number'] if checkpoint else 0,
+            'imported': checkpoint['imported'] if checkpoint else 0,
+            'rejected': checkpoint['rejected'] if checkpoint else 0,
+            'line': checkpoint['line_number'] if checkpoint else 0,
+            'bytes_read': checkpoint['byte_offset'] if checkpoint else 0,
+            'total_bytes': os.path.getsize(path),
+            'elapsed': 0.0,
+        }
+        started = time.perf_counter()
+        
+        with open(path, 'rb') as handle:
+            consumed = [0]
+            if handle.read(len(_BOM)) == _BOM:
+                consumed[0] = len(_BOM)
+            else:
+                handle.seek(0)
+            reader = csv.reader(_decoded_lines(handle, consumed, encoding))
+            line_base = 0
+            try:
+                header = next(reader, None)
+            except UnicodeDecodeError as e:
+                raise ValueError(f"{path} is not valid {encoding}: {e}")
+            if header is None:
+                raise ValueError(f"{path} is empty")
+            columns = map_columns(dataset, header)
+            if checkpoint:
+                handle.seek(checkpoint['byte_offset'])
+                consumed[0] = checkpoint['byte_offset']
+                line_base = checkpoint['line_number'] - reader.line_num
+                if os.path.exists(rejects_path):
+                    # Drop rejects written for a chunk that was never committed
+                    os.truncate(rejects_path, min(checkpoint['rejects_offset'], os.path.getsize(rejects_path)))
+            
+            with open(rejects_path, 'a' if checkpoint else 'w', newline='', encoding='utf-8') as rejects_file:
+                rejects = csv.writer(rejects_file)
+                if rejects_file.tell() == 0:
+                    rejects.writerow(["line", "error"] + header)
+                
+                chunk = []
+                line_number = line_base + reader.line_num + 1
+                try:
+                    for fields in reader:
+                        if fields:
+                            chunk.append((line_number, fields))
+                        line_number = line_base + reader.line_num + 1
+                        if len(chunk) >= self.chunk_size:
+                            if not self._commit_chunk(dataset, chunk, columns, len(header), rejects, rejects_file,
+                                                      source, path, consumed[0], line_number - 1, summary):
+                                return None
+                            chunk = []
+                            summary['elapsed'] = time.perf_counter() - started
+                            if progress:
+                                progress(summary)
+                except UnicodeDecodeError as e:
+                    print(f"Import stopped: line {line_number} of {path} is not valid {encoding} ({e})")
+                    return None
+                except csv.Error as e:
+                    print(f"Import stopped: line {line_number} of {path} is not valid CSV ({e})")
+                    return None
+                
+                if not self._commit_chunk(dataset, chunk, columns, len(header), rejects, rejects_file,
+                                          source, path, consumed[0], line_number - 1, summary, completed=True):
+                    return None
+        
+        summary['elapsed'] = time.perf_counter() - started
+        if progress:
+            progress(summary)
+        return summary
+    
+    def _commit_chunk(self, dataset, chunk, columns, width, rejects, rejects_file,
+                      source, path, byte_offset, line_number, summary, completed=False):
+        """Validate one chunk, write its rejects, then insert its rows and checkpoint together"""
+        validate = self._validate_farmers if dataset == 'farmers' else self._validate_transactions
+        rows, bad = validate(chunk, columns, width)
+        bad.sort(key=lambda reject: reject[0])
+        rejects.writerows([line, error] + fields for line, error, fields in bad)
+        rejects_file.flush()
+        
+        checkpoint = {
+            'source': source,
+            'fingerprint': file_fingerprint(path, min(byte_offset, FINGERPRINT_BYTES)),
+            'byte_offset': byte_offset,
+            'line_number': line_number,
+            'rejects_offset': rejects_file.tell(),
+            'imported': summary['imported'] + len(rows),
+            'rejected': summary['rejected'] + len(bad),
+            'completed': completed,
+        }
+        if self.db.run_in_transaction(self._insert_chunk, dataset, rows, checkpoint) is None:
+            print(f"Import stopped before line {chunk[0][0] if chunk else line_number} of {path}")
+            return False
+        summary.update(imported=checkpoint['imported'], rejected=checkpoint['rejected'],
+                       line=line_number, bytes_read=byte_offset)
+        return True
+    
+    def _insert_chunk(self, connection, dataset, rows, checkpoint):
+        if rows:
+            if dataset == 'farmers':
+                self.farmer_manager.insert_farmers(connection, rows)
+            else:
+                self.finance_manager.insert_transactions(connection, rows)
+        save_checkpoint(connection, **checkpoint)
+        return True
+    
+    def _validate_farmers(self, chunk, columns, width):
+        """Split a chunk into farmer rows and (line, error, fields) rejects"""
+        name_at, phone_at, email_at, address_at, size_at = (
+            width if columns[column] is None else columns[column]
+            for column in ('name', 'phone', 'email', 'address', 'farm_size'))
+        rows, bad = [], []
+        for line_number, fields in chunk:
+            if len(fields) > width:
+                bad.append((line_number, f"expected {width} fields, found {len(fields)}", fields))
+                continue
+            # Padding leaves position `width`, which absent columns read, blank
+            values = fields + [''] * (width + 1 - len(fields))
+            name = values[name_at].strip()
+            phone = values[phone_at].strip()
+            email = values[email_at].strip()
+            farm_size = values[size_at].strip()
+            if not name:
+                error = "name is required"
+            elif not validate_phone(phone):
+                error = f"invalid phone '{phone}'"
+            elif not validate_email(email):
+                error = f"invalid email '{email}'"
+            elif farm_size and _number(farm_size) is None:
+                error = f"farm_size must be a non-negative number, got '{farm_size}'"
+            else:
+                rows.append((name, phone or None, email or None, values[address_at].strip() or None,
+                             float(farm_size) if farm_size else None))
+                continue
+            bad.append((line_number, error, fields))
+        return rows, bad
+    
+    def _validate_transactions(self, chunk, columns, width):
+        """Split a chunk into transaction rows and (line, error, fields) rejects"""
+        farmer_at, type_at, category_at, amount_at, description_at, date_at = (
+            width if columns[column] is None else columns[column]
+            for column in ('farmer_id', 'type', 'category', 'amount', 'description', 'date'))
+        valid_dates = self._valid_dates
+        parsed, bad = [], []
+        for line_number, fields in chunk:
+            if len(fields) > width:
+                bad.append((line_number, f"expected {width} fields, found {len(fields)}", fields))
+                continue
+            values = fields + [''] * (width + 1 - len(fields))
+            farmer_id = values[farmer_at].strip()
+            transaction_type = values[type_at].strip().lower()
+            amount = _number(values[amount_at].strip())
+            transaction_date = values[date_at].strip()
+            # Ledgers repeat the same few dates, and strptime is the slowest check
+            date_ok = valid_dates.get(transaction_date)
+            if date_ok is None:
+                if len(valid_dates) > 100000:
+                    valid_dates.clear()
+                date_ok = valid_dates[transaction_date] = validate_date(transaction_date)
+            
+            # isdigit() also accepts characters like '²' that int() rejects
+            if not farmer_id.isdecimal():
+                error = f"farmer_id must be a whole number, got '{farmer_id}'"
+            elif transaction_type not in TRANSACTION_TYPES:
+                error = f"type must be income or expense, got '{values[type_at].strip()}'"
+            elif amount is None:
+                error = f"amount must be a non-negative number, got '{values[amount_at].strip()}'"
+            elif not date_ok:
+                error = f"date must be YYYY-MM-DD, got '{transaction_date}'"
+            else:
+                parsed.append((line_number, fields, (int(farmer_id), transaction_type,
+                                                     values[category_at].strip() or None, amount,
+                                                     values[description_at].strip() or None, transaction_date)))
+                continue
+            bad.append((line_number, error, fields))
+        
+        # Check every farmer the chunk refers to in one query
+        unknown = {row[0] for _, _, row in parsed} - self._known_farmers
+        if unknown:
+            found = self.db.execute_query(
+                "SELECT farmers.farmer_id FROM json_each(?) ids JOIN farmers ON farmers.farmer_id = ids.value",
+                (json.dumps(sorted(unknown)),))
+            self._known_farmers.update(row['farmer_id'] for row in found or ())
+        rows = []
+        for line_number, fields, row in parsed:
+            if row[0] in self._known_farmers:
+                rows.append(row)
+            else:
+                bad.append((line_number, f"unknown farmer_id {row[0]}", fields))
+        return rows, bad
@@ -0,0 +1,114 @@
+from database.db_manager import DEFAULT_BATCH_SIZE, get_database_manager
+
+# Columns shown in the Users tab, in treeview order
+USER_COLUMNS = "user_id, username, full_name, email, role, created_date"
+
+# Sorts after every character a prefix can be followed by, so
+# [prefix, prefix + PREFIX_END) is the range of values starting with prefix
+PREFIX_END = '\U0010ffff'
+
+class UserManager:
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
+    
+    def create_user(self, username, email, password_hash, full_name=None, role='user'):
+        """Add a new user account"""
+        query = '''
+            INSERT INTO users (username, email, password_hash, full_name, role)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        return self.db.execute_query(query, (username, email, password_hash, full_name, role))
+    
+    def get_user(self, user_id):
+        """Get a specific user by ID"""
+        result = self.db.execute_query(f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?", (user_id,))
+        return result[0] if result else None
+    
+    def get_user_by_username(self, username):
+        """Get a user by username, including the password hash"""
+        result = self.db.execute_query("SELECT * FROM users WHERE username = ?", (username,))
+        return result[0] if result else None
+    
+    def user_exists(self, username, email):
+        """True when the username or email is already taken"""
+        # Two lookups on the UNIQUE indexes rather than one OR over both columns
+        result = self.db.execute_query('''
+            SELECT EXISTS(SELECT 1 FROM users WHERE username = ?)
+                OR EXISTS(SELECT 1 FROM users WHERE email = ?) as taken
+        ''', (username, email))
+        return bool(result and result[0]['taken'])
+    
+    def set_password_hash(self, user_id, password_hash):
+        """Replace a user's stored password hash"""
+        return self.db.execute_query("UPDATE users SET password_hash = ? WHERE user_id = ?",
+                                     (password_hash, user_id))
+    
+    def _users_query(self, after_id=None, limit=None, offset=None):
+        """Build the user listing query, ordered by user_id for keyset paging"""
+        query = f"SELECT {USER_COLUMNS} FROM users"
+        params = []
+        
+        if after_id is not None:
+            query += " WHERE user_id > ?"
+            params.append(after_id)
+        
+        query += " ORDER BY user_id"
+        if limit or offset:
+            query += " LIMIT ?"
+            params.append(limit or -1)
+        if offset:
+            query += " OFFSET ?"
+            params.append(offset)
+        return query, params
+    
+    def get_users(self, after_id=None, limit=None, offset=None):
+        """Get users in ID order, optionally one keyset page at a time
+        
+        Pass the user_id of the last row of the previous page as after_id to
+        fetch the next page of `limit` rows; offset skips rows instead.
+        """
+        query, params = self._users_query(after_id, limit, offset)
+        return self.db.execute_query(query, params)
+    
+    def count_users(self):
+        """Count all users"""
+        result = self.db.execute_query("SELECT COUNT(*) as total FROM users")
+        return result[0]['total'] if result else 0
+    
+    def _search_users_query(self, search_term, limit=None):
+        """Build the prefix search over username, full name and email
+        
+        Each column is matched as a case-insensitive range on its NOCASE
+        index, so the search never scans the table. The three ranges are
+        merged with UNION and only the matches are sorted by user_id; an OR
+        of the ranges under ORDER BY user_id would make SQLite scan users.
+        """
+        prefix = search_term.strip()
+        ranges = [f"SELECT {USER_COLUMNS} FROM users WHERE {column} >= ? COLLATE NOCASE AND {column} < ? COLLATE NOCASE"
+                  for column in ('username', 'full_name', 'email')]
+        query = " UNION ".join(ranges) + " ORDER BY user_id"
+        params = [prefix, prefix + PREFIX_END] * 3
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+    
+    def search_users(self, search_term, limit=None):
+        """Find users whose username, full name or email starts with search_term"""
+        query, params = self._search_users_query(search_term, limit)
+        return self.db.execute_query(query, params)
+    
+    def iter_search_users(self, search_term, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream user search results as lists of at most batch_size rows"""
+        query, params = self._search_users_query(search_term)
+        return self.db.iter_batches(query, params, batch_size)
+    
+    def search_matches(self, user, search_term):
+        """In-memory equivalent of search_users for one user row"""
+        prefix = search_term.strip().lower()
+        return any((value or "").lower().startswith(prefix)
+                   for value in (user['username'], user['full_name'], user['email']))
+    
+    def search_narrows(self, previous_term, search_term):
+        """True when search_term can only match a subset of previous_term's results"""
+        return search_term.strip().lower().startswith(previous_term.strip().lower())
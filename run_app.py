@@ -10,16 +10,18 @@ import os
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from utils.profiling import enable_startup_profiling_from_argv, profile_phase
+
 def main():
     """Main entry point"""
     try:
-        # Start with login system
-        from gui.login_window import LoginWindow
-        import tkinter as tk
+        # --profile-startup writes a JSON timing report of the startup phases
+        enable_startup_profiling_from_argv(sys.argv)
         
-        root = tk.Tk()
-        login_app = LoginWindow(root)
-        login_app.run()
+        # Start with login system
+        with profile_phase("imports.main"):
+            from main import run_login
+        run_login()
         
     except Exception as e:
         print(f"Failed to start application: {e}")
@@ -6,14 +6,26 @@ This script tests the basic functionality of the system
 
 import sys
 import os
+import hashlib
+from datetime import date
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from database.db_manager import DatabaseManager
+from database.migrations import LATEST_VERSION
 from modules.farmer import FarmerManager
 from modules.crop import CropManager
 from modules.finance import FinanceManager
+from modules.dashboard import DashboardManager
+from modules.analytics import AnalyticsManager, FARMER_GROUPS_QUERY, HARVEST_GROUPS_QUERY
+from modules.harvest import HarvestCalendar
+from modules.user import UserManager
+from modules.auth import AuthService
+from modules.export import ExportManager
+from modules.importer import CsvImporter
+from database.changes import ChangeMonitor
+from utils.profiling import StartupProfiler
 from data.sample_data import load_sample_data
 
 def test_database_connection():
@@ -27,6 +39,30 @@ def test_database_connection():
         print(f"✗ Database connection failed: {e}")
         return False
 
+def test_schema_migrations():
+    """Test that schema migrations are applied once"""
+    print("\nTesting schema migrations...")
+    try:
+        db = DatabaseManager()
+        
+        if db.get_schema_version() == LATEST_VERSION:
+            print(f"✓ Schema is at version {LATEST_VERSION}")
+        else:
+            print("✗ Schema version mismatch")
+            return False
+        
+        # Running the migrations again must be a no-op
+        if db.create_tables() == []:
+            print("✓ Migrations are not re-applied")
+        else:
+            print("✗ Migrations were applied twice")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Schema migrations failed: {e}")
+        return False
+
 def test_farmer_operations():
     """Test farmer management operations"""
     print("\nTesting farmer operations...")
@@ -57,6 +93,14 @@ def test_farmer_operations():
             print("✗ Search farmers failed")
             return False
         
+        # Streamed search must match the one-shot search
+        streamed = [row for batch in farmer_mgr.iter_search_farmers("Test", batch_size=2) for row in batch]
+        if [f['farmer_id'] for f in streamed] == [f['farmer_id'] for f in search_results]:
+            print("✓ Streamed farmer search successful")
+        else:
+            print("✗ Streamed farmer search returned different rows")
+            return False
+        
         return True
     except Exception as e:
         print(f"✗ Farmer operations failed: {e}")
@@ -122,17 +166,726 @@ def test_finance_operations():
         
         # Test financial summary
         summary = finance_mgr.get_financial_summary()
-        if summary:
+        if summary and summary['total_income'] >= 1000.0:
             print("✓ Financial summary successful")
         else:
             print("✗ Financial summary failed")
             return False
         
+        # Test single-pass summary engine
+        full_summary = finance_mgr.get_summary(farmer_id=farmer_id, top_n=3)
+        farmer_summary = finance_mgr.get_financial_summary(farmer_id=farmer_id)
+        totals = ('total_income', 'total_expenses', 'net_profit', 'transaction_count')
+        if (full_summary['categories'] and full_summary['top_income']
+                and all(abs(full_summary[key] - farmer_summary[key]) < 0.01 for key in totals)):
+            print("✓ Summary engine successful")
+        else:
+            print("✗ Summary engine totals do not match the financial summary")
+            return False
+        
         return True
     except Exception as e:
         print(f"✗ Finance operations failed: {e}")
         return False
 
+def test_bulk_operations():
+    """Test bulk insert operations"""
+    print("\nTesting bulk operations...")
+    try:
+        farmer_mgr = FarmerManager()
+        finance_mgr = FinanceManager()
+        
+        # Test bulk farmer insert
+        farmer_ids = farmer_mgr.add_farmers_bulk([
+            ("Bulk Farmer 1", "555-2001", "bulk1@email.com", "Bulk Address 1", 10.0),
+            ("Bulk Farmer 2", "555-2002", "bulk2@email.com", "Bulk Address 2", 20.0),
+        ])
+        if farmer_ids and len(farmer_ids) == 2:
+            print("✓ Bulk add farmers successful")
+        else:
+            print("✗ Bulk add farmers failed")
+            return False
+        
+        # Test bulk transaction insert
+        transaction_ids = finance_mgr.add_transactions_bulk(
+            (farmer_ids[0], "expense", "Seeds", 100.0 + i, "Bulk transaction") for i in range(100)
+        )
+        if transaction_ids and len(transaction_ids) == 100:
+            print("✓ Bulk add transactions successful")
+        else:
+            print("✗ Bulk add transactions failed")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Bulk operations failed: {e}")
+        return False
+
+def test_financial_rollups():
+    """Test trigger-maintained financial rollups"""
+    print("\nTesting financial rollups...")
+    try:
+        finance_mgr = FinanceManager()
+        farmers = FarmerManager().get_all_farmers()
+        if not farmers:
+            print("✗ No farmers available for rollup testing")
+            return False
+        
+        farmer_id = farmers[0]['farmer_id']
+        before = {(row['year'], row['month']): row['monthly_income']
+                  for row in finance_mgr.get_monthly_summary(farmer_id=farmer_id)}
+        
+        finance_mgr.add_transaction(farmer_id, "income", "Rollup Test", 250.0, "Rollup test", "2019-01-15")
+        after = {(row['year'], row['month']): row['monthly_income']
+                 for row in finance_mgr.get_monthly_summary(farmer_id=farmer_id)}
+        
+        if after.get((2019, 1), 0) - before.get((2019, 1), 0) == 250.0:
+            print("✓ Rollup updated by trigger")
+        else:
+            print("✗ Rollup not updated")
+            return False
+        
+        if finance_mgr.rebuild_financial_rollups():
+            print("✓ Rollup rebuild successful")
+        else:
+            print("✗ Rollup rebuild failed")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Financial rollups failed: {e}")
+        return False
+
+def test_database_backup():
+    """Test online backups, plain and gzipped, taken while another thread writes"""
+    print("\nTesting database backup...")
+    try:
+        import gzip
+        import shutil
+        import sqlite3
+        import tempfile
+        import threading
+        folder = tempfile.mkdtemp()
+        farmer_mgr = FarmerManager()
+        db = farmer_mgr.db
+        
+        # Farmers arrive in batches of 10 for the whole backup
+        stop = threading.Event()
+        batches = []
+        
+        def write():
+            while not stop.is_set():
+                batches.append(farmer_mgr.add_farmers_bulk([("Backup Farmer", "555-8001")] * 10))
+        
+        writer = threading.Thread(target=write)
+        writer.start()
+        steps, results = [], []
+        try:
+            db.backup_database(os.path.join(folder, "backup.db"), pages_per_step=1,
+                               progress=lambda copied, total: steps.append(copied))
+            db.backup_database(os.path.join(folder, "backup.db.gz"), pages_per_step=1, compress=True,
+                               background=True, on_complete=lambda *result: results.append(result)).join()
+        finally:
+            stop.set()
+            writer.join()
+        
+        with open(os.path.join(folder, "restored.db"), 'wb') as restored:
+            with gzip.open(os.path.join(folder, "backup.db.gz"), 'rb') as compressed:
+                shutil.copyfileobj(compressed, restored)
+        for name in ("backup.db", "restored.db"):
+            copy = sqlite3.connect(os.path.join(folder, name))
+            integrity = copy.execute("PRAGMA integrity_check").fetchone()[0]
+            journal_mode = copy.execute("PRAGMA journal_mode").fetchone()[0]
+            # Each batch commits as a whole, so a consistent snapshot holds whole batches
+            copied = copy.execute("SELECT COUNT(*) FROM farmers WHERE name = 'Backup Farmer'").fetchone()[0]
+            copy.close()
+            if integrity != "ok" or journal_mode != "delete" or copied % 10:
+                print(f"✗ Backup {name} is not a consistent copy: {integrity}, {journal_mode}, {copied} rows")
+                return False
+        if len(steps) > 1 and results and results[0][0] and batches:
+            print(f"✓ Online backup successful - {len(steps)} steps, {len(batches)} write batches alongside")
+        else:
+            print(f"✗ Unexpected backup run: {len(steps)} steps, {results}, {len(batches)} write batches")
+            return False
+        
+        db.execute_query("DELETE FROM farmers WHERE name = 'Backup Farmer'")
+        return True
+    except Exception as e:
+        print(f"✗ Database backup failed: {e}")
+        return False
+
+def test_pagination():
+    """Test keyset pagination and streaming queries"""
+    print("\nTesting pagination...")
+    try:
+        finance_mgr = FinanceManager()
+        
+        # Walk every page and compare with the full listing
+        all_ids = [t['transaction_id'] for t in finance_mgr.get_transactions()]
+        paged_ids = []
+        last_id = None
+        while True:
+            page = finance_mgr.get_transactions(after_id=last_id, limit=25)
+            if not page:
+                break
+            paged_ids.extend(t['transaction_id'] for t in page)
+            last_id = page[-1]['transaction_id']
+        
+        if paged_ids == all_ids:
+            print(f"✓ Keyset pagination successful - {len(paged_ids)} transactions")
+        else:
+            print("✗ Keyset pagination returned different rows")
+            return False
+        
+        streamed_ids = [t['transaction_id'] for t in finance_mgr.iter_transactions(batch_size=10)]
+        if streamed_ids == all_ids:
+            print("✓ Streaming query successful")
+        else:
+            print("✗ Streaming query returned different rows")
+            return False
+        
+        # Offset pages back the virtual treeview when jumping to a scroll position
+        total = finance_mgr.count_transactions()
+        offset_ids = [t['transaction_id'] for t in finance_mgr.get_transactions(limit=10, offset=5)]
+        if total == len(all_ids) and offset_ids == all_ids[5:15]:
+            print(f"✓ Offset paging and counts successful - {total} transactions")
+        else:
+            print("✗ Offset paging or count returned different rows")
+            return False
+        
+        # Undated plantings sort last and are still reached by keyset paging
+        crop_mgr = CropManager()
+        farmer_id = FarmerManager().add_farmers_bulk([("Undated Farmer", "555-6001")])[0]
+        crop_id = crop_mgr.get_all_crops()[0]['crop_id']
+        crop_mgr.add_plantings_bulk([(farmer_id, crop_id, planting_date, 1.0)
+                                     for planting_date in ("2024-01-10", None, "2024-03-05", None, "2024-02-20")])
+        listed_ids = [p['planting_id'] for p in crop_mgr.get_all_plantings(farmer_id=farmer_id)]
+        paged_ids = []
+        last_id = last_date = None
+        while True:
+            page = crop_mgr.get_all_plantings(farmer_id=farmer_id, after_id=last_id, after_date=last_date, limit=1)
+            if not page:
+                break
+            paged_ids.extend(p['planting_id'] for p in page)
+            last_id, last_date = page[-1]['planting_id'], page[-1]['planting_date']
+        if len(listed_ids) == 5 and paged_ids == listed_ids:
+            print("✓ Keyset pagination with undated rows successful")
+        else:
+            print("✗ Keyset pagination skipped undated rows")
+            return False
+        
+        # Rows whose farmer was deleted are still listed, under a placeholder name
+        FarmerManager().delete_farmer(farmer_id)
+        names = {p['farmer_name'] for p in crop_mgr.get_all_plantings(farmer_id=farmer_id)}
+        if names == {'Unknown'} and crop_mgr.count_plantings(farmer_id=farmer_id) == 5:
+            print("✓ Orphaned plantings listed under 'Unknown'")
+        else:
+            print(f"✗ Orphaned plantings listed as {names}")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Pagination failed: {e}")
+        return False
+
+def test_full_text_search():
+    """Test ranked full-text search over farmers and transactions"""
+    print("\nTesting full-text search...")
+    try:
+        farmer_mgr = FarmerManager()
+        finance_mgr = FinanceManager()
+        
+        farmer_mgr.add_farmer("Ramesh Kumarswamy", "555-9876", "ramesh@email.com", "Zinnia Lane", 5.0)
+        results = farmer_mgr.search_farmers("rames kumars")
+        if results and results[0]['name'] == "Ramesh Kumarswamy":
+            print("✓ Farmer search successful")
+        else:
+            print("✗ Farmer search failed")
+            return False
+        
+        # Triggers keep the index in sync with updates
+        farmer_id = results[0]['farmer_id']
+        farmer_mgr.update_farmer(farmer_id, address="Quillon Lane")
+        old_ids = [f['farmer_id'] for f in farmer_mgr.search_farmers("zinnia")]
+        new_ids = [f['farmer_id'] for f in farmer_mgr.search_farmers("quillon")]
+        if farmer_id not in old_ids and farmer_id in new_ids:
+            print("✓ Search index follows updates")
+        else:
+            print("✗ Search index is out of date")
+            return False
+        
+        finance_mgr.add_transactions_bulk([(farmer_id, "expense", "Machinery", 450.0, "Tractor clutch overhaul")])
+        transactions = finance_mgr.search_transactions("clutch overh")
+        if transactions and transactions[0]['farmer_id'] == farmer_id:
+            print("✓ Transaction search successful")
+        else:
+            print("✗ Transaction search failed")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Full-text search failed: {e}")
+        return False
+
+def test_dashboard_stats():
+    """Test the aggregate dashboard statistics"""
+    print("\nTesting dashboard statistics...")
+    try:
+        farmer_mgr = FarmerManager()
+        crop_mgr = CropManager()
+        dashboard_mgr = DashboardManager()
+        
+        stats = dashboard_mgr.get_dashboard_stats(refresh=True)
+        active = crop_mgr.count_plantings(status='Growing')
+        if (stats and stats['total_farmers'] == farmer_mgr.count_farmers()
+                and stats['total_crops'] == len(crop_mgr.get_all_crops())
+                and stats['active_plantings'] == active):
+            print("✓ Dashboard counts successful")
+        else:
+            print("✗ Dashboard counts do not match the tables")
+            return False
+        
+        # Cached until invalidated
+        farmer_mgr.add_farmer("Dashboard Farmer", "555-3001", "dash@email.com", "Dash Address", 1.0)
+        cached = dashboard_mgr.get_dashboard_stats()
+        dashboard_mgr.invalidate()
+        fresh = dashboard_mgr.get_dashboard_stats()
+        if cached['total_farmers'] == stats['total_farmers'] and fresh['total_farmers'] == stats['total_farmers'] + 1:
+            print("✓ Dashboard cache successful")
+        else:
+            print("✗ Dashboard cache returned wrong counts")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Dashboard statistics failed: {e}")
+        return False
+
+def test_crop_economics():
+    """Test expected yield and revenue projections against a per-row calculation"""
+    print("\nTesting crop economics...")
+    try:
+        crop_mgr = CropManager()
+        analytics_mgr = AnalyticsManager()
+        
+        crops = {crop['crop_id']: crop for crop in crop_mgr.get_all_crops()}
+        expected = {}
+        for planting in crop_mgr.get_all_plantings():
+            if planting['status'] != 'Growing':
+                continue
+            crop = crops[planting['crop_id']]
+            revenue = planting['area_planted'] * (crop['yield_per_acre'] or 0) * (crop['price_per_unit'] or 0)
+            expected[crop['crop_id']] = expected.get(crop['crop_id'], 0) + revenue
+        
+        economics = analytics_mgr.get_crop_economics(refresh=True)
+        by_crop = {row['crop_id']: row['expected_revenue'] for row in economics['by_crop']}
+        months_total = sum(row['expected_revenue'] for row in economics['by_month'])
+        if (by_crop.keys() == expected.keys()
+                and all(abs(by_crop[crop_id] - expected[crop_id]) < 0.01 for crop_id in expected)
+                and abs(months_total - economics['expected_revenue']) < 0.01):
+            print(f"✓ Crop economics successful - ₹{economics['expected_revenue']:,.2f} expected")
+        else:
+            print("✗ Crop economics do not match the per-row calculation")
+            return False
+        
+        # Cached until a source table changes
+        if analytics_mgr.get_crop_economics() is not economics:
+            print("✗ Crop economics were recomputed without changes")
+            return False
+        farmer_id = FarmerManager().add_farmers_bulk([("Economics Farmer", "555-5001", "econ@email.com", "Econ Address", 1.0)])[0]
+        crop_id = crop_mgr.get_all_crops()[0]['crop_id']
+        crop_mgr.add_planting(farmer_id, crop_id, "2024-06-01", 2.0, "2024-09-01")
+        fresh = analytics_mgr.get_crop_economics()
+        if fresh is not economics and fresh['plantings'] == economics['plantings'] + 1:
+            print("✓ Crop economics cache successful")
+        else:
+            print("✗ Crop economics cache missed a new planting")
+            return False
+        
+        # SQLite sums the plantings in index order, so only the groups reach Python
+        crop_mgr.add_plantings_bulk([(farmer_id, crop_id, "2024-06-01", 1.0, "2024-09-01")] * 2)
+        growing = sum(1 for planting in crop_mgr.get_all_plantings() if planting['status'] == 'Growing')
+        
+        def read_groups(connection):
+            return [([row['detail'] for row in connection.execute("EXPLAIN QUERY PLAN " + query)],
+                     analytics_mgr._load_groups(connection, query))
+                    for query in (HARVEST_GROUPS_QUERY, FARMER_GROUPS_QUERY)]
+        
+        for plan, groups in analytics_mgr.db.run_read(read_groups):
+            if (not any("COVERING INDEX" in detail for detail in plan)
+                    or any("TEMP B-TREE" in detail for detail in plan)):
+                print(f"✗ Crop economics groups are not read in index order: {plan}")
+                return False
+            if sum(group[2] for group in groups) != growing or len(groups) >= growing:
+                print(f"✗ Crop economics loaded {len(groups)} groups for {growing} plantings")
+                return False
+        print("✓ Crop economics grouped in SQLite from covering indexes")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Crop economics failed: {e}")
+        return False
+
+def test_harvest_calendar():
+    """Test derived harvest dates and the weekly harvest calendar"""
+    print("\nTesting harvest calendar...")
+    try:
+        crop_mgr = CropManager()
+        calendar = HarvestCalendar()
+        farmer_id = FarmerManager().add_farmers_bulk([("Harvest Farmer", "555-6001", "harvest@email.com", "Harvest Address", 3.0)])[0]
+        crop_mgr.add_crop("Calendar Millet", "Early", 100, 10.0, 2.0)
+        crop_id = [c['crop_id'] for c in crop_mgr.get_all_crops() if c['name'] == "Calendar Millet"][-1]
+        
+        # 2030-01-01 + 100 days is Thursday 2030-04-11, in the week of Monday 2030-04-08
+        crop_mgr.add_planting(farmer_id, crop_id, "2030-01-01", 4.0)
+        # A Growing planting whose harvest date has passed is listed first as overdue
+        crop_mgr.add_plantings_bulk([(farmer_id, crop_id, "2030-01-02", 1.5),
+                                     (farmer_id, crop_id, "2030-01-02", 2.0, "2030-04-20"),
+                                     (farmer_id, crop_id, "2029-11-02", 0.5, "2030-03-01")])
+        due = [row for row in calendar.get_due_harvests(14, today=date(2030, 4, 8)) if row['crop_id'] == crop_id]
+        weeks = [(row['week_start'], row['plantings'], row['area']) for row in due]
+        if weeks == [(None, 1, 0.5), ("2030-04-08", 2, 5.5), ("2030-04-15", 1, 2.0)]:
+            print("✓ Harvest dates derived and grouped by week")
+        else:
+            print(f"✗ Unexpected harvest calendar: {weeks}")
+            return False
+        
+        # Editing a date moves the planting to its new week
+        crop_mgr.db.execute_query("UPDATE plantings SET expected_harvest_date = '2030-05-01' "
+                                  "WHERE crop_id = ? AND planting_date = '2030-01-01'", (crop_id,))
+        due = [row for row in calendar.get_due_harvests(14, today=date(2030, 4, 8)) if row['crop_id'] == crop_id]
+        if [row['plantings'] for row in due] == [1, 1, 1] and calendar.reschedule() == 0:
+            print("✓ Harvest calendar follows date changes")
+        else:
+            print("✗ Harvest calendar missed a date change")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Harvest calendar failed: {e}")
+        return False
+
+def test_farmer_leaderboard():
+    """Test batched farmer statistics and the paged leaderboard"""
+    print("\nTesting farmer leaderboard...")
+    try:
+        farmer_mgr = FarmerManager()
+        dashboard_mgr = DashboardManager()
+        
+        all_stats = farmer_mgr.get_all_farmer_statistics()
+        for row in all_stats:
+            single = farmer_mgr.get_farmer_statistics(row['farmer_id'])
+            plantings, finance = single['planting_stats'], single['finance_stats']
+            if (row['total_plantings'] != plantings['total_plantings']
+                    or abs(row['total_area'] - (plantings['total_area'] or 0)) > 0.01
+                    or abs(row['total_income'] - (finance['total_income'] or 0)) > 0.01
+                    or abs(row['total_expenses'] - (finance['total_expenses'] or 0)) > 0.01):
+                print(f"✗ Statistics differ for farmer {row['farmer_id']}")
+                return False
+        print(f"✓ Batched farmer statistics successful - {len(all_stats)} farmers")
+        
+        # Pages of the area ranking join up into the whole ordering
+        ranked = []
+        offset = 0
+        while offset < len(all_stats):
+            page = dashboard_mgr.get_leaderboard('total_area', offset=offset, limit=3, refresh=not ranked)
+            ranked.extend(page['rows'])
+            offset += 3
+        areas = [row['total_area'] for row in ranked]
+        if ([row['rank'] for row in ranked] == list(range(1, len(all_stats) + 1))
+                and areas == sorted(areas, reverse=True)
+                and len({row['farmer_id'] for row in ranked}) == len(all_stats)):
+            print("✓ Leaderboard paging successful")
+        else:
+            print("✗ Leaderboard pages are out of order")
+            return False
+        
+        top = dashboard_mgr.get_leaderboard('net_profit', limit=1)['rows'][0]
+        if top['net_profit'] == max(row['net_profit'] for row in all_stats):
+            print(f"✓ Top earner: {top['name']}")
+        else:
+            print("✗ Leaderboard top earner is wrong")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Farmer leaderboard failed: {e}")
+        return False
+
+def test_export():
+    """Test streaming CSV and XLSX exports"""
+    print("\nTesting exports...")
+    try:
+        import csv
+        import tempfile
+        import zipfile
+        export_mgr = ExportManager()
+        finance_mgr = FinanceManager()
+        folder = tempfile.mkdtemp()
+        
+        # Small batches so the export spans several of them
+        csv_path = os.path.join(folder, "income.csv")
+        steps = []
+        written = export_mgr.export('transactions', csv_path, progress=lambda *step: steps.append(step),
+                                    batch_size=2, transaction_type='income')
+        with open(csv_path, newline='', encoding='utf-8-sig') as handle:
+            rows = list(csv.reader(handle))
+        expected = finance_mgr.count_transactions(transaction_type='income')
+        if (written == expected == len(rows) - 1 and rows[0][0] == "Transaction ID"
+                and {row[4] for row in rows[1:]} <= {'income'} and steps[-1] == (expected, expected)):
+            print(f"✓ CSV export successful - {written} income transactions")
+        else:
+            print(f"✗ CSV export wrote {written} rows, expected {expected}")
+            return False
+        
+        xlsx_path = os.path.join(folder, "farmers.xlsx")
+        written = export_mgr.export('farmers', xlsx_path, batch_size=3)
+        with zipfile.ZipFile(xlsx_path) as workbook:
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode('utf-8')
+            parts = set(workbook.namelist())
+        if (written == FarmerManager().count_farmers() and sheet.count('<row>') == written + 1
+                and {'[Content_Types].xml', 'xl/workbook.xml'} <= parts):
+            print(f"✓ XLSX export successful - {written} farmers")
+        else:
+            print("✗ XLSX export is incomplete")
+            return False
+        
+        # Abandoning an export part-way leaves no file behind
+        abandoned = os.path.join(folder, "plantings.csv")
+        steps = export_mgr.iter_export('plantings', abandoned, batch_size=1)
+        next(steps)
+        next(steps)
+        steps.close()
+        if sorted(os.listdir(folder)) != ["farmers.xlsx", "income.csv"]:
+            print(f"✗ Abandoned export left files: {os.listdir(folder)}")
+            return False
+        print("✓ Abandoned export cleaned up")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Export failed: {e}")
+        return False
+
+def test_csv_import():
+    """Test chunked CSV imports with rejects and resumable checkpoints"""
+    print("\nTesting CSV import...")
+    try:
+        import csv
+        import tempfile
+        folder = tempfile.mkdtemp()
+        importer = CsvImporter(chunk_size=2)
+        finance_mgr = FinanceManager()
+        
+        # Header spellings from the farmers export; the quoted address spans lines 3-4
+        farmers_path = os.path.join(folder, "farmers.csv")
+        with open(farmers_path, 'w', newline='', encoding='utf-8') as handle:
+            handle.write("Name,Phone,Email,Address,Farm Size (acres)\n"
+                         "Import Farmer A,555-700-0001,import.a@email.com,Village A,2.5\n"
+                         'Import Farmer B,,,"Plot 7\nVillage B",\n'
+                         ",555-700-0003,,Village C,1.0\n"
+                         "Import Farmer D,555-700-0004,not-an-email,Village D,3.0\n"
+                         "Import Farmer E,555-700-0005,,Village E,-4\n")
+        summary = importer.import_file('farmers', farmers_path)
+        with open(summary['rejects_path'], newline='', encoding='utf-8') as handle:
+            reject_lines = [row[0] for row in list(csv.reader(handle))[1:]]
+        if summary['imported'] == 2 and summary['rejected'] == 3 and reject_lines == ['5', '6', '7']:
+            print("✓ Farmer import successful - rejects reported with line numbers")
+        else:
+            print(f"✗ Unexpected farmer import: {summary}, reject lines {reject_lines}")
+            return False
+        
+        farmer_id = max(farmer['farmer_id'] for farmer in FarmerManager().search_farmers("Import Farmer A"))
+        ledger_path = os.path.join(folder, "ledger.csv")
+        with open(ledger_path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["farmer_id", "type", "category", "amount", "description", "date"])
+            for day in range(1, 6):
+                writer.writerow([farmer_id, "income", "Sales", 100, "Imported ledger", f"2031-01-0{day}"])
+            writer.writerow([999999999, "income", "Sales", 100, "Imported ledger", "2031-01-06"])
+            writer.writerow([farmer_id, "refund", "Sales", 100, "Imported ledger", "2031-01-07"])
+            writer.writerow(["²", "income", "Sales", 100, "Imported ledger", "2031-01-07"])
+        
+        # Stop after the first committed chunk, then run again to resume
+        def interrupt(progress):
+            raise KeyboardInterrupt
+        try:
+            importer.import_file('transactions', ledger_path, progress=interrupt)
+        except KeyboardInterrupt:
+            pass
+        summary = importer.import_file('transactions', ledger_path)
+        imported = finance_mgr.count_transactions(farmer_id=farmer_id, start_date="2031-01-01", end_date="2031-01-31")
+        if summary['resumed_from'] == 3 and summary['imported'] == imported == 5 and summary['rejected'] == 3:
+            print("✓ Interrupted import resumed without duplicates")
+        else:
+            print(f"✗ Unexpected resumed import: {summary}, {imported} rows in the database")
+            return False
+        
+        # Rows appended to an imported file are picked up on the next run
+        with open(ledger_path, 'a', newline='', encoding='utf-8') as handle:
+            csv.writer(handle).writerow([farmer_id, "expense", "Seeds", 40, "Imported ledger", "2031-01-08"])
+        summary = importer.import_file('transactions', ledger_path)
+        imported = finance_mgr.count_transactions(farmer_id=farmer_id, start_date="2031-01-01", end_date="2031-01-31")
+        if summary['imported'] == imported == 6:
+            print("✓ Appended rows imported")
+        else:
+            print(f"✗ Appended rows not imported correctly: {summary}")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ CSV import failed: {e}")
+        return False
+
+def test_user_operations():
+    """Test user listing and prefix search"""
+    print("\nTesting user operations...")
+    try:
+        user_mgr = UserManager()
+        
+        if not user_mgr.user_exists("test_planner", "planner@email.com"):
+            user_mgr.create_user("test_planner", "planner@email.com", "hash", "Priya Planner")
+        if user_mgr.user_exists("test_planner", "other@email.com"):
+            print("✓ Create user successful")
+        else:
+            print("✗ Create user failed")
+            return False
+        
+        # Prefix search is case-insensitive on username, full name and email
+        for term in ("TEST_PLAN", "priya", "Planner@"):
+            if "test_planner" not in [u['username'] for u in user_mgr.search_users(term)]:
+                print(f"✗ User search for {term!r} failed")
+                return False
+        if user_mgr.search_users("lanner"):
+            print("✗ User search matched inside a word")
+            return False
+        print("✓ User prefix search successful")
+        
+        query, params = user_mgr._search_users_query("test", limit=10)
+        plan = user_mgr.db.run_read(lambda connection: [row['detail'] for row in
+                                    connection.execute("EXPLAIN QUERY PLAN " + query, params)])
+        if plan and not any(detail.startswith("SCAN users") for detail in plan):
+            print("✓ User search uses the NOCASE indexes")
+        else:
+            print(f"✗ User search scans the table: {plan}")
+            return False
+        
+        all_ids = [u['user_id'] for u in user_mgr.get_users()]
+        first_page = user_mgr.get_users(limit=1)
+        rest = user_mgr.get_users(after_id=first_page[0]['user_id'])
+        if [u['user_id'] for u in first_page + rest] == all_ids and user_mgr.count_users() == len(all_ids):
+            print(f"✓ User paging successful - {len(all_ids)} users")
+        else:
+            print("✗ User paging returned different rows")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ User operations failed: {e}")
+        return False
+
+def test_authentication():
+    """Test PBKDF2 password hashing, legacy hash upgrades and the session cache"""
+    print("\nTesting authentication...")
+    try:
+        user_mgr = UserManager()
+        auth = AuthService(user_mgr, iterations=10000)
+        
+        # Accounts created before salted hashes stored a bare SHA-256 digest
+        legacy_hash = hashlib.sha256(b"secret1").hexdigest()
+        if not user_mgr.user_exists("test_legacy", "legacy@email.com"):
+            user_mgr.create_user("test_legacy", "legacy@email.com", legacy_hash, "Lee Legacy")
+        user_id = user_mgr.get_user_by_username("test_legacy")['user_id']
+        user_mgr.set_password_hash(user_id, legacy_hash)
+        
+        if auth.authenticate("test_legacy", "wrong") or auth.authenticate("nobody_here", "secret1"):
+            print("✗ Authentication accepted bad credentials")
+            return False
+        user = auth.authenticate("test_legacy", "secret1")
+        stored = user_mgr.get_user_by_username("test_legacy")['password_hash']
+        if user and user[1] == "test_legacy" and stored.startswith("pbkdf2_sha256$10000$"):
+            print("✓ Authentication successful - legacy hash upgraded")
+        else:
+            print("✗ Authentication or hash upgrade failed")
+            return False
+        
+        if (auth.has_role(user_id, 'user') and not auth.has_role(user_id, 'admin')
+                and auth.reauthenticate(user_id, "secret1") and not auth.reauthenticate(user_id, "wrong")):
+            print("✓ Session cache role and password checks successful")
+        else:
+            print("✗ Session cache checks failed")
+            return False
+        
+        auth.logout(user_id)
+        if auth.get_session(user_id) is None and not auth.reauthenticate(user_id, "secret1"):
+            print("✓ Logout cleared the session")
+        else:
+            print("✗ Logout kept the session")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Authentication failed: {e}")
+        return False
+
+def test_change_detection():
+    """Test per-table change detection for auto-refresh"""
+    print("\nTesting change detection...")
+    try:
+        farmer_mgr = FarmerManager()
+        finance_mgr = FinanceManager()
+        monitor = ChangeMonitor(farmer_mgr.db.db_path)
+        monitor.poll()
+        
+        farmer_id = farmer_mgr.add_farmers_bulk([("Change Farmer", "555-4001", "change@email.com", "Change Address", 2.0)])[0]
+        if monitor.poll() == {'farmers'} and monitor.poll() == set():
+            print("✓ Farmer change detected")
+        else:
+            print("✗ Farmer change not detected")
+            return False
+        
+        # Bulk inserts bump the counter once for the whole batch
+        finance_mgr.add_transactions_bulk([(farmer_id, "income", "Sales", 10.0 + i) for i in range(5)])
+        if monitor.poll() == {'transactions'}:
+            print("✓ Bulk transaction change detected")
+        else:
+            print("✗ Bulk transaction change not detected")
+            return False
+        
+        monitor.close()
+        return True
+    except Exception as e:
+        print(f"✗ Change detection failed: {e}")
+        return False
+
+def test_startup_profiling():
+    """Test the startup timing report"""
+    print("\nTesting startup profiling...")
+    try:
+        import json
+        import tempfile
+        
+        report_path = os.path.join(tempfile.mkdtemp(), "startup_profile.json")
+        profiler = StartupProfiler(enabled=True, report_path=report_path)
+        with profiler.phase("schema"):
+            DatabaseManager()
+        profiler.mark("ready")
+        
+        if profiler.write():
+            with open(report_path) as f:
+                report = json.load(f)
+        else:
+            report = {}
+        if 'schema' in report.get('phase_totals_ms', {}) and 'ready' in report.get('marks_ms', {}):
+            print("✓ Startup report written")
+        else:
+            print("✗ Startup report is incomplete")
+            return False
+        
+        return True
+    except Exception as e:
+        print(f"✗ Startup profiling failed: {e}")
+        return False
+
 def test_sample_data():
     """Test loading sample data"""
     print("\nTesting sample data loading...")
@@ -152,9 +905,25 @@ def main():
     
     tests = [
         ("Database Connection", test_database_connection),
+        ("Schema Migrations", test_schema_migrations),
         ("Farmer Operations", test_farmer_operations),
         ("Crop Operations", test_crop_operations),
         ("Finance Operations", test_finance_operations),
+        ("Bulk Operations", test_bulk_operations),
+        ("Financial Rollups", test_financial_rollups),
+        ("Database Backup", test_database_backup),
+        ("Pagination", test_pagination),
+        ("Full-Text Search", test_full_text_search),
+        ("Dashboard Statistics", test_dashboard_stats),
+        ("Crop Economics", test_crop_economics),
+        ("Harvest Calendar", test_harvest_calendar),
+        ("Farmer Leaderboard", test_farmer_leaderboard),
+        ("Export", test_export),
+        ("CSV Import", test_csv_import),
+        ("User Operations", test_user_operations),
+        ("Authentication", test_authentication),
+        ("Change Detection", test_change_detection),
+        ("Startup Profiling", test_startup_profiling),
         ("Sample Data Loading", test_sample_data),
     ]
     
@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_FLAG = '--profile-startup'
+DEFAULT_REPORT_PATH = 'startup_profile.json'
+REPORT_VERSION = 1
+
+class StartupProfiler:
+    """Collect startup phase timings and write them as a JSON report
+    
+    Disabled profilers record nothing, so phase() can wrap startup code
+    unconditionally. Times are milliseconds since the profiler was created.
+    """
+    
+    def __init__(self, enabled: bool = False, report_path: str = DEFAULT_REPORT_PATH):
+        self.enabled = enabled
+        self.report_path = report_path
+        self.started = time.perf_counter()
+        self.phases = []
+        self.marks = {}
+    
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 3)
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as the named phase"""
+        if not self.enabled:
+            yield
+            return
+        start = self._elapsed_ms()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'start_ms': start,
+                'duration_ms': round(self._elapsed_ms() - start, 3),
+            })
+    
+    def mark(self, name: str, write: bool = False):
+        """Record a milestone such as a window becoming interactive"""
+        if not self.enabled:
+            return
+        self.marks.setdefault(name, self._elapsed_ms())
+        if write:
+            self.write()
+    
+    def report(self) -> dict:
+        """Return the timings as a JSON-serialisable dict"""
+        totals = {}
+        for phase in self.phases:
+            totals[phase['name']] = round(totals.get(phase['name'], 0) + phase['duration_ms'], 3)
+        return {
+            'report_version': REPORT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'entry_point': os.path.basename(sys.argv[0]) if sys.argv else '',
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'elapsed_ms': self._elapsed_ms(),
+            'modules_loaded': len(sys.modules),
+            'phase_totals_ms': totals,
+            'phases': self.phases,
+            'marks_ms': self.marks,
+        }
+    
+    def write(self, path: str = None) -> bool:
+        """Write the report to path (default report_path); returns success"""
+        if not self.enabled:
+            return False
+        try:
+            with open(path or self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=2, sort_keys=True)
+            return True
+        except OSError as e:
+            print(f"Could not write startup profile: {e}")
+            return False
+
+_profiler = StartupProfiler()
+
+def get_startup_profiler() -> StartupProfiler:
+    """Return the process-wide startup profiler"""
+    return _profiler
+
+def profile_phase(name: str):
+    """Context manager timing a startup phase on the process-wide profiler"""
+    return _profiler.phase(name)
+
+def enable_startup_profiling_from_argv(argv: list) -> bool:
+    """Turn profiling on if argv holds --profile-startup[=PATH], removing the flag
+    
+    The report is written when a window first becomes interactive and again
+    at exit. Returns True when profiling was enabled.
+    """
+    found = False
+    for arg in list(argv[1:]):
+        if arg == PROFILE_FLAG or arg.startswith(PROFILE_FLAG + '='):
+            argv.remove(arg)
+            found = True
+            if '=' in arg:
+                _profiler.report_path = arg.split('=', 1)[1] or DEFAULT_REPORT_PATH
+    if found and not _profiler.enabled:
+        import atexit
+        _profiler.enabled = True
+        atexit.register(_profiler.write)
+    return _profiler.enabled
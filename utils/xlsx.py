@@ -0,0 +1,167 @@
+import io
+import math
+import re
+import zipfile
+from typing import Iterable, List, Optional, Sequence
+
+# Rows per worksheet, header included; longer exports continue on a new sheet
+MAX_SHEET_ROWS = 1048576
+MAX_SHEET_NAME = 31
+
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_CONTENT_TYPE = ('<Override PartName="/xl/worksheets/sheet{index}.xml" '
+                       'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>'
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}</Relationships>'
+)
+_WORKBOOK_REL = ('<Relationship Id="rId{index}" '
+                 'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                 'Target="worksheets/sheet{index}.xml"/>')
+# The header row stays frozen while scrolling
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+def _escape(text: str) -> str:
+    """Escape text for an XML element or a double-quoted attribute"""
+    # xml.sax.saxutils.escape would do, but importing it pulls in urllib and http
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+def _cell(value) -> str:
+    """One <c> element; numbers stay numeric, everything else is an inline string"""
+    if value is None:
+        return '<c/>'
+    if isinstance(value, int) and not isinstance(value, bool) or isinstance(value, float) and math.isfinite(value):
+        return f'<c><v>{value!r}</v></c>'
+    text = _ILLEGAL_XML_RE.sub('', str(value))
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f'<c t="inlineStr"><is><t{space}>{_escape(text)}</t></is></c>'
+
+class XlsxWriter:
+    """Write rows to an .xlsx workbook one at a time in constant memory
+    
+    Each worksheet is streamed straight into its deflated zip entry, and
+    strings are stored inline rather than in a shared-strings table, so
+    nothing grows with the row count. When a sheet reaches Excel's row
+    limit the header is repeated on a new sheet named "<title> (2)" and so
+    on. Use as a context manager, or call close() to finish the file.
+    """
+    
+    def __init__(self, path: str, title: str, header: Sequence[str], compresslevel: int = 1):
+        self.title = title[:MAX_SHEET_NAME]
+        self.header = list(header)
+        self.rows_written = 0
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self._sheet_names: List[str] = []
+        self._sheet: Optional[io.TextIOWrapper] = None
+        self._sheet_rows = 0
+    
+    def _sheet_name(self, index: int) -> str:
+        if index == 1:
+            return self.title
+        suffix = f" ({index})"
+        return self.title[:MAX_SHEET_NAME - len(suffix)] + suffix
+    
+    def _start_sheet(self) -> None:
+        self._end_sheet()
+        index = len(self._sheet_names) + 1
+        self._sheet_names.append(self._sheet_name(index))
+        entry = self._zip.open(f'xl/worksheets/sheet{index}.xml', 'w')
+        self._sheet = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+        self._sheet.write(_SHEET_START)
+        self._sheet_rows = 0
+        self._write_row(self.header)
+    
+    def _end_sheet(self) -> None:
+        if self._sheet is not None:
+            self._sheet.write(_SHEET_END)
+            self._sheet.close()
+            self._sheet = None
+    
+    def _write_row(self, values: Iterable) -> None:
+        self._sheet.write('<row>' + ''.join(map(_cell, values)) + '</row>')
+        self._sheet_rows += 1
+    
+    def write_row(self, values: Iterable) -> None:
+        """Append one data row"""
+        if self._sheet is None or self._sheet_rows >= MAX_SHEET_ROWS:
+            self._start_sheet()
+        self._write_row(values)
+        self.rows_written += 1
+    
+    def write_rows(self, rows: Iterable[Iterable]) -> None:
+        """Append several data rows"""
+        for values in rows:
+            self.write_row(values)
+    
+    def close(self) -> None:
+        """Finish the last sheet and write the workbook parts"""
+        if self._zip is None:
+            return
+        if self._sheet is None and not self._sheet_names:
+            self._start_sheet()
+        self._end_sheet()
+        
+        indexes = range(1, len(self._sheet_names) + 1)
+        self._zip.writestr('[Content_Types].xml', _CONTENT_TYPES.format(
+            sheets=''.join(_SHEET_CONTENT_TYPE.format(index=index) for index in indexes)))
+        self._zip.writestr('_rels/.rels', _ROOT_RELS)
+        self._zip.writestr('xl/workbook.xml', _WORKBOOK.format(sheets=''.join(
+            _WORKBOOK_SHEET.format(name=_escape(name), index=index)
+            for index, name in zip(indexes, self._sheet_names))))
+        self._zip.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS.format(
+            sheets=''.join(_WORKBOOK_REL.format(index=index) for index in indexes)))
+        self._zip.close()
+        self._zip = None
+    
+    def abort(self) -> None:
+        """Close the underlying file without finishing the workbook"""
+        if self._zip is None:
+            return
+        try:
+            if self._sheet is not None:
+                self._sheet.close()
+        finally:
+            self._sheet = None
+            self._zip.close()
+            self._zip = None
+    
+    def __enter__(self) -> 'XlsxWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()